@@ -1,17 +1,27 @@
 from flask import Flask
 from app.routes.nutrition_routes import nutrition_bp
 from app.routes.page_routes import page_bp
+from app.routes.meal_routes import meal_bp
 from app.handlers.error_handlers import register_error_handlers
+from app.handlers.asset_handlers import register_asset_handlers
+from app.commands import register_commands
+from app.config import Config
+from app.utils.image_utils import SpoolingRequest
 from flask_cors import CORS
 
 def create_app():
     app = Flask(__name__)
+    app.request_class = SpoolingRequest
+    app.config['MAX_CONTENT_LENGTH'] = Config.MAX_UPLOAD_BYTES
     CORS(app)
     
     app.register_blueprint(page_bp)
     app.register_blueprint(nutrition_bp)
+    app.register_blueprint(meal_bp)
     
     register_error_handlers(app)
+    register_asset_handlers(app)
+    register_commands(app)
     
     return app
 
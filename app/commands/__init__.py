@@ -0,0 +1,10 @@
+from .asset_commands import build_assets_command
+from .cache_commands import warm_cache_command
+from .bulk_commands import enrich_nutrition_command
+
+def register_commands(app):
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(warm_cache_command)
+    app.cli.add_command(enrich_nutrition_command)
+
+__all__ = ['register_commands']
@@ -0,0 +1,13 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.services.asset_pipeline import AssetPipeline
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Minify, fingerprint and precompress static assets into static/dist."""
+    manifest = AssetPipeline(current_app.static_folder).build()
+    current_app.extensions['asset_manifest'] = manifest
+    for source, fingerprinted in sorted(manifest.items()):
+        click.echo(f"{source} -> {fingerprinted}")
@@ -0,0 +1,52 @@
+import os
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.config import Config
+from app.services.bulk_service import BulkPipeline, detect_format, read_rows, resume_point
+from app.utils.http_utils import dumps_json
+
+@click.command('enrich-nutrition')
+@click.argument('input_file', type=click.File('rb'))
+@click.option('--output', 'output_path', required=True, type=click.Path(dir_okay=False),
+              help='NDJSON file to write; an existing file is resumed, not overwritten.')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='Input format (default: from the file extension).')
+@click.option('--concurrency', default=Config.BULK_CONCURRENCY, show_default=True, help='Rows looked up in parallel.')
+@click.option('--videos/--no-videos', default=False, show_default=True, help='Also look up recipe videos.')
+@with_appcontext
+def enrich_nutrition_command(input_file, output_path, fmt, concurrency, videos):
+    """Look up and score every (food_item, quantity, unit) row of a CSV or NDJSON file.
+
+    Results are appended to the output as one NDJSON line per row, in completion order,
+    through the same caches as the API. Re-running with the same output skips the rows
+    that are already there, so an interrupted run resumes where it stopped.
+    """
+    from app.routes.nutrition_routes import enrich_row
+
+    fmt = fmt or detect_format(input_file.name, None)
+    if fmt is None:
+        raise click.UsageError("Cannot tell the input format from the file name; pass --format")
+
+    start_row, skip = 1, set()
+    if os.path.exists(output_path):
+        with open(output_path, 'r', encoding='utf-8') as existing:
+            start_row, skip = resume_point(existing)
+        click.echo(f"Resuming from row {start_row} ({len(skip)} later rows already done)", err=True)
+
+    pipeline = BulkPipeline(current_app._get_current_object(), lambda row: enrich_row(row, videos), concurrency=concurrency)
+    written = failed = 0
+    with open(output_path, 'ab') as output:
+        # A run killed mid-write can leave a partial last line; start on a fresh one
+        if output.tell() and not _ends_with_newline(output_path):
+            output.write(b"\n")
+        for result in pipeline.run(read_rows(input_file, fmt), start_row=start_row, skip=skip):
+            output.write(dumps_json(result) + b"\n")
+            output.flush()
+            written += 1
+            failed += result.get("status") == "error"
+    click.echo(f"Wrote {written} rows ({failed} failed) to {output_path}", err=True)
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
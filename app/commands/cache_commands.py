@@ -0,0 +1,66 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.services.cache_warmer import CacheWarmer
+from app.utils.constants import VALID_UNITS
+
+# Portions most users log, used when no --portion is given
+DEFAULT_PORTIONS = ['1:plate', '1:bowl', '100:grams', '1:units']
+
+def _parse_portion(value: str):
+    try:
+        quantity, unit = value.split(':', 1)
+        quantity = float(quantity)
+    except ValueError:
+        raise click.BadParameter(f"expected QUANTITY:UNIT, got '{value}'")
+    if quantity <= 0 or unit not in VALID_UNITS:
+        raise click.BadParameter(f"invalid portion '{value}'")
+    return quantity, unit
+
+@click.command('warm-cache')
+@click.option('--dishes', 'dishes_file', type=click.File('r'), help='File with one dish per line (# starts a comment).')
+@click.option('--from-suggestions', is_flag=True, help='Also warm the dishes returned by get_food_suggestions.')
+@click.option('--portion', 'portions', multiple=True, help='QUANTITY:UNIT to warm for every dish, repeatable.')
+@click.option('--concurrency', default=4, show_default=True, help='Dishes processed in parallel.')
+@click.option('--rate', default=60.0, show_default=True, help='Maximum upstream calls per minute.')
+@click.option('--videos/--no-videos', default=True, show_default=True, help='Also warm recipe video searches.')
+@with_appcontext
+def warm_cache_command(dishes_file, from_suggestions, portions, concurrency, rate, videos):
+    """Pre-populate the nutrition and recipe video caches before traffic arrives.
+
+    Safe to re-run: entries that are already cached are skipped, so an interrupted
+    run resumes where it stopped.
+    """
+    from app.routes.nutrition_routes import openai_service, youtube_service, analyzer, result_cache
+
+    if result_cache is None:
+        raise click.UsageError("The result cache is disabled (CACHE_ENABLED=false)")
+
+    parsed_portions = [_parse_portion(p) for p in portions or DEFAULT_PORTIONS]
+    dishes = []
+    if dishes_file:
+        dishes.extend(line.split('#', 1)[0].strip() for line in dishes_file)
+    if from_suggestions:
+        dishes.extend(openai_service.get_food_suggestions().suggestions)
+    dishes = [dish for dish in dishes if dish]
+    if not dishes:
+        raise click.UsageError("Provide --dishes and/or --from-suggestions")
+
+    for namespace, version in openai_service.versions.items():
+        result_cache.purge_stale(namespace, version)
+    result_cache.purge_stale('videos', youtube_service.version)
+
+    warmer = CacheWarmer(
+        current_app._get_current_object(),
+        openai_service,
+        youtube_service,
+        analyzer,
+        concurrency=concurrency,
+        calls_per_minute=rate,
+        include_videos=videos
+    )
+    report = warmer.warm(dishes, parsed_portions)
+
+    click.echo(f"Fetched {report.fetched}, already cached {report.already_cached}, failed {len(report.failed)}")
+    for label in report.failed:
+        click.echo(f"  failed: {label}", err=True)
@@ -1,8 +1,151 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY") 
\ No newline at end of file
+    YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+
+    # Response compression
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+    BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 5))
+
+    # Client-side cache lifetime for GET /get_food_suggestions
+    SUGGESTIONS_MAX_AGE = int(os.getenv("SUGGESTIONS_MAX_AGE", 3600))
+
+    # Shared result cache (SQLite in WAL mode, one file per host)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", os.path.join(tempfile.gettempdir(), "calorie_counter_cache.sqlite3"))
+    CACHE_VERSION = os.getenv("CACHE_VERSION", "1")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+    CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    CACHE_MEMORY_ENTRIES = int(os.getenv("CACHE_MEMORY_ENTRIES", 256))
+    SUGGESTIONS_CACHE_TTL_SECONDS = int(os.getenv("SUGGESTIONS_CACHE_TTL_SECONDS", 24 * 3600))
+    # Rejected inputs (invalid foods, non-food images) are answered from here without an upstream call
+    NEGATIVE_CACHE_ENABLED = os.getenv("NEGATIVE_CACHE_ENABLED", "true").lower() == "true"
+    NEGATIVE_CACHE_TTL_SECONDS = int(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", 3600))
+    NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", 2000))
+    NEGATIVE_CACHE_MEMORY_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MEMORY_ENTRIES", 128))
+
+    # Per-user meal log (must live on persistent storage)
+    MEAL_LOG_DB_PATH = os.getenv("MEAL_LOG_DB_PATH", os.path.join("instance", "meal_log.sqlite3"))
+
+    # Token-bucket rate limiting in front of upstream calls (shared through SQLite)
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", os.path.join(tempfile.gettempdir(), "calorie_counter_limits.sqlite3"))
+    RATE_LIMIT_CLIENT_CAPACITY = float(os.getenv("RATE_LIMIT_CLIENT_CAPACITY", 30))
+    RATE_LIMIT_CLIENT_REFILL_PER_SECOND = float(os.getenv("RATE_LIMIT_CLIENT_REFILL_PER_SECOND", 0.5))
+    RATE_LIMIT_GLOBAL_CAPACITY = float(os.getenv("RATE_LIMIT_GLOBAL_CAPACITY", 300))
+    RATE_LIMIT_GLOBAL_REFILL_PER_SECOND = float(os.getenv("RATE_LIMIT_GLOBAL_REFILL_PER_SECOND", 8))
+    RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", 5))
+    RATE_LIMIT_QUEUE_SIZE = int(os.getenv("RATE_LIMIT_QUEUE_SIZE", 16))
+    RATE_LIMIT_IMAGE_COST = float(os.getenv("RATE_LIMIT_IMAGE_COST", 5))
+    RATE_LIMIT_TEXT_COST = float(os.getenv("RATE_LIMIT_TEXT_COST", 1))
+    # Only enable behind a proxy that overwrites X-Forwarded-For
+    RATE_LIMIT_TRUST_FORWARDED_FOR = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+    # Background jobs for image analysis (status shared through SQLite)
+    JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(tempfile.gettempdir(), "calorie_counter_jobs.sqlite3"))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+    JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", 16))
+    JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", 600))
+    JOB_LONG_POLL_MAX_SECONDS = float(os.getenv("JOB_LONG_POLL_MAX_SECONDS", 20))
+    # Long-polls waiting at once per worker; further polls are answered at once
+    JOB_LONG_POLL_MAX_WAITERS = int(os.getenv("JOB_LONG_POLL_MAX_WAITERS", int(os.getenv("GUNICORN_THREADS", 16)) // 4))
+
+    # Upload limits; uploads above UPLOAD_SPOOL_BYTES are spooled to disk
+    MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+    MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", 40_000_000))
+    UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", 512 * 1024))
+    # Browsers downscale photos to this size and re-encode them before upload (see /client_config)
+    CLIENT_IMAGE_MAX_DIMENSION = int(os.getenv("CLIENT_IMAGE_MAX_DIMENSION", 1280))
+    CLIENT_IMAGE_QUALITY = float(os.getenv("CLIENT_IMAGE_QUALITY", 0.8))
+    CLIENT_IMAGE_MIME_TYPE = os.getenv("CLIENT_IMAGE_MIME_TYPE", "image/jpeg")
+    CLIENT_CONFIG_MAX_AGE = int(os.getenv("CLIENT_CONFIG_MAX_AGE", 300))
+    # Browser-side (IndexedDB) nutrition result cache: entries kept, and age after which a
+    # shown result is revalidated in the background
+    CLIENT_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("CLIENT_RESULT_CACHE_MAX_ENTRIES", 200))
+    CLIENT_RESULT_CACHE_REVALIDATE_SECONDS = int(os.getenv("CLIENT_RESULT_CACHE_REVALIDATE_SECONDS", 3600))
+    # Nutrition responses the service worker keeps for offline use
+    SERVICE_WORKER_RESULT_ENTRIES = int(os.getenv("SERVICE_WORKER_RESULT_ENTRIES", 50))
+
+    # Model routing: each call type starts on a tier (see model_router.DEFAULT_ROUTES)
+    MODEL_FAST = os.getenv("MODEL_FAST", "gpt-4o-mini")
+    MODEL_STANDARD = os.getenv("MODEL_STANDARD", "gpt-4o")
+    # Overrides as call_type=tier pairs, e.g. "vision=fast,nutrition=standard"
+    MODEL_ROUTES = os.getenv("MODEL_ROUTES", "")
+    # Redo fast-tier nutrition lookups on the standard tier when the food turns out to be a dish
+    MODEL_ESCALATE_RECIPES = os.getenv("MODEL_ESCALATE_RECIPES", "true").lower() == "true"
+    # USD per million input:output tokens, for the cost estimate in /stats/models
+    MODEL_PRICES = os.getenv("MODEL_PRICES", "gpt-4o=2.5:10,gpt-4o-mini=0.15:0.6")
+
+    # Hedged upstream requests: re-issue a call still running after the latency percentile
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 95))
+    # Upper bound on hedges as a fraction of hedgeable calls
+    HEDGE_MAX_RATE = float(os.getenv("HEDGE_MAX_RATE", 0.05))
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))
+    HEDGE_CALL_TYPES = os.getenv("HEDGE_CALL_TYPES", "nutrition,nutrition_recipe,suggestions")
+    # Threads running hedged calls per worker: two per request thread (primary and hedge);
+    # calls that find them all busy run unhedged
+    HEDGE_POOL_SIZE = int(os.getenv("HEDGE_POOL_SIZE", 2 * int(os.getenv("GUNICORN_THREADS", 16))))
+
+    # Per-request time budgets, handed down to every OpenAI and YouTube call as its timeout
+    REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", 25))
+    IMAGE_DEADLINE_SECONDS = float(os.getenv("IMAGE_DEADLINE_SECONDS", 60))
+    # An upstream call is not started with less than this left
+    DEADLINE_MIN_CALL_SECONDS = float(os.getenv("DEADLINE_MIN_CALL_SECONDS", 1))
+    # Recipe videos are skipped (and reported in "skipped") with less than this left
+    DEADLINE_VIDEO_MIN_SECONDS = float(os.getenv("DEADLINE_VIDEO_MIN_SECONDS", 3))
+
+    # Request tracing: spans per step, exported as JSON lines ("file") or OTLP/HTTP JSON ("otlp")
+    TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "").lower()
+    TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH", os.path.join("instance", "traces.jsonl"))
+    TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "calorie-counter")
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0.1))
+    # Traces at least this slow are exported whatever the sample rate (0 disables)
+    TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", 5000))
+
+    # GET /stats/models (router, key pool and load shedder internals) answers only requests with
+    # "X-Stats-Token: <token>". Empty token disables the endpoint.
+    STATS_TOKEN = os.getenv("STATS_TOKEN", "")
+
+    # On-demand profiling: a request with "X-Profile: <token>" (or ?profile=<token>) runs under
+    # cProfile and the profile is kept for download. Empty token disables profiling.
+    PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join("instance", "profiles"))
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 50))
+    # Background stack sampler over all nutrition endpoints (read with the same token)
+    PROFILE_SAMPLER_ENABLED = os.getenv("PROFILE_SAMPLER_ENABLED", "false").lower() == "true"
+    PROFILE_SAMPLER_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLER_INTERVAL_MS", 20))
+    PROFILE_SAMPLER_MAX_STACKS = int(os.getenv("PROFILE_SAMPLER_MAX_STACKS", 2000))
+
+    # Pool of OpenAI keys, comma separated, each "key" or "key@organization" (default: OPENAI_API_KEY alone).
+    # Calls go to the key with the most rate-limit headroom; a key answering 429 cools down.
+    OPENAI_API_KEYS = os.getenv("OPENAI_API_KEYS", "")
+    # Cooldown after a 429 without Retry-After or reset headers
+    OPENAI_KEY_COOLDOWN_SECONDS = float(os.getenv("OPENAI_KEY_COOLDOWN_SECONDS", 20))
+    # Cooldown of a key whose billing quota is used up
+    OPENAI_KEY_QUOTA_COOLDOWN_SECONDS = float(os.getenv("OPENAI_KEY_QUOTA_COOLDOWN_SECONDS", 600))
+
+    # Bulk enrichment (POST /calculate_nutrition/bulk and `flask enrich-nutrition`)
+    BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", 4))
+    # Rows per request; the stream ends with a "too_many_rows" line to resume from
+    BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", 5000))
+    # Bulk files are read a row at a time, so they get their own cap instead of MAX_UPLOAD_BYTES
+    BULK_MAX_UPLOAD_BYTES = int(os.getenv("BULK_MAX_UPLOAD_BYTES", 200 * 1024 * 1024))
+
+    # Priority load shedding: requests run in at most OVERLOAD_MAX_CONCURRENT slots per worker
+    # (keep it below GUNICORN_THREADS so cheap answers and 503s still find a thread); the rest
+    # queue by priority (cached > text > image > suggestions)
+    OVERLOAD_ENABLED = os.getenv("OVERLOAD_ENABLED", "true").lower() == "true"
+    OVERLOAD_MAX_CONCURRENT = int(os.getenv("OVERLOAD_MAX_CONCURRENT", 12))
+    # Queue delay that, sustained for an interval, sheds the lowest class still served
+    OVERLOAD_TARGET_DELAY_SECONDS = float(os.getenv("OVERLOAD_TARGET_DELAY_SECONDS", 0.1))
+    OVERLOAD_INTERVAL_SECONDS = float(os.getenv("OVERLOAD_INTERVAL_SECONDS", 1))
+    # Longest a request waits for a slot before it gets a 503
+    OVERLOAD_MAX_WAIT_SECONDS = float(os.getenv("OVERLOAD_MAX_WAIT_SECONDS", 2))
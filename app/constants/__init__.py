@@ -1,3 +1,13 @@
 from .nutrition_constant import *
+from .asset_constant import *
 
-__all__ = ['NUTRIENT_WEIGHTS', 'MICRONUTRIENTS', 'SCORE_FEEDBACK', 'DEFAULT_SCORE'] 
\ No newline at end of file
+__all__ = [
+    'NUTRIENT_WEIGHTS',
+    'MICRONUTRIENTS',
+    'SCORE_FEEDBACK',
+    'DEFAULT_SCORE',
+    'ASSET_SOURCES',
+    'ASSET_DIST_DIR',
+    'ASSET_MANIFEST',
+    'IMMUTABLE_MAX_AGE'
+]
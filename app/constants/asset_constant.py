@@ -0,0 +1,35 @@
+"""Configuration for the static asset pipeline"""
+
+from typing import Dict, List
+
+# Static files (relative to app/static) that are minified and fingerprinted
+ASSET_SOURCES: List[str] = [
+    'js/app.js',
+    'js/image_worker.js',
+    'css/styles.css',
+    'favicon/favicon.ico',
+    'favicon/favicon-16x16.png',
+    'favicon/favicon-32x32.png',
+    'favicon/apple-touch-icon.png'
+]
+
+# Output directory for built assets (relative to app/static)
+ASSET_DIST_DIR: str = 'dist'
+
+# Manifest mapping logical asset names to fingerprinted file names
+ASSET_MANIFEST: str = 'manifest.json'
+
+# Text assets worth precompressing (images are already compressed)
+COMPRESSIBLE_EXTENSIONS: set[str] = {'.js', '.css', '.json', '.svg', '.webmanifest'}
+
+# Precompressed variants in order of preference: encoding -> file suffix
+PRECOMPRESSED_ENCODINGS: Dict[str, str] = {
+    'br': '.br',
+    'gzip': '.gz'
+}
+
+# One year: fingerprinted files never change under the same URL
+IMMUTABLE_MAX_AGE: int = 31536000
+
+# Un-fingerprinted well-known files (favicon.ico, site.webmanifest)
+WELL_KNOWN_MAX_AGE: int = 86400
@@ -1,3 +1,4 @@
+import math
 from http import HTTPStatus
 from typing import Any, Dict, Optional
 
@@ -10,12 +11,14 @@ class APIException(Exception):
         message: str,
         status_code: int = HTTPStatus.INTERNAL_SERVER_ERROR,
         error_type: str = "INTERNAL_ERROR",
-        details: Optional[Dict[str, Any]] = None
+        details: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None
     ):
         self.message = str(message)
         self.status_code = status_code
         self.error_type = error_type
         self.details = details or {}
+        self.headers = headers or {}
         super().__init__(self.message)
 
     def __str__(self) -> str:
@@ -85,6 +88,24 @@ class APIException(Exception):
             error_type="EMPTY_IMAGE"
         )
 
+    @classmethod
+    def upload_too_large(cls, max_bytes: int) -> 'APIException':
+        return cls(
+            message=f"Uploaded file is too large (limit {max_bytes // (1024 * 1024)} MB)",
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            error_type="UPLOAD_TOO_LARGE",
+            details={"max_bytes": max_bytes}
+        )
+
+    @classmethod
+    def image_too_large(cls, max_pixels: int) -> 'APIException':
+        return cls(
+            message=f"Image dimensions are too large (limit {max_pixels // 1_000_000} megapixels)",
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            error_type="IMAGE_TOO_LARGE",
+            details={"max_pixels": max_pixels}
+        )
+
     @classmethod
     def service_unavailable(cls, service: str = "service") -> 'APIException':
         return cls(
@@ -93,6 +114,18 @@ class APIException(Exception):
             error_type="SERVICE_UNAVAILABLE"
         )
 
+    @classmethod
+    def deadline_exceeded(cls, budget: float, stage: Optional[str] = None) -> 'APIException':
+        message = f"The request ran out of time ({budget:g}s budget)"
+        if stage:
+            message += f" before {stage}"
+        return cls(
+            message=message,
+            status_code=HTTPStatus.GATEWAY_TIMEOUT,
+            error_type="DEADLINE_EXCEEDED",
+            details={"budget_seconds": budget}
+        )
+
     @classmethod
     def parse_error(cls, details: Optional[Dict[str, Any]] = None) -> 'APIException':
         return cls(
@@ -100,4 +133,26 @@ class APIException(Exception):
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
             error_type="PARSE_ERROR",
             details=details
-        )
\ No newline at end of file
+        )
+
+    @classmethod
+    def rate_limited(cls, retry_after: float) -> 'APIException':
+        seconds = max(1, math.ceil(retry_after))
+        return cls(
+            message="Too many requests, please retry later",
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            error_type="RATE_LIMITED",
+            details={"retry_after": seconds},
+            headers={"Retry-After": str(seconds)}
+        )
+
+    @classmethod
+    def overloaded(cls, retry_after: float) -> 'APIException':
+        seconds = max(1, math.ceil(retry_after))
+        return cls(
+            message="The server is overloaded, please retry shortly",
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            error_type="OVERLOADED",
+            details={"retry_after": seconds},
+            headers={"Retry-After": str(seconds)}
+        )
@@ -1,3 +1,4 @@
 from .error_handlers import register_error_handlers
+from .asset_handlers import register_asset_handlers
 
-__all__ = ['register_error_handlers'] 
\ No newline at end of file
+__all__ = ['register_error_handlers', 'register_asset_handlers']
@@ -0,0 +1,21 @@
+from app.constants.asset_constant import ASSET_DIST_DIR
+from app.services.asset_pipeline import AssetPipeline
+
+def register_asset_handlers(app):
+    """
+    Rewrites url_for('static', filename=...) to the fingerprinted build output when a
+    build manifest is present, so templates never reference asset hashes directly.
+    Without a build the plain static files are served as before. The sources are hashed
+    once here for the service worker version rather than on every /sw.js request.
+    """
+    pipeline = AssetPipeline(app.static_folder)
+    app.extensions['asset_manifest'] = pipeline.load_manifest()
+    app.extensions['asset_digest'] = pipeline.digest()
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint != 'static':
+            return
+        fingerprinted = app.extensions['asset_manifest'].get(values.get('filename'))
+        if fingerprinted:
+            values['filename'] = f"{ASSET_DIST_DIR}/{fingerprinted}"
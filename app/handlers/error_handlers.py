@@ -9,12 +9,20 @@ def register_error_handlers(app):
             "status": "error",
             "error_type": error.error_type
         }
-        return jsonify(response), error.status_code
+        return jsonify(response), error.status_code, error.headers
 
     @app.errorhandler(404)
     def not_found_error(error):
         return {"error": "Not found"}, 404
 
+    @app.errorhandler(413)
+    def request_too_large(error):
+        return jsonify({
+            "error": "Request body is too large",
+            "status": "error",
+            "error_type": "UPLOAD_TOO_LARGE"
+        }), 413
+
     @app.errorhandler(500)
     def internal_error(error):
         return jsonify({
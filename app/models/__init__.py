@@ -4,10 +4,12 @@ from .nutrition_models import (
     HealthScore,
     VideoInfo
 )
+from .nutrition_record import NutritionRecord
 
 __all__ = [
     'NutritionScores',
     'FoodSuggestions',
     'HealthScore',
-    'VideoInfo'
+    'VideoInfo',
+    'NutritionRecord'
 ] 
\ No newline at end of file
@@ -52,4 +52,12 @@ class FoodItem(BaseModel):
     """Model for food item information"""
     food_item: str
     quantity: float
-    unit: str
\ No newline at end of file
+    unit: str
+
+class FoodItems(BaseModel):
+    """Model for every food item detected in one image"""
+    items: List[FoodItem]
+
+class NutritionBatch(BaseModel):
+    """Model for nutrition information of several food items, in request order"""
+    items: List[NutritionScores]
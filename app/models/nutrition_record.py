@@ -0,0 +1,121 @@
+import re
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+# Record field -> (path in NutritionScores.model_dump(), canonical unit)
+NUTRIENT_FIELDS: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    'calories': (('calories',), 'kcal'),
+    'protein': (('protein',), 'g'),
+    'fat': (('fat', 'total'), 'g'),
+    'saturated_fat': (('fat', 'saturated'), 'g'),
+    'trans_fat': (('fat', 'trans'), 'g'),
+    'polyunsaturated_fat': (('fat', 'polyunsaturated'), 'g'),
+    'monounsaturated_fat': (('fat', 'monounsaturated'), 'g'),
+    'carbohydrates': (('carbohydrates', 'total'), 'g'),
+    'carbohydrate_sugar': (('carbohydrates', 'sugar'), 'g'),
+    'added_sugar': (('carbohydrates', 'added_sugar'), 'g'),
+    'sugar': (('sugar',), 'g'),
+    'fiber': (('fiber',), 'g'),
+    'sodium': (('sodium',), 'mg'),
+    'potassium': (('potassium',), 'mg'),
+    'calcium': (('calcium',), 'mg'),
+    'iron': (('iron',), 'mg'),
+    'vitamin_a': (('vitamin_a',), 'mcg'),
+    'vitamin_c': (('vitamin_c',), 'mg'),
+    'vitamin_d': (('vitamin_d',), 'mcg')
+}
+
+# Mass units in grams, energy units in kcal
+_MASS = {'g': 1.0, 'gram': 1.0, 'grams': 1.0, 'kg': 1000.0, 'mg': 1e-3, 'mcg': 1e-6, 'µg': 1e-6, 'μg': 1e-6, 'ug': 1e-6}
+_ENERGY = {'kcal': 1.0, 'cal': 1.0, 'calories': 1.0, 'kj': 1 / 4.184}
+# International units are substance specific: vitamin A as retinol, vitamin D as cholecalciferol
+_IU_TO_MCG = {'vitamin_a': 0.3, 'vitamin_d': 0.025}
+
+_AMOUNT = re.compile(r'(\d[\d,]*(?:\.\d+)?|\.\d+)\s*([a-zA-Zµμ]+)?')
+
+def parse_quantity(field: str, value: Any) -> float:
+    """
+    Converts a nutrient string such as '19g', '0.5 mg' or '270IU' to the field's canonical unit
+    Values without a recognised unit are taken to already be in the canonical unit.
+    """
+    if isinstance(value, bool) or value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _AMOUNT.search(str(value))
+    if not match:
+        return 0.0
+    amount = float(match.group(1).replace(',', ''))
+    unit = (match.group(2) or '').lower()
+    canonical = NUTRIENT_FIELDS[field][1]
+    if unit == 'iu' and field in _IU_TO_MCG:
+        return amount * _IU_TO_MCG[field] * _MASS['mcg'] / _MASS[canonical]
+    if canonical == 'kcal':
+        return amount * _ENERGY.get(unit, 1.0)
+    if unit in _MASS:
+        return amount * _MASS[unit] / _MASS[canonical]
+    return amount
+
+class NutritionRecord:
+    """
+    Numeric nutrition in canonical units (kcal, g, mg, mcg), parsed once from model output
+    The NutritionScores strings stay the display form; scoring, totals and the meal log
+    read these floats directly.
+    """
+
+    __slots__ = tuple(NUTRIENT_FIELDS) + ('is_recipe', 'is_valid_food')
+
+    def __init__(self, is_recipe: bool = False, is_valid_food: bool = True, **values: float):
+        for field in NUTRIENT_FIELDS:
+            setattr(self, field, float(values.pop(field, 0.0)))
+        if values:
+            raise TypeError(f"Unknown nutrients: {', '.join(values)}")
+        self.is_recipe = is_recipe
+        self.is_valid_food = is_valid_food
+
+    @classmethod
+    def from_dump(cls, nutrition_info: Mapping[str, Any]) -> 'NutritionRecord':
+        """Parses a NutritionScores.model_dump() (or a /calculate_nutrition nutrition_info)"""
+        values = {}
+        for field, (path, _) in NUTRIENT_FIELDS.items():
+            value: Any = nutrition_info
+            for part in path:
+                value = value.get(part) if isinstance(value, Mapping) else None
+            values[field] = parse_quantity(field, value)
+        return cls(
+            is_recipe=bool(nutrition_info.get('is_recipe', False)),
+            is_valid_food=bool(nutrition_info.get('is_valid_food', True)),
+            **values
+        )
+
+    @classmethod
+    def total(cls, records: Iterable['NutritionRecord']) -> 'NutritionRecord':
+        """Sums several records; the total is a recipe if any part is and valid if any part is"""
+        records = list(records)
+        return cls(
+            is_recipe=any(record.is_recipe for record in records),
+            is_valid_food=any(record.is_valid_food for record in records),
+            **{field: sum(getattr(record, field) for record in records) for field in NUTRIENT_FIELDS}
+        )
+
+    def values(self) -> Dict[str, float]:
+        return {field: getattr(self, field) for field in NUTRIENT_FIELDS}
+
+    def to_display(self, insight: Optional[str] = '') -> Dict[str, Any]:
+        """Formats the record in the NutritionScores shape, e.g. {'protein': '12.5g', ...}"""
+        display: Dict[str, Any] = {}
+        for field, (path, unit) in NUTRIENT_FIELDS.items():
+            target = display
+            for part in path[:-1]:
+                target = target.setdefault(part, {})
+            target[path[-1]] = f"{round(getattr(self, field), 1):g}{unit}"
+        display.update(is_recipe=self.is_recipe, is_valid_food=self.is_valid_food, insight=insight)
+        return display
+
+    def __repr__(self) -> str:
+        nutrients = ', '.join(f"{field}={getattr(self, field):g}" for field in NUTRIENT_FIELDS)
+        return f"NutritionRecord({nutrients}, is_recipe={self.is_recipe}, is_valid_food={self.is_valid_food})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, NutritionRecord):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
@@ -1,4 +1,5 @@
 from .nutrition_routes import nutrition_bp
 from .page_routes import page_bp
+from .meal_routes import meal_bp
 
-__all__ = ['nutrition_bp', 'page_bp'] 
\ No newline at end of file
+__all__ = ['nutrition_bp', 'page_bp', 'meal_bp']
\ No newline at end of file
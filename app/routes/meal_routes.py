@@ -0,0 +1,122 @@
+from flask import Blueprint, request, jsonify, current_app
+from http import HTTPStatus
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional, Tuple
+from app.config import Config
+from app.exceptions.api_exceptions import APIException
+from app.routes.nutrition_routes import client_id, openai_service, rate_limiter, score_food_item, validate_input
+from app.services.meal_log_service import MealLog, GRANULARITIES
+from app.utils.deadline import Deadline
+from app.utils.http_utils import compress_response
+
+# Blueprint for the per-user meal log
+meal_bp = Blueprint('meals', __name__)
+meal_bp.after_request(compress_response)
+meal_log = MealLog.from_config()
+
+USER_ID_HEADER = 'X-User-Id'
+
+def current_user_id() -> str:
+    """
+    Reads the caller's user id from the X-User-Id header
+    The header is trusted as is: deploy the meal log behind an authenticating proxy that sets
+    it from the signed-in user and drops any value sent by the client
+    Raises:
+        APIException: If the header is missing
+    """
+    user_id = request.headers.get(USER_ID_HEADER, '').strip()
+    if not user_id:
+        raise APIException(f"{USER_ID_HEADER} header is required", HTTPStatus.BAD_REQUEST, "validation_error")
+    return user_id
+
+def scored_nutrition(food_item: str, quantity: float, unit: str) -> Tuple[dict, float]:
+    """
+    Nutrition and health score of a lookup, computed here as /calculate_nutrition does, so the
+    log never holds totals supplied by the client
+    Usually a cache hit right after /calculate_nutrition; a miss is charged to the rate limiter
+    """
+    if current_app.config.get('RATE_LIMIT_ENABLED', Config.RATE_LIMIT_ENABLED) \
+            and not openai_service.has_cached_nutrition(food_item, quantity, unit):
+        rate_limiter.admit(client_id(), Config.RATE_LIMIT_TEXT_COST)
+    nutrition = openai_service.get_nutrition_info(food_item, quantity, unit, deadline=Deadline(Config.REQUEST_DEADLINE_SECONDS))
+    if not nutrition.is_valid_food:
+        raise APIException(f"'{food_item}' is not a food item", HTTPStatus.BAD_REQUEST, "validation_error")
+    scored, _ = score_food_item(food_item, quantity, unit, nutrition)
+    return scored["nutrition_info"], scored["health_score"]["score"]
+
+def parse_datetime(value: Any, name: str) -> Optional[datetime]:
+    """Parses an ISO 8601 date or datetime query or body value; naive values are taken as UTC"""
+    if not value:
+        return None
+    try:
+        # A JSON body may hold any type; only strings are ISO 8601
+        if not isinstance(value, str):
+            raise ValueError(value)
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise APIException(f"Invalid {name}: expected an ISO 8601 date or datetime", HTTPStatus.BAD_REQUEST, "validation_error")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+@meal_bp.route('/meals', methods=['POST'])
+def log_meal():
+    """
+    Logs a food in the caller's meal log, scored on the server
+    Body: food_item, quantity and unit (a /calculate_nutrition result may be sent as is; its
+    nutrition_info and health_score are ignored), optional logged_at (ISO 8601)
+    Returns:
+        JSON response containing the stored meal
+    """
+    user_id = current_user_id()
+    data = request.get_json(silent=True)
+    if not data:
+        raise APIException("No data provided", HTTPStatus.BAD_REQUEST, "validation_error")
+
+    food_item = str(data.get("food_item", "")).lower().strip()
+    validate_input(food_item, data.get("quantity"), data.get("unit"))
+    quantity, unit = float(data["quantity"]), data["unit"]
+    logged_at = parse_datetime(data.get("logged_at"), "logged_at")
+    nutrition_info, health_score = scored_nutrition(food_item, quantity, unit)
+
+    meal = meal_log.add_meal(user_id, food_item, quantity, unit, nutrition_info, health_score, logged_at)
+    return jsonify({"meal": meal, "status": "success"}), HTTPStatus.CREATED
+
+@meal_bp.route('/meals/<int:meal_id>', methods=['DELETE'])
+def delete_meal(meal_id: int):
+    """Removes a meal from the caller's log and from its day and week totals"""
+    if not meal_log.delete_meal(current_user_id(), meal_id):
+        raise APIException("Meal not found", HTTPStatus.NOT_FOUND, "not_found")
+    return jsonify({"status": "success"})
+
+@meal_bp.route('/meals', methods=['GET'])
+def list_meals():
+    """
+    Lists the caller's meals in [start, end), defaulting to the last 24 hours
+    Returns:
+        JSON response containing the meals, oldest first
+    """
+    user_id = current_user_id()
+    end = parse_datetime(request.args.get("end"), "end") or datetime.now(timezone.utc)
+    start = parse_datetime(request.args.get("start"), "start") or end - timedelta(days=1)
+    return jsonify({"meals": meal_log.list_meals(user_id, start, end), "status": "success"})
+
+@meal_bp.route('/meals/totals', methods=['GET'])
+def meal_totals():
+    """
+    Returns running totals per day or ISO week for the inclusive date range [start, end]
+    Query args: granularity (day|week), start and end (YYYY-MM-DD, default today in UTC, the
+    calendar meals logged without an offset are bucketed by)
+    """
+    user_id = current_user_id()
+    granularity = request.args.get("granularity", "day")
+    if granularity not in GRANULARITIES:
+        raise APIException("granularity must be 'day' or 'week'", HTTPStatus.BAD_REQUEST, "validation_error")
+    try:
+        end = date.fromisoformat(request.args["end"]) if request.args.get("end") else datetime.now(timezone.utc).date()
+        start = date.fromisoformat(request.args["start"]) if request.args.get("start") else end
+    except ValueError:
+        raise APIException("start and end must be YYYY-MM-DD dates", HTTPStatus.BAD_REQUEST, "validation_error")
+    return jsonify({
+        "granularity": granularity,
+        "totals": meal_log.totals(user_id, granularity, start, end),
+        "status": "success"
+    })
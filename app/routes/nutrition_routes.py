@@ -1,17 +1,181 @@
-from flask import Blueprint, request, jsonify, current_app
+import hmac
+import math
+import threading
+import time
+from dataclasses import asdict
+from flask import Blueprint, request, jsonify, current_app, url_for, g, send_file, stream_with_context
 from http import HTTPStatus
 from app.services.nutrition_analyzer import NutritionAnalyzer
 from app.services.openai_service import OpenAIService
 from app.services.youtube_service import YouTubeService
+from app.services.cache_service import ResultCache, cache_version
+from app.services.key_pool import KeyPool
+from app.services.rate_limiter import RateLimiter
+from app.services.job_service import JobQueue, QUEUED
+from app.services.bulk_service import BulkPipeline, detect_format, read_rows
+from app.services.profiler import RequestProfiler, StackSampler
+from app.services.overload import OverloadController
 from app.exceptions.api_exceptions import APIException
-from typing import Optional, Any
+from app.models.nutrition_record import NutritionRecord
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from app.config import Config
-from PIL import Image, UnidentifiedImageError
+from app.utils.deadline import Deadline
+from app.utils.http_utils import compress_response, conditional, dumps_json, json_response
+from app.utils.image_utils import check_image_header, spool_upload
+from app.utils.tracing import Tracer, tracer
+from werkzeug.exceptions import RequestEntityTooLarge
 
 # Blueprint for handling nutrition-related routes
 nutrition_bp = Blueprint('nutrition', __name__)
+nutrition_bp.after_request(compress_response)
 analyzer = NutritionAnalyzer()
-openai_service = OpenAIService(api_key=Config.OPENAI_API_KEY)
+result_cache = ResultCache.from_config()
+negative_cache = ResultCache.negative_from_config()
+openai_service = OpenAIService(
+    api_key=Config.OPENAI_API_KEY, cache=result_cache, negative_cache=negative_cache, key_pool=KeyPool.from_config()
+)
+youtube_service = YouTubeService(api_key=Config.YOUTUBE_API_KEY, cache=result_cache)
+rate_limiter = RateLimiter.from_config()
+job_queue = JobQueue.from_config()
+# Long-polls hold a thread for up to JOB_LONG_POLL_MAX_SECONDS, so only this many wait at once
+long_poll_slots = threading.BoundedSemaphore(Config.JOB_LONG_POLL_MAX_WAITERS)
+request_profiler = RequestProfiler.from_config()
+stack_sampler = StackSampler.from_config()
+overload_controller = OverloadController.from_config()
+
+# Token cost per endpoint; image analysis chains several upstream calls
+ENDPOINT_COSTS = {
+    'nutrition.analyze_image': Config.RATE_LIMIT_IMAGE_COST,
+    'nutrition.submit_image_job': Config.RATE_LIMIT_IMAGE_COST,
+    'nutrition.calculate_nutrition': Config.RATE_LIMIT_TEXT_COST,
+    'nutrition.get_food_suggestions': Config.RATE_LIMIT_TEXT_COST
+}
+
+def client_id() -> str:
+    """Identifies the caller for per-client rate limiting"""
+    if Config.RATE_LIMIT_TRUST_FORWARDED_FOR and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or 'unknown'
+
+@nutrition_bp.before_request
+def start_request_trace():
+    """Assigns the request id (reusing a well-formed X-Request-ID) and starts its trace"""
+    tracer.start_trace(
+        request.endpoint or 'nutrition',
+        request_id=Tracer.request_id_from(request.headers.get('X-Request-ID')),
+        method=request.method,
+        path=request.path
+    )
+
+@nutrition_bp.after_request
+def finish_request_trace(response):
+    """Returns the request id to the caller and closes the trace"""
+    trace = tracer.finish_trace(status_code=response.status_code)
+    if trace is not None:
+        response.headers['X-Request-ID'] = trace.request_id
+    return response
+
+@nutrition_bp.teardown_request
+def abort_request_trace(error):
+    """Closes the trace of a request that ended in an unhandled exception"""
+    tracer.finish_trace(error=f"{type(error).__name__}: {error}" if error else None)
+
+# Profile downloads are neither profiled nor sampled themselves
+PROFILE_ENDPOINTS = {
+    'nutrition.list_profiles', 'nutrition.get_profile', 'nutrition.get_sampled_stacks', 'nutrition.reset_sampled_stacks'
+}
+
+def presents_token(token: str, supplied: Optional[str]) -> bool:
+    """Whether a configured (non-empty) token was supplied, compared in constant time"""
+    return bool(token and supplied) and hmac.compare_digest(supplied.encode(), token.encode())
+
+def profiling_authorized() -> bool:
+    """Whether the request presents the profiling token (X-Profile header or ?profile=)"""
+    return presents_token(Config.PROFILING_TOKEN, request.headers.get('X-Profile') or request.args.get('profile'))
+
+def require_profiling_token() -> None:
+    """Hides the profiling endpoints from callers without the token"""
+    if not profiling_authorized():
+        raise APIException("Not found", HTTPStatus.NOT_FOUND, "not_found")
+
+@nutrition_bp.before_request
+def start_profiling():
+    """Runs this request under cProfile when the caller presents the profiling token"""
+    if request.endpoint in PROFILE_ENDPOINTS:
+        return
+    if stack_sampler:
+        stack_sampler.ensure_started()
+        stack_sampler.track(request.endpoint or 'nutrition')
+    if profiling_authorized():
+        g.profile = request_profiler.start()
+
+@nutrition_bp.after_request
+def stop_profiling(response):
+    """Saves the request's profile and tells the caller where to download it"""
+    if 'profile' not in g:
+        return response
+    profile = g.pop('profile')
+    if profile is None:
+        response.headers['X-Profile-Status'] = 'busy'
+        return response
+    profile_id = request_profiler.stop(profile)
+    response.headers['X-Profile-ID'] = profile_id
+    response.headers['X-Profile-URL'] = url_for('nutrition.get_profile', profile_id=profile_id)
+    return response
+
+@nutrition_bp.teardown_request
+def release_profiling(error):
+    """Stops sampling the thread, and drops the profile of a request that failed unhandled"""
+    if stack_sampler:
+        stack_sampler.untrack()
+    profile = g.pop('profile', None)
+    if profile is not None:
+        request_profiler.stop(profile)
+
+@nutrition_bp.before_request
+def enforce_rate_limit():
+    """Charges the endpoint's cost against the client and global token buckets"""
+    if not current_app.config.get('RATE_LIMIT_ENABLED', Config.RATE_LIMIT_ENABLED):
+        return
+    cost = ENDPOINT_COSTS.get(request.endpoint)
+    if cost:
+        rate_limiter.admit(client_id(), cost)
+
+# Priority class per endpoint under overload; requests the result cache can answer are "cached"
+ENDPOINT_PRIORITIES = {
+    'nutrition.calculate_nutrition': 'text',
+    'nutrition.analyze_image': 'image',
+    'nutrition.submit_image_job': 'image',
+    'nutrition.get_food_suggestions': 'suggestions'
+}
+
+def request_priority() -> Optional[str]:
+    """The request's priority class, or None for endpoints that are never shed"""
+    priority = ENDPOINT_PRIORITIES.get(request.endpoint)
+    if priority == 'text':
+        data = request.args if request.method == 'GET' else request.get_json(silent=True) or {}
+        food_item = str(data.get("food_item", "")).lower().strip()
+        if openai_service.has_cached_nutrition(food_item, data.get("quantity"), data.get("unit")):
+            return 'cached'
+    elif priority == 'suggestions' and openai_service.has_cached_suggestions():
+        return 'cached'
+    return priority
+
+@nutrition_bp.before_request
+def admit_by_priority():
+    """Holds the request for a slot by priority class, or sheds it with a 503 under overload"""
+    if not overload_controller or not current_app.config.get('OVERLOAD_ENABLED', Config.OVERLOAD_ENABLED):
+        return
+    priority = request_priority()
+    if priority:
+        overload_controller.acquire(priority)
+        g.overload_slot = True
+
+@nutrition_bp.teardown_request
+def release_priority_slot(error):
+    """Frees the request's slot"""
+    if g.pop('overload_slot', False):
+        overload_controller.release()
 
 def validate_input(food_item: Optional[str], quantity: Any, unit: Optional[str]) -> None:
     """
@@ -41,6 +205,7 @@ def validate_input(food_item: Optional[str], quantity: Any, unit: Optional[str])
         raise APIException("Invalid unit of measurement", HTTPStatus.BAD_REQUEST, "validation_error")
 
 @nutrition_bp.route('/get_food_suggestions', methods=['GET'])
+@conditional(max_age=Config.SUGGESTIONS_MAX_AGE)
 def get_food_suggestions():
     """
     Endpoint to fetch food suggestions from OpenAI
@@ -48,7 +213,7 @@ def get_food_suggestions():
         JSON response containing food suggestions
     """
     try:
-        suggestions = openai_service.get_food_suggestions()
+        suggestions = openai_service.get_food_suggestions(deadline=Deadline(Config.REQUEST_DEADLINE_SECONDS))
         return jsonify(suggestions.model_dump())
 
     except Exception as e:
@@ -58,76 +223,45 @@ def get_food_suggestions():
             "food_suggestions_error"
         )
 
-@nutrition_bp.route('/calculate_nutrition', methods=['POST'])
+@nutrition_bp.route('/calculate_nutrition', methods=['GET', 'POST'])
+@conditional()
 def calculate_nutrition():
     """
     Endpoint to calculate nutrition information for a given food item
+    POST takes a JSON body; GET takes the same fields as query args and carries an ETag,
+    so browsers holding a result can revalidate it with If-None-Match and get a 304
     Returns:
         JSON response containing nutrition data, health score, and recipe videos if applicable
     """
+    deadline = Deadline(Config.REQUEST_DEADLINE_SECONDS)
     try:
-        data = request.get_json()
-        if not data:
-            raise APIException("No data provided", HTTPStatus.BAD_REQUEST, "validation_error")
+        if request.method == 'GET':
+            data = request.args
+            quantity = request.args.get("quantity", type=float)
+        else:
+            data = request.get_json()
+            if not data:
+                raise APIException("No data provided", HTTPStatus.BAD_REQUEST, "validation_error")
+            quantity = data.get("quantity")
 
         food_item = data.get("food_item", "").lower().strip()
-        quantity = data.get("quantity")
         quantity_unit = data.get("unit")
 
         # Validate input
         validate_input(food_item, quantity, quantity_unit)
 
-        # Get nutrition information
-        nutrition_data = openai_service.get_nutrition_info(food_item, quantity, quantity_unit)
-        
-        # Calculate health score
-        health_score = analyzer.calculate_health_score(nutrition_data.model_dump())
-        
-        # Get recipe URLs if needed
+        # Get nutrition information and calculate the health score
+        nutrition_data = openai_service.get_nutrition_info(food_item, quantity, quantity_unit, deadline=deadline)
+        response_data, _ = score_food_item(food_item, quantity, quantity_unit, nutrition_data)
+
+        # Get recipe URLs (recipe videos for dishes, general videos otherwise) if time allows;
+        # inputs that are not food get none
+        skipped = []
         recipe_urls = None
-        youtube_service = YouTubeService(api_key=Config.YOUTUBE_API_KEY)
-        video_info_list = None
-        if nutrition_data.is_recipe:
-            video_info_list = youtube_service.get_recipe_videos(True, food_item)
-            if video_info_list:  # Check if videos were found
-                recipe_urls = [
-                    {
-                        "title": video.title,
-                        "url": video.url,
-                        "id": video.id
-                    }
-                    for video in video_info_list
-                ]
-        else:
-            video_info_list = youtube_service.get_recipe_videos(False, food_item)
-            if video_info_list:
-                recipe_urls = [
-                    {
-                        "title": video.title,
-                        "url": video.url,
-                        "id": video.id
-                    }
-                    for video in video_info_list
-                ]   
-        # Prepare the final response
-        response_data = {
-            "food_item": food_item,
-            "quantity": quantity,
-            "unit": quantity_unit,
-            "nutrition_info": nutrition_data.model_dump(),
-            "insight": nutrition_data.insight,
-            "is_recipe": nutrition_data.is_recipe,
-            "is_valid_food": nutrition_data.is_valid_food,
-            "recipe_urls": recipe_urls,
-            "health_score": {
-                "score": health_score.score,
-                "message": health_score.message,
-                "color": health_score.color
-            },
-            "status": "success"
-        }
+        if nutrition_data.is_valid_food:
+            recipe_urls = get_recipe_urls(nutrition_data.is_recipe, food_item, deadline, skipped)
 
-        return jsonify(response_data)
+        return json_response(complete_response(response_data, recipe_urls, skipped))
 
     except APIException as e:
         raise e
@@ -138,18 +272,235 @@ def calculate_nutrition():
             "server_error"
         )
 
-@nutrition_bp.route('/analyze_image', methods=['POST'])
-def analyze_image():
+def get_recipe_urls(is_recipe: bool, food_item: str, deadline: Deadline, skipped: List[str]) -> Optional[List[dict]]:
     """
-    Endpoint to analyze an image and return nutrition information
+    Looks up recipe videos, an optional stage that is left out when the request is short of time
+    Args:
+        skipped: Names of left-out response parts; "recipe_urls" is added when skipped
     Returns:
-        JSON response containing nutrition data, health score, and recipe videos if applicable
+        The videos' title, url and id, or None if none were found or the stage was skipped
     """
-    try:
-        if 'image' not in request.files:
+    if not deadline.allows(Config.DEADLINE_VIDEO_MIN_SECONDS):
+        current_app.logger.info(f"Skipping recipe videos for {food_item}: {deadline}")
+        skipped.append("recipe_urls")
+        return None
+    video_info_list = youtube_service.get_recipe_videos(is_recipe, food_item, deadline=deadline)
+    if not video_info_list:
+        return None
+    return [
+        {
+            "title": video.title,
+            "url": video.url,
+            "id": video.id
+        }
+        for video in video_info_list
+    ]
+
+def enrich_row(row: Dict[str, Any], videos: bool = False) -> dict:
+    """
+    Looks up and scores one bulk row, through the same caches as /calculate_nutrition
+    Args:
+        row: Mapping with food_item, quantity and unit
+        videos: Also look up recipe videos for the row
+    Returns:
+        The row's /calculate_nutrition response data
+    """
+    food_item = str(row.get("food_item") or "").lower().strip()
+    quantity = row.get("quantity")
+    unit = str(row.get("unit") or "").strip()
+    validate_input(food_item, quantity, unit)
+    quantity = float(quantity)
+
+    deadline = Deadline(Config.REQUEST_DEADLINE_SECONDS)
+    nutrition_data = openai_service.get_nutrition_info(food_item, quantity, unit, deadline=deadline)
+    response_data, _ = score_food_item(food_item, quantity, unit, nutrition_data)
+    skipped = []
+    recipe_urls = None
+    if videos and nutrition_data.is_valid_food:
+        recipe_urls = get_recipe_urls(nutrition_data.is_recipe, food_item, deadline, skipped)
+    return complete_response(response_data, recipe_urls, skipped)
+
+def bulk_admission(client: str) -> Callable[[Dict[str, Any]], None]:
+    """
+    Paces bulk rows through the rate limiter, waiting for tokens instead of rejecting the row
+    Rows the caches can answer are not charged, as when logging a meal. A client whose
+    bucket can never refill ends the run with a RATE_LIMITED line naming the row to resume from.
+    """
+    def admit(row: Dict[str, Any]) -> None:
+        food_item = str(row.get("food_item") or "")
+        if openai_service.has_cached_nutrition(food_item, row.get("quantity"), str(row.get("unit") or "").strip()):
+            return
+        while True:
+            wait = rate_limiter.try_acquire(client, Config.RATE_LIMIT_TEXT_COST)
+            if wait == 0:
+                return
+            if wait == math.inf:
+                raise APIException.rate_limited(3600)
+            time.sleep(min(wait, 1.0))
+    return admit
+
+@nutrition_bp.route('/calculate_nutrition/bulk', methods=['POST'])
+def calculate_nutrition_bulk():
+    """
+    Enriches a CSV or NDJSON file of (food_item, quantity, unit) rows, streaming one NDJSON
+    line per row as it finishes (rows finish out of order; each line carries its "row")
+    The file is the request body (Content-Type text/csv or application/x-ndjson) or a
+    multipart "file" upload. Query args: format (csv or ndjson, when the type does not
+    tell), start_row (to resume an interrupted run: the last "done_through" + 1), videos
+    (true to add recipe videos)
+    """
+    # Replaces MAX_CONTENT_LENGTH for this request; the body is streamed, never held whole
+    request.max_content_length = Config.BULK_MAX_UPLOAD_BYTES
+    if request.mimetype == 'multipart/form-data':
+        if 'file' not in request.files:
+            raise APIException("No file provided", HTTPStatus.BAD_REQUEST, "validation_error")
+        upload = request.files['file']
+        # Uploads are closed when the view returns, before the rows stream out
+        stream, fmt = spool_upload(upload), detect_format(upload.filename, upload.mimetype)
+    else:
+        stream, fmt = request.stream, detect_format(None, request.mimetype)
+    fmt = request.args.get('format') or fmt
+    if fmt not in ('csv', 'ndjson'):
+        raise APIException("Send the rows as CSV or NDJSON", HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "validation_error")
+    start_row = request.args.get('start_row', 1, type=int)
+    videos = request.args.get('videos', 'false').lower() == 'true'
+
+    rate_limited = current_app.config.get('RATE_LIMIT_ENABLED', Config.RATE_LIMIT_ENABLED)
+    pipeline = BulkPipeline(
+        current_app._get_current_object(),
+        lambda row: enrich_row(row, videos),
+        concurrency=Config.BULK_CONCURRENCY,
+        max_rows=Config.BULK_MAX_ROWS,
+        admit=bulk_admission(client_id()) if rate_limited else None
+    )
+
+    def lines():
+        try:
+            for result in pipeline.run(read_rows(stream, fmt), start_row=max(start_row, 1)):
+                yield dumps_json(result) + b"\n"
+        finally:
+            stream.close()
+
+    # Proxies must pass each line on as it is written
+    return current_app.response_class(
+        stream_with_context(lines()), mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'}
+    )
+
+@nutrition_bp.route('/client_config', methods=['GET'])
+@conditional(max_age=Config.CLIENT_CONFIG_MAX_AGE)
+def get_client_config():
+    """
+    Settings the browser applies before calling the API
+    Returns:
+        JSON with the image downscaling target (longest side in pixels, encoder quality
+        and type), the upload size limit and the browser result cache settings
+    """
+    return jsonify({
+        "image": {
+            "max_dimension": Config.CLIENT_IMAGE_MAX_DIMENSION,
+            "quality": Config.CLIENT_IMAGE_QUALITY,
+            "mime_type": Config.CLIENT_IMAGE_MIME_TYPE,
+            "max_upload_bytes": current_app.config.get('MAX_CONTENT_LENGTH') or Config.MAX_UPLOAD_BYTES
+        },
+        "results": {
+            # Changes with the prompts and models behind a result; older browser entries are dropped
+            "version": cache_version(openai_service.versions['nutrition'], youtube_service.version),
+            "max_entries": Config.CLIENT_RESULT_CACHE_MAX_ENTRIES,
+            "revalidate_after": Config.CLIENT_RESULT_CACHE_REVALIDATE_SECONDS
+        },
+        "status": "success"
+    })
+
+@nutrition_bp.route('/stats/models', methods=['GET'])
+def get_model_stats():
+    """
+    Reports upstream calls, latency, tokens and estimated cost per model tier for this worker,
+    plus hedging counts when hedging is enabled, rate-limit headroom per API key and the
+    load shedder's slots, queue and shed classes
+    Hidden (404) unless the request sends X-Stats-Token with STATS_TOKEN
+    """
+    if not presents_token(Config.STATS_TOKEN, request.headers.get('X-Stats-Token')):
+        raise APIException("Not found", HTTPStatus.NOT_FOUND, "not_found")
+    stats = {"tiers": openai_service.router.stats(), "keys": openai_service.key_pool.stats(), "status": "success"}
+    if openai_service.router.hedger:
+        stats["hedging"] = openai_service.router.hedger.stats()
+    if overload_controller:
+        stats["overload"] = overload_controller.stats()
+    return jsonify(stats)
+
+@nutrition_bp.route('/profiles', methods=['GET'])
+def list_profiles():
+    """Lists the saved request profiles of this host, newest first (profiling token required)"""
+    require_profiling_token()
+    return jsonify({"profiles": request_profiler.list(), "status": "success"})
+
+@nutrition_bp.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id: str):
+    """
+    Downloads a saved request profile (profiling token required)
+    Query args: format ("prof" for the raw cProfile file for pstats/snakeviz, default a text
+    table), sort (pstats sort key, default cumulative)
+    """
+    require_profiling_token()
+    if not request_profiler.exists(profile_id):
+        raise APIException("Profile not found", HTTPStatus.NOT_FOUND, "not_found")
+    if request.args.get('format') == 'prof':
+        return send_file(request_profiler.path(profile_id), mimetype='application/octet-stream',
+                         as_attachment=True, download_name=f"{profile_id}.prof")
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in {'cumulative', 'tottime', 'calls', 'ncalls', 'time'}:
+        raise APIException("Unsupported sort key", HTTPStatus.BAD_REQUEST, "validation_error")
+    return current_app.response_class(request_profiler.report(profile_id, sort), mimetype='text/plain')
+
+@nutrition_bp.route('/profiles/sampler', methods=['GET'])
+def get_sampled_stacks():
+    """
+    Hot stacks collected by the background sampler in this worker (profiling token required)
+    Query args: format ("collapsed" for flame graph tools, default JSON), limit
+    """
+    require_profiling_token()
+    if stack_sampler is None:
+        raise APIException("The stack sampler is disabled", HTTPStatus.NOT_FOUND, "not_found")
+    if request.args.get('format') == 'collapsed':
+        return current_app.response_class(stack_sampler.collapsed(), mimetype='text/plain')
+    samples, stacks = stack_sampler.top(request.args.get('limit', 50, type=int))
+    return jsonify({
+        "interval_ms": stack_sampler.interval * 1000,
+        "samples": samples,
+        "stacks": [{"stack": stack.split(';'), "samples": count} for stack, count in stacks],
+        "status": "success"
+    })
+
+@nutrition_bp.route('/profiles/sampler', methods=['DELETE'])
+def reset_sampled_stacks():
+    """Clears the sampler's aggregate (profiling token required)"""
+    require_profiling_token()
+    if stack_sampler:
+        stack_sampler.reset()
+    return jsonify({"status": "success"})
+
+def validate_image_upload():
+    """
+    Validates the multipart image upload of the current request
+    Returns:
+        The uploaded file, rewound to the start
+    Raises:
+        APIException: If the image is missing, empty, too large or not a readable image
+    """
+    with tracer.span('validate_image', content_length=request.content_length or 0):
+        # Reject oversized uploads from Content-Length before reading the body
+        max_bytes = current_app.config.get('MAX_CONTENT_LENGTH') or Config.MAX_UPLOAD_BYTES
+        if request.content_length is not None and request.content_length > max_bytes:
+            raise APIException.upload_too_large(max_bytes)
+        try:
+            files = request.files
+        except RequestEntityTooLarge:
+            raise APIException.upload_too_large(max_bytes)
+
+        if 'image' not in files:
             raise APIException.missing_image()
         
-        file = request.files['image']
+        file = files['image']
         if file.filename == '':
             raise APIException.empty_image()
         
@@ -157,72 +508,110 @@ def analyze_image():
         if not file.content_type.startswith('image/'):
             raise APIException.invalid_file_type(file.content_type)
             
-        # Validate image can be opened
-        try:
-            Image.open(file)
-            file.seek(0)  # Reset file pointer after checking
-        except UnidentifiedImageError:
-            raise APIException.invalid_image_format()
-        
-        # Analyze image with OpenAI using the image data
-        # Get food item from image
-        food_info = openai_service.get_food_item_from_image(file)
-        # Validate input
-        validate_input(food_info.food_item, food_info.quantity, food_info.unit)
-        # Get nutrition info using existing function
-        nutrition_data = openai_service.get_nutrition_info(
-            food_info.food_item, 
-            float(food_info.quantity), 
-            food_info.unit
-        )
-            
-        # Calculate health score
-        health_score = analyzer.calculate_health_score(nutrition_data.model_dump())
-            
-        # Get recipe URLs if needed
-        recipe_urls = None
-        youtube_service = YouTubeService(api_key=Config.YOUTUBE_API_KEY)
-        video_info_list = None
-        if nutrition_data.is_recipe:
-            video_info_list = youtube_service.get_recipe_videos(True, food_info.food_item)
-            if video_info_list:
-                recipe_urls = [
-                    {
-                        "title": video.title,
-                        "url": video.url,
-                        "id": video.id
-                    }
-                    for video in video_info_list
-                ]
-        else:
-            video_info_list = youtube_service.get_recipe_videos(False, food_info.food_item)
-            if video_info_list:
-                recipe_urls = [
-                    {
-                        "title": video.title,
-                        "url": video.url,
-                        "id": video.id
-                    }
-                    for video in video_info_list
-                ]   
-        # Prepare the final response
-        response_data = {
-            "food_item": food_info.food_item,
-            "quantity": float(food_info.quantity),
-            "unit": food_info.unit,
-            "nutrition_info": nutrition_data.model_dump(),
-            "insight": nutrition_data.insight,
-            "is_recipe": nutrition_data.is_recipe,
-            "is_valid_food": nutrition_data.is_valid_food,
-            "recipe_urls": recipe_urls,
-            "health_score": {
-                "score": health_score.score,
-                "message": health_score.message,
-                "color": health_score.color
-            },
-            "status": "success"
-        }
-        return jsonify(response_data)
+        # Validate image can be opened and its dimensions from the header, before any decode
+        check_image_header(file, Config.MAX_IMAGE_PIXELS)
+        return file
+
+def score_food_item(food_item: str, quantity: float, unit: str, nutrition_data) -> Tuple[dict, NutritionRecord]:
+    """
+    Scores one food item's nutrition, dumping the model once for both the score and the response
+    Returns:
+        The item's part of an analysis response and its parsed NutritionRecord
+    """
+    nutrition_info = nutrition_data.model_dump()
+    record = NutritionRecord.from_dump(nutrition_info)
+    health_score = analyzer.calculate_health_score(record)
+    return {
+        "food_item": food_item,
+        "quantity": quantity,
+        "unit": unit,
+        "nutrition_info": nutrition_info,
+        "insight": nutrition_data.insight,
+        "is_recipe": nutrition_data.is_recipe,
+        "is_valid_food": nutrition_data.is_valid_food,
+        "health_score": asdict(health_score)
+    }, record
+
+def summarize_plate(scored_items: List[Tuple[dict, NutritionRecord]]) -> dict:
+    """
+    Totals several scored food items into one plate, scored as a whole
+    Invalid items are listed but left out of the totals.
+    """
+    items = [item for item, _ in scored_items]
+    valid = [(item, record) for item, record in scored_items if item["is_valid_food"]] or scored_items
+    totals = NutritionRecord.total(record for _, record in valid)
+    insight = " ".join(item["insight"] for item, _ in valid if item["insight"])
+    health_score = analyzer.calculate_health_score(totals)
+    return {
+        "food_item": ", ".join(item["food_item"] for item in items),
+        "quantity": 1.0,
+        "unit": "plate",
+        "nutrition_info": totals.to_display(insight),
+        "insight": insight,
+        "is_recipe": totals.is_recipe,
+        "is_valid_food": any(item["is_valid_food"] for item in items),
+        "health_score": asdict(health_score),
+        "items": items
+    }
+
+def complete_response(response_data: dict, recipe_urls: Optional[List[dict]], skipped: List[str]) -> dict:
+    """
+    Adds the recipe videos and the skipped stages to a scored result
+    Shared by /calculate_nutrition and the image pipeline, so both return the same shape.
+    """
+    response_data["recipe_urls"] = recipe_urls
+    response_data["skipped"] = skipped
+    response_data["status"] = "success"
+    return response_data
+
+def analyze_image_data(image_file, deadline: Optional[Deadline] = None) -> dict:
+    """
+    Runs the image pipeline: vision, nutrition, health score and videos
+    Shared by the synchronous endpoint and background jobs. A photo of a single food
+    keeps the single-item response; a plate with several foods (e.g. a thali) also
+    returns every scored item under "items", with totals and an overall score on top.
+    Args:
+        image_file: Validated image file object
+        deadline: Time budget for all upstream calls (default: a fresh IMAGE_DEADLINE_SECONDS)
+    Returns:
+        The response data for the analyzed image
+    """
+    deadline = deadline or Deadline(Config.IMAGE_DEADLINE_SECONDS)
+    # Detect every food item on the plate in one vision call
+    detections = openai_service.get_food_items_from_image(image_file, deadline=deadline)
+    for detection in detections:
+        validate_input(detection.food_item, detection.quantity, detection.unit)
+    # Resolve nutrition for all detections in one batched pass
+    nutrition_list = openai_service.get_nutrition_batch(
+        [(detection.food_item, float(detection.quantity), detection.unit) for detection in detections],
+        deadline=deadline
+    )
+    scored_items = [
+        score_food_item(detection.food_item, float(detection.quantity), detection.unit, nutrition_data)
+        for detection, nutrition_data in zip(detections, nutrition_list)
+    ]
+    items = [item for item, _ in scored_items]
+    response_data = items[0] if len(items) == 1 else summarize_plate(scored_items)
+
+    # Get recipe URLs for the main item only (recipe videos for dishes, general videos otherwise)
+    main_item = next((item for item in items if item["is_valid_food"]), items[0])
+    skipped = []
+    recipe_urls = None
+    if main_item["is_valid_food"]:
+        recipe_urls = get_recipe_urls(main_item["is_recipe"], main_item["food_item"], deadline, skipped)
+    return complete_response(response_data, recipe_urls, skipped)
+
+@nutrition_bp.route('/analyze_image', methods=['POST'])
+def analyze_image():
+    """
+    Endpoint to analyze an image and return nutrition information
+    Returns:
+        JSON response containing nutrition data, health score, and recipe videos if applicable
+    """
+    deadline = Deadline(Config.IMAGE_DEADLINE_SECONDS)
+    try:
+        file = validate_image_upload()
+        return json_response(analyze_image_data(file, deadline))
         
     except ValueError as ve:
         raise APIException(
@@ -232,7 +621,7 @@ def analyze_image():
         )
     except APIException as ae:
         current_app.logger.error(f"API Exception in analyze_image: {ae}")
-        return jsonify(ae.to_dict()), ae.status_code
+        return jsonify(ae.to_dict()), ae.status_code, ae.headers
 
     except Exception as e:
         current_app.logger.error(f"Unexpected error in analyze_image: {str(e)}")
@@ -244,3 +633,44 @@ def analyze_image():
         )
         return jsonify(error.to_dict()), error.status_code
 
+@nutrition_bp.route('/analyze_image/jobs', methods=['POST'])
+def submit_image_job():
+    """
+    Queues an image for background analysis instead of holding the request open
+    Returns:
+        202 with the job id and the URL to poll for its result
+    """
+    file = validate_image_upload()
+    # The upload is gone once this request ends, so the job gets its own (spooled) copy
+    image = spool_upload(file)
+    job_id = job_queue.submit(current_app._get_current_object(), analyze_image_data, image)
+    status_url = url_for('nutrition.get_image_job', job_id=job_id)
+    return jsonify({
+        "job_id": job_id,
+        "status": QUEUED,
+        "status_url": status_url
+    }), HTTPStatus.ACCEPTED, {"Location": status_url}
+
+@nutrition_bp.route('/analyze_image/jobs/<job_id>', methods=['GET'])
+def get_image_job(job_id: str):
+    """
+    Returns a job's status, plus its result or error once finished
+    Query args: wait (seconds to long-poll for completion, capped by JOB_LONG_POLL_MAX_SECONDS)
+    Polls are cheap reads and take no overload slot; the wait is skipped, answering at once,
+    while the worker is shedding load or JOB_LONG_POLL_MAX_WAITERS polls are already waiting.
+    """
+    try:
+        wait = min(max(float(request.args.get("wait", 0)), 0.0), Config.JOB_LONG_POLL_MAX_SECONDS)
+    except ValueError:
+        raise APIException("wait must be a number of seconds", HTTPStatus.BAD_REQUEST, "validation_error")
+    shedding = overload_controller is not None and overload_controller.is_shedding()
+    if wait and not shedding and long_poll_slots.acquire(blocking=False):
+        try:
+            job = job_queue.store.wait(job_id, wait)
+        finally:
+            long_poll_slots.release()
+    else:
+        job = job_queue.store.get(job_id)
+    if job is None:
+        raise APIException("Job not found or expired", HTTPStatus.NOT_FOUND, "not_found")
+    return json_response(job)
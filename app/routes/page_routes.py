@@ -1,27 +1,90 @@
-from flask import Blueprint, render_template, send_from_directory, current_app
+from flask import Blueprint, render_template, send_from_directory, current_app, request, make_response, url_for
+import hashlib
+import json
+import mimetypes
 import os
+from app.config import Config
+from app.constants.asset_constant import (
+    ASSET_SOURCES,
+    ASSET_DIST_DIR,
+    IMMUTABLE_MAX_AGE,
+    WELL_KNOWN_MAX_AGE,
+    PRECOMPRESSED_ENCODINGS
+)
 
 page_bp = Blueprint('page', __name__)
 
-# Add your routes here 
+# Add your routes here
 @page_bp.route('/')
 def index():
     return render_template('index.html')
 
 @page_bp.route('/favicon.ico')
 def favicon():
-    print(f"favicon requested from {current_app.root_path}")
     return send_from_directory(
         os.path.join(current_app.root_path, 'static/favicon'),
-        'favicon.ico', 
-        mimetype='image/x-icon'
+        'favicon.ico',
+        mimetype='image/x-icon',
+        max_age=WELL_KNOWN_MAX_AGE
     )
 
 @page_bp.route('/site.webmanifest')
 def webmanifest():
-    print(f"webmanifest requested from {os.path.join(current_app.root_path, 'static')}")
     return send_from_directory(
         os.path.join(current_app.root_path, 'static'),
         'site.webmanifest',
-        mimetype='application/manifest+json'
-    )
\ No newline at end of file
+        mimetype='application/manifest+json',
+        max_age=WELL_KNOWN_MAX_AGE
+    )
+
+@page_bp.route('/sw.js')
+def service_worker():
+    """
+    Serves the service worker from the site root so it controls every page
+    The precache list is the app shell: the page, the web manifest and every static
+    asset, resolved through the build manifest to fingerprinted URLs. The version is a
+    hash of those URLs and of the files behind them (hashed once at startup by
+    register_asset_handlers), so any rebuilt asset or edited static file makes browsers
+    install a fresh shell after the next deploy.
+    """
+    precache = [url_for('page.index'), url_for('page.webmanifest')]
+    precache.extend(url_for('static', filename=source) for source in ASSET_SOURCES)
+    digest = hashlib.sha256(json.dumps(
+        [Config.CACHE_VERSION, precache, current_app.extensions['asset_digest']]
+    ).encode())
+
+    response = make_response(render_template(
+        'sw.js',
+        version=digest.hexdigest()[:12],
+        precache=precache,
+        max_results=Config.SERVICE_WORKER_RESULT_ENTRIES
+    ))
+    response.mimetype = 'application/javascript'
+    # Browsers must always check for a new worker; the shell itself is versioned
+    response.cache_control.no_cache = True
+    return response
+
+@page_bp.route(f'/static/{ASSET_DIST_DIR}/<path:filename>')
+def fingerprinted_asset(filename):
+    """
+    Serves build output with immutable caching, preferring a precompressed variant
+    (brotli, then gzip) when the client accepts it
+    """
+    dist_folder = os.path.join(current_app.static_folder, ASSET_DIST_DIR)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    encoding = None
+    for candidate, suffix in PRECOMPRESSED_ENCODINGS.items():
+        if request.accept_encodings[candidate] and os.path.isfile(os.path.join(dist_folder, filename + suffix)):
+            encoding = candidate
+            break
+
+    served = filename + PRECOMPRESSED_ENCODINGS[encoding] if encoding else filename
+    response = send_from_directory(dist_folder, served, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+    if encoding:
+        response.content_encoding = encoding
+        response.headers.pop('Content-Disposition', None)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
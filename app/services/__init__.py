@@ -1,9 +1,11 @@
 from .openai_service import OpenAIService
 from .nutrition_analyzer import NutritionAnalyzer
 from .youtube_service import YouTubeService
+from .cache_service import ResultCache
 
 __all__ = [
     'OpenAIService',
     'NutritionAnalyzer',
-    'YouTubeService'
-] 
\ No newline at end of file
+    'YouTubeService',
+    'ResultCache'
+]
\ No newline at end of file
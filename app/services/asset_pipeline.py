@@ -0,0 +1,215 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+from typing import Dict, List, Optional, Tuple
+from app.constants.asset_constant import (
+    ASSET_SOURCES,
+    ASSET_DIST_DIR,
+    ASSET_MANIFEST,
+    COMPRESSIBLE_EXTENSIONS,
+    PRECOMPRESSED_ENCODINGS
+)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:  # pragma: no cover - optional dependency
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:  # pragma: no cover - optional dependency
+    rcssmin = None
+
+# Quoted strings are copied verbatim by the fallback CSS minifier
+_CSS_STRING = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+
+def _js_line_states(lines: List[str]) -> Optional[List[Tuple[bool, bool]]]:
+    """
+    Whether each line of a script starts and ends inside a template literal or block comment
+    Returns:
+        (starts inside, ends inside) per line, or None when the scanner loses track (e.g. a
+        regex literal holding a quote), in which case the script must be left alone
+    """
+    # 'code', '{' (code inside braces, possibly a ${} expression), '`' or 'comment'
+    stack = ['code']
+    states = []
+    for line in lines:
+        starts_inside = stack[-1] in ('`', 'comment')
+        i = 0
+        while i < len(line):
+            char, top = line[i], stack[-1]
+            if top == 'comment':
+                if line.startswith('*/', i):
+                    stack.pop()
+                    i += 1
+            elif top == '`':
+                if char == '\\':
+                    i += 1
+                elif char == '`':
+                    stack.pop()
+                elif line.startswith('${', i):
+                    stack.append('{')
+                    i += 1
+            elif line.startswith('//', i):
+                break
+            elif line.startswith('/*', i):
+                stack.append('comment')
+                i += 1
+            elif char in '"\'':
+                end = i + 1
+                while end < len(line) and line[end] != char:
+                    end += 2 if line[end] == '\\' else 1
+                if end >= len(line):
+                    return None
+                i = end
+            elif char == '`':
+                stack.append('`')
+            elif char == '{':
+                stack.append('{')
+            elif char == '}' and top == '{':
+                stack.pop()
+            i += 1
+        states.append((starts_inside, stack[-1] in ('`', 'comment')))
+    return states if stack == ['code'] else None
+
+class AssetPipeline:
+    """
+    Builds minified, content-hash fingerprinted and precompressed copies of static assets
+    Writes them to static/dist together with a manifest used to rewrite template URLs
+    """
+
+    def __init__(self, static_folder: str, sources: Optional[List[str]] = None):
+        self.static_folder = static_folder
+        self.dist_folder = os.path.join(static_folder, ASSET_DIST_DIR)
+        self.sources = sources if sources is not None else ASSET_SOURCES
+        self.logger = logging.getLogger(__name__)
+
+    def build(self) -> Dict[str, str]:
+        """
+        Rebuilds the dist folder from the configured sources
+        Returns:
+            Manifest mapping source file names to fingerprinted file names
+        """
+        if os.path.isdir(self.dist_folder):
+            shutil.rmtree(self.dist_folder)
+        os.makedirs(self.dist_folder)
+
+        manifest = {}
+        for source in self.sources:
+            with open(os.path.join(self.static_folder, source), 'rb') as f:
+                content = self.minify(source, f.read())
+
+            fingerprinted = self.fingerprint(source, content)
+            self._write(fingerprinted, content)
+            if os.path.splitext(source)[1] in COMPRESSIBLE_EXTENSIONS:
+                self._write_precompressed(fingerprinted, content)
+            manifest[source] = fingerprinted
+
+        with open(os.path.join(self.dist_folder, ASSET_MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        self.logger.info("Built %d static assets into %s", len(manifest), self.dist_folder)
+        return manifest
+
+    def load_manifest(self) -> Dict[str, str]:
+        """
+        Loads the manifest written by the last build
+        Returns:
+            Manifest mapping source file names to fingerprinted file names, empty if never built
+        """
+        try:
+            with open(os.path.join(self.dist_folder, ASSET_MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def digest(self) -> str:
+        """
+        Hashes the content of every source file, so a rebuilt asset or edited static file
+        changes it whether or not a build was run. Missing sources are skipped.
+        """
+        digest = hashlib.sha256()
+        for source in self.sources:
+            path = os.path.join(self.static_folder, source)
+            if os.path.isfile(path):
+                digest.update(source.encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+        return digest.hexdigest()
+
+    @staticmethod
+    def fingerprint(source: str, content: bytes) -> str:
+        """Inserts a content hash before the extension, e.g. js/app.js -> js/app.3f2a9c1b7e4d.js"""
+        root, ext = os.path.splitext(source)
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        return f"{root}.{digest}{ext}"
+
+    @classmethod
+    def minify(cls, source: str, content: bytes) -> bytes:
+        """Minifies JS and CSS, leaving every other file type untouched."""
+        ext = os.path.splitext(source)[1]
+        if ext == '.js':
+            text = content.decode('utf-8')
+            text = rjsmin.jsmin(text) if rjsmin else cls._minify_js(text)
+            return text.encode('utf-8')
+        if ext == '.css':
+            text = content.decode('utf-8')
+            text = rcssmin.cssmin(text) if rcssmin else cls._minify_css(text)
+            return text.encode('utf-8')
+        return content
+
+    @staticmethod
+    def _minify_js(text: str) -> str:
+        """
+        Conservative fallback: drops indentation, blank lines and whole-line comments.
+        Line breaks are kept so automatic semicolon insertion is never affected, and the
+        contents of template literals are copied verbatim. A script the scanner cannot
+        follow is returned unminified.
+        """
+        source_lines = text.splitlines()
+        states = _js_line_states(source_lines)
+        if states is None:
+            return text
+        lines = []
+        for line, (starts_inside, ends_inside) in zip(source_lines, states):
+            if starts_inside:
+                # Part of a template literal (or block comment): keep every character
+                lines.append(line)
+                continue
+            stripped = line.lstrip() if ends_inside else line.strip()
+            if stripped and not stripped.startswith('//'):
+                lines.append(stripped)
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _minify_css(text: str) -> str:
+        """Fallback CSS minifier: strips comments and redundant whitespace outside strings."""
+        parts = _CSS_STRING.split(text)
+        for i in range(0, len(parts), 2):
+            part = _CSS_COMMENT.sub('', parts[i])
+            part = re.sub(r'\s+', ' ', part)
+            parts[i] = _CSS_PUNCTUATION.sub(r'\1', part)
+        return ''.join(parts).replace(';}', '}').strip()
+
+    def _write(self, name: str, content: bytes) -> None:
+        path = os.path.join(self.dist_folder, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    def _write_precompressed(self, name: str, content: bytes) -> None:
+        # mtime=0 keeps gzip output byte-identical across builds
+        self._write(name + PRECOMPRESSED_ENCODINGS['gzip'], gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            self._write(name + PRECOMPRESSED_ENCODINGS['br'], brotli.compress(content, quality=11))
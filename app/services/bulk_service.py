@@ -0,0 +1,191 @@
+import csv
+import io
+import json
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from http import HTTPStatus
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple, Union
+from app.exceptions.api_exceptions import APIException
+
+# Formats accepted by read_rows, by file extension and content type
+FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson', 'text/csv': 'csv',
+           'application/x-ndjson': 'ndjson', 'application/jsonl': 'ndjson'}
+
+Row = Union[Dict[str, Any], APIException]
+
+# Error types of the line that ends a run early; the row it names was not processed
+STOP_ERRORS = ('too_many_rows', 'RATE_LIMITED')
+
+def detect_format(name: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """'csv' or 'ndjson' from a file name or content type, or None when neither tells"""
+    if name:
+        for extension, fmt in FORMATS.items():
+            if extension.startswith('.') and name.lower().endswith(extension):
+                return fmt
+    return FORMATS.get((content_type or '').split(';')[0].strip().lower())
+
+def read_rows(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Row]]:
+    """
+    Reads (food_item, quantity, unit) rows one at a time, so any file size fits in memory
+    Args:
+        stream: Binary CSV (with a header row) or NDJSON (one object per line)
+        fmt: 'csv' or 'ndjson'
+    Yields:
+        (row number from 1, row dict) — or an APIException in place of a row that cannot be read
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='' if fmt == 'csv' else None)
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+        for number, row in enumerate(reader, start=1):
+            yield number, {key: value.strip() if isinstance(value, str) else value for key, value in row.items()}
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("not an object")
+            yield number, row
+        except ValueError as e:
+            yield number, APIException(f"Row is not a JSON object: {e}", HTTPStatus.BAD_REQUEST, "validation_error")
+
+def resume_point(lines: Iterable[str]) -> Tuple[int, Set[int]]:
+    """
+    Where to resume from the NDJSON output of earlier runs, read line by line
+    Returns:
+        (first row not known to be finished, rows after it that are already finished)
+    """
+    done_through = 0
+    finished: Set[int] = set()
+    for line in lines:
+        try:
+            result = json.loads(line)
+            number, through = int(result["row"]), int(result["done_through"])
+        except (ValueError, KeyError, TypeError):
+            # e.g. the last line of a run that was killed mid-write
+            continue
+        if result.get("error", {}).get("type") in STOP_ERRORS:
+            continue
+        finished.add(number)
+        if through > done_through:
+            done_through = through
+            finished = {row for row in finished if row > done_through}
+    return done_through + 1, {row for row in finished if row > done_through}
+
+class BulkPipeline:
+    """
+    Runs a row function over a stream of rows with bounded concurrency, yielding each result
+    as soon as it finishes
+    At most `concurrency` rows are read ahead of the results, so memory does not grow with
+    the input. Every result carries "done_through", the highest row number up to which all
+    rows are finished, so an interrupted run resumes from done_through + 1.
+    """
+
+    def __init__(
+        self,
+        app,
+        process: Callable[[Dict[str, Any]], Dict[str, Any]],
+        concurrency: int = 4,
+        max_rows: Optional[int] = None,
+        admit: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        Args:
+            app: Flask app; each row runs in its own app context
+            process: Turns a row into its result; raises APIException for a rejected row
+            max_rows: Rows processed per run (None for no limit)
+            admit: Called with each row before it is started, e.g. to pace rows through the
+                rate limiter; an APIException from it ends the run at that row
+        """
+        self.app = app
+        self.process = process
+        self.concurrency = concurrency
+        self.max_rows = max_rows
+        self.admit = admit
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, rows: Iterable[Tuple[int, Row]], start_row: int = 1, skip: Iterable[int] = ()) -> Iterator[Dict[str, Any]]:
+        """
+        Args:
+            rows: (row number, row) pairs as produced by read_rows
+            start_row: Rows numbered below this are skipped
+            skip: Further row numbers to skip (already finished in an earlier run)
+        Yields:
+            {"row": n, "done_through": m, ...result} or {"row": n, "done_through": m, "status": "error", "error": {...}}
+        """
+        self._done_through = start_row - 1
+        self._finished: Set[int] = set(number for number in skip if number >= start_row)
+        self._advance()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='bulk')
+        pending: Dict[Future, int] = {}
+        started = 0
+        try:
+            for number, row in rows:
+                if number <= self._done_through or number in self._finished:
+                    continue
+                if isinstance(row, APIException):
+                    yield self._finish(number, error=row)
+                    continue
+                if self.max_rows is not None and started >= self.max_rows:
+                    yield from self._stop(pending, number, APIException(
+                        f"Only {self.max_rows} rows are processed per run; resume from row {number}",
+                        HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "too_many_rows"
+                    ))
+                    return
+                while len(pending) >= self.concurrency:
+                    yield from self._collect(pending)
+                if self.admit:
+                    try:
+                        self.admit(row)
+                    except APIException as e:
+                        yield from self._stop(pending, number, e)
+                        return
+                pending[executor.submit(self._process_row, row)] = number
+                started += 1
+            while pending:
+                yield from self._collect(pending)
+        finally:
+            # A closed stream (client gone) drops the rows that have not started
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _stop(self, pending: Dict[Future, int], number: int, error: APIException) -> Iterator[Dict[str, Any]]:
+        """Ends the run early: finishes the rows already started, then names the row to resume from"""
+        while pending:
+            yield from self._collect(pending)
+        # Not marked finished: this row is where the next run starts
+        yield {"row": number, "done_through": self._done_through, "status": "error", "error": error.to_dict()["error"]}
+
+    def _collect(self, pending: Dict[Future, int]) -> Iterator[Dict[str, Any]]:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            number = pending.pop(future)
+            try:
+                yield self._finish(number, result=future.result())
+            except APIException as e:
+                yield self._finish(number, error=e)
+            except Exception as e:
+                self.logger.error(f"Bulk row {number} failed: {e}")
+                yield self._finish(number, error=APIException(
+                    "An unexpected error occurred", HTTPStatus.INTERNAL_SERVER_ERROR, "server_error"
+                ))
+
+    def _process_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        with self.app.app_context():
+            return self.process(row)
+
+    def _finish(self, number: int, result: Optional[Dict[str, Any]] = None, error: Optional[APIException] = None) -> Dict[str, Any]:
+        self._finished.add(number)
+        self._advance()
+        if error is not None:
+            return {"row": number, "done_through": self._done_through, "status": "error", "error": error.to_dict()["error"]}
+        return {"row": number, "done_through": self._done_through, **result}
+
+    def _advance(self) -> None:
+        while self._done_through + 1 in self._finished:
+            self._done_through += 1
+            self._finished.discard(self._done_through)
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Type, TypeVar
+from pydantic import BaseModel
+from app.config import Config
+from app.services.sqlite_store import SQLiteStore
+
+ModelT = TypeVar('ModelT', bound=BaseModel)
+
+# accessed_at is only rewritten when older than this, so hot reads stay read-only
+_TOUCH_INTERVAL = 60.0
+# Size bound is enforced every this many writes per process
+_EVICT_EVERY = 64
+
+def cache_version(*parts: Any) -> str:
+    """
+    Builds a short version tag from everything that shapes a cached result
+    (global cache version, prompt text, model name). Changing any part invalidates
+    the affected entries without touching the rest of the cache.
+    """
+    raw = json.dumps([Config.CACHE_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:12]
+
+class ResultCache(SQLiteStore):
+    """
+    Two-tier result cache shared by all worker processes on a host
+    A small per-process LRU sits in front of a SQLite database in WAL mode, which lets
+    every gunicorn worker read concurrently while one writes. Entries are namespaced,
+    versioned, expire after a TTL and are evicted least-recently-used beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        table: str = 'result_cache',
+        max_entries: int = 10000,
+        ttl: float = 7 * 24 * 3600,
+        memory_entries: int = 256
+    ):
+        super().__init__(db_path)
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.logger = logging.getLogger(__name__)
+
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._warmed = False
+
+    @classmethod
+    def from_config(cls) -> Optional['ResultCache']:
+        """Creates the application cache, or None when caching is disabled"""
+        if not Config.CACHE_ENABLED:
+            return None
+        return cls(
+            Config.CACHE_DB_PATH,
+            max_entries=Config.CACHE_MAX_ENTRIES,
+            ttl=Config.CACHE_TTL_SECONDS,
+            memory_entries=Config.CACHE_MEMORY_ENTRIES
+        )
+
+    @classmethod
+    def negative_from_config(cls) -> Optional['ResultCache']:
+        """
+        Creates the negative cache for rejected inputs (invalid foods, non-food images), or
+        None when disabled. It uses its own table, a shorter TTL and a smaller size bound so
+        a mistaken rejection soon expires and junk input cannot crowd out real results.
+        """
+        if not Config.NEGATIVE_CACHE_ENABLED:
+            return None
+        return cls(
+            Config.CACHE_DB_PATH,
+            table='negative_cache',
+            max_entries=Config.NEGATIVE_CACHE_MAX_ENTRIES,
+            ttl=Config.NEGATIVE_CACHE_TTL_SECONDS,
+            memory_entries=Config.NEGATIVE_CACHE_MEMORY_ENTRIES
+        )
+
+    @staticmethod
+    def make_key(namespace: str, version: str, *parts: Any) -> str:
+        """Builds a stable cache key from a namespace, a version tag and the call arguments"""
+        digest = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{namespace}:{version}:{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Looks a key up in memory, then on disk
+        Returns:
+            Cached JSON text or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return entry[1]
+                del self._memory[key]
+
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                f"SELECT value, expires_at, accessed_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            if now - row[2] > _TOUCH_INTERVAL:
+                with conn:
+                    conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            self.logger.warning(f"Cache read failed for {key}: {e}")
+            return None
+
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Stores JSON text under key in both tiers
+        Args:
+            key: Key from make_key
+            value: JSON text
+            ttl: Lifetime in seconds, defaults to the cache TTL
+        """
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        namespace, version = key.split(':', 2)[:2]
+        self._remember(key, value, expires_at)
+
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} "
+                    "(key, namespace, version, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, namespace, version, value, expires_at, now)
+                )
+            with self._lock:
+                self._writes += 1
+                should_evict = self._writes % _EVICT_EVERY == 0
+            if should_evict:
+                self.evict()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Cache write failed for {key}: {e}")
+
+    def get_model(self, key: str, model: Type[ModelT]) -> Optional[ModelT]:
+        """Returns the cached pydantic model for key, or None on a miss"""
+        value = self.get(key)
+        return model.model_validate_json(value) if value is not None else None
+
+    def set_model(self, key: str, value: BaseModel, ttl: Optional[float] = None) -> None:
+        self.set(key, value.model_dump_json(), ttl)
+
+    def get_models(self, key: str, model: Type[ModelT]) -> Optional[List[ModelT]]:
+        """Returns a cached list of pydantic models for key, or None on a miss"""
+        value = self.get(key)
+        return [model.model_validate(item) for item in json.loads(value)] if value is not None else None
+
+    def set_models(self, key: str, values: List[BaseModel], ttl: Optional[float] = None) -> None:
+        self.set(key, json.dumps([value.model_dump() for value in values]), ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self.logger.warning(f"Cache delete failed for {key}: {e}")
+
+    def purge_stale(self, namespace: str, version: str) -> int:
+        """
+        Drops every entry of namespace written under a different version
+        Returns:
+            Number of rows removed
+        """
+        with self._lock:
+            for key in [k for k in self._memory if k.startswith(f"{namespace}:") and not k.startswith(f"{namespace}:{version}:")]:
+                del self._memory[key]
+        try:
+            conn = self._connection()
+            with conn:
+                return conn.execute(
+                    f"DELETE FROM {self.table} WHERE namespace = ? AND version != ?", (namespace, version)
+                ).rowcount
+        except sqlite3.Error as e:
+            self.logger.warning(f"Cache purge failed for {namespace}: {e}")
+            return 0
+
+    def evict(self) -> None:
+        """Removes expired rows, then the least recently used rows beyond max_entries"""
+        conn = self._connection()
+        with conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+            count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, version TEXT NOT NULL, "
+            "value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_accessed ON {self.table} (accessed_at)")
+
+    def _on_connect(self, conn: sqlite3.Connection) -> None:
+        self._warm(conn)
+
+    def _warm(self, conn: sqlite3.Connection) -> None:
+        """Preloads the most recently used entries so a fresh worker starts with a hot front tier"""
+        with self._lock:
+            if self._warmed:
+                return
+            self._warmed = True
+        rows = conn.execute(
+            f"SELECT key, value, expires_at FROM {self.table} WHERE expires_at > ? "
+            "ORDER BY accessed_at DESC LIMIT ?",
+            (time.time(), self.memory_entries)
+        ).fetchall()
+        for key, value, expires_at in reversed(rows):
+            self._remember(key, value, expires_at)
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, List, Tuple
+from app.exceptions.api_exceptions import APIException
+from app.services.model_router import before_each_call
+from app.services.nutrition_analyzer import NutritionAnalyzer
+from app.services.openai_service import OpenAIService
+from app.services.youtube_service import YouTubeService
+
+@dataclass
+class WarmReport:
+    fetched: int = 0
+    already_cached: int = 0
+    failed: List[str] = field(default_factory=list)
+
+class _Pacer:
+    """Spaces upstream calls evenly so the warmer never exceeds calls_per_minute"""
+
+    def __init__(self, calls_per_minute: float):
+        self.interval = 60.0 / calls_per_minute if calls_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class CacheWarmer:
+    """
+    Pre-populates the nutrition and recipe video caches for a list of dishes
+    Entries already in the cache are skipped without an upstream call, so an
+    interrupted run picks up where it stopped when started again.
+    """
+
+    def __init__(
+        self,
+        app,
+        openai_service: OpenAIService,
+        youtube_service: YouTubeService,
+        analyzer: NutritionAnalyzer,
+        concurrency: int = 4,
+        calls_per_minute: float = 60,
+        retries: int = 3,
+        include_videos: bool = True
+    ):
+        self.app = app
+        self.openai_service = openai_service
+        self.youtube_service = youtube_service
+        self.analyzer = analyzer
+        self.concurrency = concurrency
+        self.retries = retries
+        self.include_videos = include_videos
+        self.pacer = _Pacer(calls_per_minute)
+        self.logger = logging.getLogger(__name__)
+        self._report_lock = threading.Lock()
+
+    def warm(self, dishes: Iterable[str], portions: List[Tuple[float, str]]) -> WarmReport:
+        """
+        Warms every (dish, quantity, unit) combination with bounded parallelism
+        Args:
+            dishes: Dish names
+            portions: (quantity, unit) pairs looked up for every dish
+        Returns:
+            WarmReport with counts of fetched, already cached and failed entries
+        """
+        report = WarmReport()
+        unique_dishes = list(dict.fromkeys(d.strip().lower() for d in dishes if d.strip()))
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self._warm_dish, dish, portions, report): dish for dish in unique_dishes}
+            for future in as_completed(futures):
+                future.result()
+        return report
+
+    def _warm_dish(self, dish: str, portions: List[Tuple[float, str]], report: WarmReport) -> None:
+        # Every model call is paced, so a lookup escalated to the standard tier is charged twice
+        with self.app.app_context(), before_each_call(lambda call_type, model: self.pacer.wait()):
+            is_recipe = None
+            for quantity, unit in portions:
+                label = f"{quantity} {unit} {dish}"
+                key = self.openai_service.cache_key('nutrition', *self.openai_service.nutrition_key_parts(dish, quantity, unit))
+                cached = self.openai_service.cache is not None and self.openai_service.cache.get(key) is not None
+                try:
+                    nutrition = self._with_retries(lambda: self.openai_service.get_nutrition_info(dish, quantity, unit))
+                except APIException as e:
+                    self.logger.warning(f"Failed to warm {label}: {e}")
+                    self._record(report, failed=label)
+                    continue
+
+                # Health scores are derived locally from the cached nutrition; scoring here
+                # only checks that the cached entry is usable
+                self.analyzer.calculate_health_score(nutrition.model_dump())
+                self._record(report, cached=cached)
+                if nutrition.is_valid_food:
+                    is_recipe = nutrition.is_recipe
+
+            if self.include_videos and is_recipe is not None:
+                key = self.youtube_service.cache_key(is_recipe, dish)
+                cached = self.youtube_service.cache is not None and self.youtube_service.cache.get(key) is not None
+                videos = self._with_retries(lambda: self.youtube_service.get_recipe_videos(is_recipe, dish), pace=not cached)
+                if videos is None:
+                    self._record(report, failed=f"videos for {dish}")
+                else:
+                    self._record(report, cached=cached)
+
+    def _with_retries(self, call, pace: bool = False):
+        """
+        Runs call, backing off on failure
+        Args:
+            pace: Pace the call itself (model calls are paced as they are made)
+        """
+        for attempt in range(self.retries):
+            if pace:
+                self.pacer.wait()
+            try:
+                return call()
+            except APIException:
+                if attempt == self.retries - 1:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def _record(self, report: WarmReport, cached: bool = False, failed: str = None) -> None:
+        with self._report_lock:
+            if failed:
+                report.failed.append(failed)
+            elif cached:
+                report.already_cached += 1
+            else:
+                report.fetched += 1
@@ -0,0 +1,154 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+from app.config import Config
+
+class Hedger:
+    """
+    Issues a second identical upstream request when the first is slower than usual
+    The hedge delay is a latency percentile of recent calls of the same kind; whichever
+    request finishes first wins and the other is abandoned (cancelled if it has not
+    started, otherwise its result is discarded; callers bound it with the request deadline
+    as its timeout). Hedges are capped at max_rate of all calls so the extra cost stays
+    bounded. Requests only start on an idle pool thread: when abandoned losers hold every
+    thread, calls run unhedged on the caller's thread instead of queueing behind them.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        max_rate: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        call_types: Optional[Iterable[str]] = None,
+        pool_size: int = 32
+    ):
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self.window = window
+        self.call_types = set(call_types) if call_types is not None else None
+        self.pool_size = pool_size
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='hedge')
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._calls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._busy = 0
+
+    @classmethod
+    def from_config(cls) -> Optional['Hedger']:
+        """Creates the hedger, or None when hedging is disabled"""
+        if not Config.HEDGE_ENABLED:
+            return None
+        return cls(
+            percentile=Config.HEDGE_PERCENTILE,
+            max_rate=Config.HEDGE_MAX_RATE,
+            min_samples=Config.HEDGE_MIN_SAMPLES,
+            call_types=[name.strip() for name in Config.HEDGE_CALL_TYPES.split(',') if name.strip()],
+            pool_size=Config.HEDGE_POOL_SIZE
+        )
+
+    def delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging calls of this kind, or None until enough samples exist"""
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        return self._percentile(samples)
+
+    def run(self, call_type: str, key: str, request: Callable[[], Any]) -> Any:
+        """
+        Runs request, hedging it if it outlives the delay for key
+        Args:
+            call_type: Route of the call; only configured call types are hedged
+            key: Latency bucket, e.g. call type and model
+            request: The upstream call; must be safe to issue twice
+        """
+        if self.call_types is not None and call_type not in self.call_types:
+            return request()
+        with self._lock:
+            self._calls += 1
+
+        start = time.perf_counter()
+        delay = self.delay(key)
+        primary = self._submit(request)
+        if primary is None:
+            # Every pool thread is held (e.g. by abandoned losers): run here rather than queue
+            result = request()
+            self._sample(key, time.perf_counter() - start)
+            return result
+        done, _ = wait([primary], timeout=delay)
+        hedge = None if done else self._submit(request, hedge=True)
+        if hedge is None:
+            result = primary.result()
+            self._sample(key, time.perf_counter() - start)
+            return result
+
+        self.logger.debug(f"Hedging {key} after {delay:.2f}s")
+        futures = [primary, hedge]
+        while futures:
+            done, pending = wait(futures, return_when=FIRST_COMPLETED)
+            winner = next(iter(done))
+            if winner.exception() is None or not pending:
+                for future in pending:
+                    future.cancel()
+                if winner is hedge and winner.exception() is None:
+                    with self._lock:
+                        self._hedge_wins += 1
+                self._sample(key, time.perf_counter() - start)
+                return winner.result()
+            # The first to finish failed; wait for the other one
+            futures = list(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'calls': self._calls,
+                'hedges': self._hedges,
+                'hedge_wins': self._hedge_wins,
+                'hedge_rate': round(self._hedges / self._calls, 4) if self._calls else 0.0,
+                'busy_threads': self._busy,
+                'delays_ms': {
+                    key: round(self._percentile(list(samples)) * 1000, 1)
+                    for key, samples in self._samples.items() if len(samples) >= self.min_samples
+                }
+            }
+
+    def _percentile(self, samples: List[float]) -> Optional[float]:
+        if len(samples) < self.min_samples:
+            return None
+        samples.sort()
+        return samples[min(len(samples) - 1, int(len(samples) * self.percentile / 100))]
+
+    def _submit(self, request: Callable[[], Any], hedge: bool = False) -> Optional[Future]:
+        """
+        Starts request on an idle pool thread, in a copy of the caller's context (so its spans
+        keep their trace parent)
+        Returns:
+            The future, or None when every pool thread is busy or, for a hedge, the hedge
+            budget is spent
+        """
+        with self._lock:
+            if self._busy >= self.pool_size:
+                return None
+            if hedge:
+                if self._hedges + 1 > self.max_rate * self._calls:
+                    return None
+                self._hedges += 1
+            self._busy += 1
+        future = self._executor.submit(contextvars.copy_context().run, request)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._busy -= 1
+
+    def _sample(self, key: str, latency: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(latency)
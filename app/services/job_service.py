@@ -0,0 +1,173 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Optional
+from app.config import Config
+from app.exceptions.api_exceptions import APIException
+from app.services.sqlite_store import SQLiteStore
+from app.utils.tracing import current_request_id, tracer
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED = {SUCCEEDED, FAILED}
+
+class JobStore(SQLiteStore):
+    """
+    Job status and results shared by all workers, so any worker can answer a poll
+    for a job that another worker is running. Rows expire after ttl seconds.
+    """
+
+    def __init__(self, db_path: str, ttl: float = 600):
+        super().__init__(db_path)
+        self.ttl = ttl
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_expires_at ON jobs (expires_at)")
+
+    def create(self) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT INTO jobs (id, status, created_at, updated_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, now, now, now + self.ttl)
+            )
+        return job_id
+
+    def update(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[Dict[str, Any]] = None) -> None:
+        """Records a status change; finished jobs keep their result for another full TTL"""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?, expires_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None,
+                 json.dumps(error) if error is not None else None, now, now + self.ttl, job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            The job's status plus its result or error, or None if unknown or expired
+        """
+        row = self._connection().execute(
+            "SELECT status, result, error FROM jobs WHERE id = ? AND expires_at > ?", (job_id, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        job = {"job_id": job_id, "status": row[0]}
+        if row[1] is not None:
+            job["result"] = json.loads(row[1])
+        if row[2] is not None:
+            job["error"] = json.loads(row[2])
+        return job
+
+    def wait(self, job_id: str, timeout: float, interval: float = 0.25) -> Optional[Dict[str, Any]]:
+        """Long-polls until the job finishes or timeout seconds pass"""
+        deadline = time.monotonic() + timeout
+        job = self.get(job_id)
+        while job is not None and job["status"] not in FINISHED and time.monotonic() < deadline:
+            time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+            job = self.get(job_id)
+        return job
+
+class JobQueue:
+    """
+    Bounded background worker pool for slow pipelines such as image analysis
+    At most workers jobs run at once and at most queue_size more wait; submissions
+    beyond that are rejected with 503 instead of piling up in memory.
+    """
+
+    def __init__(self, store: JobStore, workers: int = 4, queue_size: int = 16):
+        self.store = store
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._closed = False
+
+    @classmethod
+    def from_config(cls) -> 'JobQueue':
+        return cls(
+            JobStore(Config.JOB_DB_PATH, ttl=Config.JOB_RESULT_TTL_SECONDS),
+            workers=Config.JOB_WORKERS,
+            queue_size=Config.JOB_QUEUE_SIZE
+        )
+
+    def submit(self, app, pipeline: Callable[..., Dict[str, Any]], *args) -> str:
+        """
+        Queues pipeline(*args) to run inside an app context
+        Returns:
+            The new job id
+        Raises:
+            APIException: 503 when the queue is full
+        """
+        if self._closed or not self._slots.acquire(blocking=False):
+            raise APIException(
+                message="Too many images are being analyzed, please retry shortly",
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                error_type="JOB_QUEUE_FULL",
+                headers={"Retry-After": "5"}
+            )
+        with self._idle:
+            self._pending += 1
+        try:
+            job_id = self.store.create()
+            self._executor.submit(self._run, app, job_id, pipeline, args, current_request_id())
+        except BaseException:
+            self._finish()
+            raise
+        return job_id
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def drain(self, timeout: float) -> bool:
+        """
+        Stops accepting jobs and waits up to timeout seconds for queued and running ones
+        Returns:
+            True if every job finished in time
+        """
+        self._closed = True
+        with self._idle:
+            drained = self._idle.wait_for(lambda: self._pending == 0, timeout)
+        if not drained:
+            self.logger.warning(f"Shutting down with {self._pending} unfinished jobs")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        return drained
+
+    def _finish(self) -> None:
+        with self._idle:
+            self._pending -= 1
+            self._idle.notify_all()
+        self._slots.release()
+
+    def _run(self, app, job_id: str, pipeline: Callable[..., Dict[str, Any]], args: tuple, request_id: Optional[str] = None) -> None:
+        try:
+            # Traced as its own unit, linked to the request that submitted it
+            with app.app_context(), tracer.trace('image_job', request_id=job_id, submitted_by=request_id or ''):
+                self.store.update(job_id, RUNNING)
+                try:
+                    self.store.update(job_id, SUCCEEDED, result=pipeline(*args))
+                except APIException as e:
+                    self.store.update(job_id, FAILED, error=e.to_dict()["error"])
+                except Exception as e:
+                    self.logger.error(f"Job {job_id} failed: {e}")
+                    self.store.update(job_id, FAILED, error=APIException("An unexpected error occurred").to_dict()["error"])
+        finally:
+            self._finish()
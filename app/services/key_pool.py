@@ -0,0 +1,184 @@
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from openai import DefaultHttpxClient, OpenAI
+from app.config import Config
+
+# Durations in rate-limit headers, e.g. "20ms", "1s", "6m0s", "1h2m3.5s"
+_DURATION = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_UNIT_SECONDS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in a rate-limit reset header, or None when it is missing or malformed"""
+    if not value:
+        return None
+    parts = _DURATION.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _UNIT_SECONDS[unit] for amount, unit in parts)
+
+class PooledKey:
+    """One API key (and optional organization) with the rate-limit state last reported for it"""
+
+    def __init__(self, api_key: str, organization: Optional[str], on_response, max_retries: int = 2):
+        self.name = f"...{api_key[-4:]}" + (f"@{organization}" if organization else "")
+        self.client = OpenAI(
+            api_key=api_key,
+            organization=organization,
+            max_retries=max_retries,
+            http_client=DefaultHttpxClient(event_hooks={'response': [lambda response: on_response(self, response)]})
+        )
+        # Used while other keys remain to fail over to: they replace the SDK's retries on one key
+        self.failover_client = self.client.with_options(max_retries=0)
+        self.remaining_requests: Optional[float] = None
+        self.limit_requests: Optional[float] = None
+        self.requests_reset_at = 0.0
+        self.remaining_tokens: Optional[float] = None
+        self.limit_tokens: Optional[float] = None
+        self.tokens_reset_at = 0.0
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.calls = 0
+        self.rate_limited = 0
+
+    def headroom(self, now: float) -> float:
+        """Fraction of the request and token limits left (1.0 when unknown or already reset)"""
+        requests = 1.0
+        if self.limit_requests and now < self.requests_reset_at:
+            requests = self.remaining_requests / self.limit_requests
+        tokens = 1.0
+        if self.limit_tokens and now < self.tokens_reset_at:
+            tokens = self.remaining_tokens / self.limit_tokens
+        return max(0.0, min(requests, tokens))
+
+class KeyPool:
+    """
+    Spreads OpenAI calls over several API keys or organizations
+    Each call leases the key with the most rate-limit headroom, as read from the
+    x-ratelimit-* headers of its latest response and shared by the calls already in flight
+    on it. A key answering 429 cools down for its Retry-After (or until its limit resets)
+    and calls move to the other keys, so throughput grows with the number of keys.
+    """
+
+    def __init__(self, keys: List[str], cooldown_seconds: float = 20.0, quota_cooldown_seconds: float = 600.0):
+        if not keys:
+            raise ValueError("KeyPool needs at least one API key")
+        self.cooldown_seconds = cooldown_seconds
+        self.quota_cooldown_seconds = quota_cooldown_seconds
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.keys = []
+        for entry in keys:
+            api_key, _, organization = entry.partition('@')
+            self.keys.append(PooledKey(api_key, organization or None, self._observe))
+        self._next = 0
+
+    @classmethod
+    def from_config(cls) -> 'KeyPool':
+        """Pool over OPENAI_API_KEYS ("key" or "key@org", comma separated), else OPENAI_API_KEY"""
+        keys = [key.strip() for key in Config.OPENAI_API_KEYS.split(',') if key.strip()]
+        return cls(
+            keys or [Config.OPENAI_API_KEY],
+            cooldown_seconds=Config.OPENAI_KEY_COOLDOWN_SECONDS,
+            quota_cooldown_seconds=Config.OPENAI_KEY_QUOTA_COOLDOWN_SECONDS
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @contextmanager
+    def lease(self, exclude: Optional[List[PooledKey]] = None) -> Iterator[PooledKey]:
+        """
+        Holds the best available key for one request
+        Args:
+            exclude: Keys already tried for this call
+        """
+        key = self._acquire(exclude or [])
+        try:
+            yield key
+        finally:
+            with self._lock:
+                key.in_flight -= 1
+
+    def _acquire(self, exclude: List[PooledKey]) -> PooledKey:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [key for key in self.keys if key not in exclude] or self.keys
+            ready = [key for key in candidates if key.cooldown_until <= now]
+            if ready:
+                # Round-robin start so equally good keys share the load
+                start = self._next % len(ready)
+                self._next += 1
+                ordered = ready[start:] + ready[:start]
+                key = max(ordered, key=lambda key: key.headroom(now) / (1 + key.in_flight))
+            else:
+                # Every key is cooling down: use the one that recovers first
+                key = min(candidates, key=lambda key: key.cooldown_until)
+            key.in_flight += 1
+            key.calls += 1
+            return key
+
+    def _observe(self, key: PooledKey, response) -> None:
+        """HTTP client response hook: records a key's rate-limit headers and cools it down on 429"""
+        headers = response.headers
+        now = time.monotonic()
+        cooldown = self._cooldown(headers, response) if response.status_code == 429 else None
+        with self._lock:
+            if 'x-ratelimit-remaining-requests' in headers:
+                try:
+                    key.remaining_requests = float(headers['x-ratelimit-remaining-requests'])
+                    key.limit_requests = float(headers.get('x-ratelimit-limit-requests', 0)) or None
+                    key.remaining_tokens = float(headers.get('x-ratelimit-remaining-tokens', 0))
+                    key.limit_tokens = float(headers.get('x-ratelimit-limit-tokens', 0)) or None
+                except ValueError:
+                    key.limit_requests = key.limit_tokens = None
+                key.requests_reset_at = now + (parse_duration(headers.get('x-ratelimit-reset-requests')) or 0.0)
+                key.tokens_reset_at = now + (parse_duration(headers.get('x-ratelimit-reset-tokens')) or 0.0)
+            if cooldown is not None:
+                key.rate_limited += 1
+                key.cooldown_until = now + cooldown
+        if cooldown is not None:
+            self.logger.warning(f"OpenAI key {key.name} rate limited; cooling down for {cooldown:.1f}s")
+
+    def _cooldown(self, headers, response) -> float:
+        if 'retry-after-ms' in headers:
+            try:
+                return float(headers['retry-after-ms']) / 1000
+            except ValueError:
+                pass
+        if 'retry-after' in headers:
+            try:
+                return float(headers['retry-after'])
+            except ValueError:
+                pass
+        # A used-up billing quota does not reset with the per-minute limits
+        if b'insufficient_quota' in self._body(response):
+            return self.quota_cooldown_seconds
+        resets = [
+            parse_duration(headers.get(name))
+            for name in ('x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens')
+        ]
+        return max([reset for reset in resets if reset] or [self.cooldown_seconds])
+
+    @staticmethod
+    def _body(response) -> bytes:
+        try:
+            return response.read()
+        except Exception:
+            return b''
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-key headroom, cooldown and call counts for this process (keys shown by their position in the pool)"""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                'key': position,
+                'headroom': round(key.headroom(now), 3),
+                'cooling_down_seconds': round(max(0.0, key.cooldown_until - now), 1),
+                'in_flight': key.in_flight,
+                'calls': key.calls,
+                'rate_limited': key.rate_limited
+            } for position, key in enumerate(self.keys, start=1)]
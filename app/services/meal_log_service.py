@@ -0,0 +1,181 @@
+import json
+import sqlite3
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+from app.config import Config
+from app.services.sqlite_store import SQLiteStore
+from app.models.nutrition_record import NutritionRecord
+
+# NutritionRecord fields kept per meal and in running totals, in canonical units
+TRACKED_NUTRIENTS = (
+    'calories', 'protein', 'fat', 'saturated_fat', 'trans_fat', 'carbohydrates', 'sugar',
+    'added_sugar', 'fiber', 'sodium', 'potassium', 'calcium', 'iron', 'vitamin_a', 'vitamin_c', 'vitamin_d'
+)
+
+GRANULARITIES = ('day', 'week')
+
+_COLUMNS = list(TRACKED_NUTRIENTS)
+
+def day_period(moment) -> str:
+    """Calendar day of a date, or of a timestamp in its own UTC offset, e.g. 2026-10-19"""
+    return (moment.date() if isinstance(moment, datetime) else moment).isoformat()
+
+def week_period(moment) -> str:
+    """ISO week of a timestamp or date, e.g. 2026-W43 (sorts chronologically)"""
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+class MealLog(SQLiteStore):
+    """
+    Per-user meal log with running daily and weekly totals
+    Totals are updated in the same transaction as every insert and delete, so reading
+    a day or week is a primary-key lookup rather than a rescan of the user's history.
+    Meals are indexed by (user_id, logged_at) for time-range queries.
+    """
+
+    @classmethod
+    def from_config(cls) -> 'MealLog':
+        return cls(Config.MEAL_LOG_DB_PATH)
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        nutrient_columns = ', '.join(f"{column} REAL NOT NULL DEFAULT 0" for column in _COLUMNS)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS meals ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, logged_at REAL NOT NULL, "
+            "day TEXT NOT NULL, week TEXT NOT NULL, food_item TEXT NOT NULL, quantity REAL NOT NULL, "
+            "unit TEXT NOT NULL, health_score REAL NOT NULL, nutrition_info TEXT NOT NULL, "
+            f"{nutrient_columns})"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_meals_user_logged_at ON meals (user_id, logged_at)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS meal_totals ("
+            "user_id TEXT NOT NULL, granularity TEXT NOT NULL, period TEXT NOT NULL, "
+            "meal_count INTEGER NOT NULL, health_score_sum REAL NOT NULL, "
+            f"{nutrient_columns}, PRIMARY KEY (user_id, granularity, period))"
+        )
+
+    def add_meal(
+        self,
+        user_id: str,
+        food_item: str,
+        quantity: float,
+        unit: str,
+        nutrition_info: Dict[str, Any],
+        health_score: float,
+        logged_at: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Stores a scored nutrition result and adds it to the user's day and week totals
+        Args:
+            user_id: Owner of the meal
+            food_item: Name of the food item
+            quantity: Amount of food
+            unit: Unit of measurement
+            nutrition_info: NutritionScores.model_dump() of the result
+            health_score: Score returned with the result
+            logged_at: When the meal was eaten; its UTC offset decides the calendar day
+        Returns:
+            The stored meal
+        """
+        logged_at = logged_at or datetime.now(timezone.utc)
+        if logged_at.tzinfo is None:
+            logged_at = logged_at.replace(tzinfo=timezone.utc)
+        record = NutritionRecord.from_dump(nutrition_info)
+        values = [getattr(record, column) for column in TRACKED_NUTRIENTS]
+        day, week = day_period(logged_at), week_period(logged_at)
+
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                f"INSERT INTO meals (user_id, logged_at, day, week, food_item, quantity, unit, health_score, "
+                f"nutrition_info, {', '.join(_COLUMNS)}) VALUES ({', '.join('?' * (9 + len(_COLUMNS)))})",
+                (user_id, logged_at.timestamp(), day, week, food_item, float(quantity), unit,
+                 float(health_score), json.dumps(nutrition_info), *values)
+            )
+            self._apply(conn, user_id, day, week, 1, float(health_score), values)
+        return self.get_meal(user_id, cursor.lastrowid)
+
+    def delete_meal(self, user_id: str, meal_id: int) -> bool:
+        """
+        Removes a meal and subtracts it from the totals it contributed to
+        Returns:
+            False when the user has no meal with that id
+        """
+        conn = self._connection()
+        with conn:
+            row = conn.execute(
+                f"SELECT day, week, health_score, {', '.join(_COLUMNS)} FROM meals WHERE id = ? AND user_id = ?",
+                (meal_id, user_id)
+            ).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM meals WHERE id = ?", (meal_id,))
+            self._apply(conn, user_id, row[0], row[1], -1, -row[2], [-value for value in row[3:]])
+            conn.execute("DELETE FROM meal_totals WHERE user_id = ? AND meal_count <= 0", (user_id,))
+        return True
+
+    def get_meal(self, user_id: str, meal_id: int) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT id, logged_at, food_item, quantity, unit, health_score, nutrition_info "
+            "FROM meals WHERE id = ? AND user_id = ?",
+            (meal_id, user_id)
+        ).fetchone()
+        return self._meal_dict(row) if row else None
+
+    def list_meals(self, user_id: str, start: datetime, end: datetime, limit: int = 500) -> List[Dict[str, Any]]:
+        """Returns the user's meals with start <= logged_at < end, oldest first"""
+        rows = self._connection().execute(
+            "SELECT id, logged_at, food_item, quantity, unit, health_score, nutrition_info FROM meals "
+            "WHERE user_id = ? AND logged_at >= ? AND logged_at < ? ORDER BY logged_at LIMIT ?",
+            (user_id, start.timestamp(), end.timestamp(), limit)
+        ).fetchall()
+        return [self._meal_dict(row) for row in rows]
+
+    def totals(self, user_id: str, granularity: str, start: date, end: date) -> List[Dict[str, Any]]:
+        """
+        Returns precomputed totals for every day or ISO week between start and end (inclusive)
+        that has at least one meal
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {GRANULARITIES}")
+        period = day_period if granularity == 'day' else week_period
+        rows = self._connection().execute(
+            f"SELECT period, meal_count, health_score_sum, {', '.join(_COLUMNS)} FROM meal_totals "
+            "WHERE user_id = ? AND granularity = ? AND period >= ? AND period <= ? ORDER BY period",
+            (user_id, granularity, period(start), period(end))
+        ).fetchall()
+        return [
+            {
+                'period': row[0],
+                'meal_count': row[1],
+                'average_health_score': round(row[2] / row[1], 1),
+                'totals': {column: round(value, 2) for column, value in zip(_COLUMNS, row[3:])}
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _apply(conn, user_id: str, day: str, week: str, count: int, score: float, values: List[float]) -> None:
+        """Adds (or with negative arguments, subtracts) one meal to its day and week rows"""
+        updates = ', '.join(f"{column} = {column} + excluded.{column}" for column in _COLUMNS)
+        sql = (
+            f"INSERT INTO meal_totals (user_id, granularity, period, meal_count, health_score_sum, {', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * (5 + len(_COLUMNS)))}) "
+            "ON CONFLICT (user_id, granularity, period) DO UPDATE SET "
+            "meal_count = meal_count + excluded.meal_count, "
+            f"health_score_sum = health_score_sum + excluded.health_score_sum, {updates}"
+        )
+        for granularity, period in (('day', day), ('week', week)):
+            conn.execute(sql, (user_id, granularity, period, count, score, *values))
+
+    @staticmethod
+    def _meal_dict(row) -> Dict[str, Any]:
+        return {
+            'id': row[0],
+            'logged_at': datetime.fromtimestamp(row[1], timezone.utc).isoformat(),
+            'food_item': row[2],
+            'quantity': row[3],
+            'unit': row[4],
+            'health_score': row[5],
+            'nutrition_info': json.loads(row[6])
+        }
@@ -0,0 +1,189 @@
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from json.decoder import JSONDecodeError
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from openai import ContentFilterFinishReasonError, LengthFinishReasonError
+from pydantic import ValidationError
+from app.config import Config
+from app.services.hedging import Hedger
+from app.utils.tracing import tracer
+
+# Tiers from cheapest to most capable; a call falls back along this order
+TIERS = ('fast', 'standard')
+
+# Call type -> starting tier
+DEFAULT_ROUTES: Dict[str, str] = {
+    'suggestions': 'fast',
+    'validate': 'fast',
+    'format': 'fast',
+    'nutrition': 'fast',
+    'nutrition_recipe': 'standard',
+    'nutrition_batch': 'standard',
+    'vision': 'standard'
+}
+
+# Output that does not match the expected schema; these move the call up a tier
+SCHEMA_ERRORS = (ValidationError, JSONDecodeError, ValueError, LengthFinishReasonError, ContentFilterFinishReasonError)
+
+# Words that mark a prepared dish rather than a plain ingredient
+RECIPE_HINTS = {
+    'curry', 'masala', 'biryani', 'pulao', 'korma', 'tikka', 'paneer', 'dal', 'sambar', 'fried',
+    'stuffed', 'gravy', 'makhani', 'butter', 'sabzi', 'halwa', 'kheer', 'pizza', 'pasta', 'burger',
+    'sandwich', 'salad', 'soup', 'cake', 'with', 'and'
+}
+_WORD = re.compile(r"[a-z]+")
+
+# Called with (call type, model) before every model call made in the current context
+_before_call: ContextVar[Optional[Callable[[str, str], None]]] = ContextVar('before_model_call', default=None)
+
+@contextmanager
+def before_each_call(hook: Callable[[str, str], None]) -> Iterator[None]:
+    """Runs hook before every model call (fallbacks and escalations included) made inside the block"""
+    token = _before_call.set(hook)
+    try:
+        yield
+    finally:
+        _before_call.reset(token)
+
+def looks_like_recipe(food_item: str, unit: str) -> bool:
+    """Cheap guess whether a lookup is a prepared dish that deserves the stronger model"""
+    words = _WORD.findall(food_item.lower())
+    return unit in {'bowl', 'plate'} or len(words) > 2 or any(word in RECIPE_HINTS for word in words)
+
+def parse_pairs(value: str) -> Dict[str, str]:
+    """Parses 'a=x,b=y' into {'a': 'x', 'b': 'y'}"""
+    pairs = (item.split('=', 1) for item in value.split(',') if '=' in item)
+    return {key.strip(): val.strip() for key, val in pairs}
+
+class ModelRouter:
+    """
+    Chooses a model per call type and keeps latency, token and cost figures per tier
+    Each call type starts at its configured tier and moves to the next tier when the
+    output fails schema validation or the caller asks to escalate.
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, str],
+        routes: Optional[Dict[str, str]] = None,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        hedger: Optional[Hedger] = None
+    ):
+        self.models = models
+        self.hedger = hedger
+        self.routes = {**DEFAULT_ROUTES, **(routes or {})}
+        self.prices = prices or {}
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stats = {tier: self._empty_stats() for tier in TIERS}
+
+    @classmethod
+    def from_config(cls) -> 'ModelRouter':
+        prices = {}
+        for model, price in parse_pairs(Config.MODEL_PRICES).items():
+            input_price, _, output_price = price.partition(':')
+            prices[model] = (float(input_price), float(output_price or input_price))
+        return cls(
+            {'fast': Config.MODEL_FAST, 'standard': Config.MODEL_STANDARD},
+            routes=parse_pairs(Config.MODEL_ROUTES),
+            prices=prices,
+            hedger=Hedger.from_config()
+        )
+
+    def chain(self, call_type: str) -> List[str]:
+        """Tiers a call type may use, starting with its own"""
+        return list(TIERS[TIERS.index(self.routes[call_type]):])
+
+    def signature(self, call_type: str) -> Tuple[str, ...]:
+        """Models a call type can reach; part of cache versions so a model change invalidates"""
+        return tuple(self.models[tier] for tier in self.chain(call_type))
+
+    def call(
+        self,
+        call_type: str,
+        request: Callable[[str], Any],
+        parse: Callable[[Any], Any],
+        escalate: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Runs request(model) on the call type's tier, falling back or escalating up the chain
+        Args:
+            call_type: Key of the route to use
+            request: Sends the upstream request for a model name and returns the response
+            parse: Turns a response into the result; raises one of SCHEMA_ERRORS when it does not fit
+            escalate: Returns True when a result from a lower tier should be redone on the next one
+        Returns:
+            The parsed result of the first tier that produced an acceptable one
+        """
+        chain = self.chain(call_type)
+        for position, tier in enumerate(chain):
+            last = position == len(chain) - 1
+            model = self.models[tier]
+            hook = _before_call.get()
+            if hook:
+                hook(call_type, model)
+            start = time.perf_counter()
+            response = None
+            try:
+                with tracer.span('model_call', tier=tier, model=model):
+                    if self.hedger:
+                        response = self.hedger.run(call_type, f"{call_type}:{model}", lambda: request(model))
+                    else:
+                        response = request(model)
+                    result = parse(response)
+            except SCHEMA_ERRORS as e:
+                self._record(tier, time.perf_counter() - start, response, 'schema_failures', fallback=not last)
+                if last:
+                    raise
+                self.logger.warning(f"{call_type} output from {self.models[tier]} failed validation ({e}); falling back")
+                continue
+            except Exception:
+                self._record(tier, time.perf_counter() - start, None, 'errors')
+                raise
+
+            escalating = not last and escalate is not None and escalate(result)
+            self._record(tier, time.perf_counter() - start, response, 'calls', escalation=escalating)
+            if not escalating:
+                return result
+        raise RuntimeError("unreachable")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tier call counts, average latency, tokens and estimated cost for this process"""
+        report = {}
+        with self._lock:
+            for tier, stats in self._stats.items():
+                attempts = stats['calls'] + stats['schema_failures'] + stats['errors']
+                input_price, output_price = self.prices.get(self.models[tier], (0.0, 0.0))
+                report[tier] = {
+                    'model': self.models[tier],
+                    **{key: value for key, value in stats.items() if key != 'latency_seconds'},
+                    'average_latency_ms': round(stats['latency_seconds'] / attempts * 1000, 1) if attempts else None,
+                    'estimated_cost_usd': round(
+                        (stats['prompt_tokens'] * input_price + stats['completion_tokens'] * output_price) / 1_000_000, 6
+                    )
+                }
+        return report
+
+    def _record(self, tier: str, latency: float, response: Any, outcome: str, fallback: bool = False, escalation: bool = False) -> None:
+        usage = getattr(response, 'usage', None)
+        with self._lock:
+            stats = self._stats[tier]
+            stats[outcome] += 1
+            stats['fallbacks'] += int(fallback)
+            stats['escalations'] += int(escalation)
+            stats['latency_seconds'] += latency
+            for field in ('prompt_tokens', 'completion_tokens'):
+                tokens = getattr(usage, field, 0)
+                stats[field] += tokens if isinstance(tokens, int) else 0
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {
+            'calls': 0, 'schema_failures': 0, 'errors': 0, 'fallbacks': 0, 'escalations': 0,
+            'latency_seconds': 0.0, 'prompt_tokens': 0, 'completion_tokens': 0
+        }
+
@@ -1,6 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Any, Union
 from dataclasses import dataclass
 from flask import current_app
+from app.models.nutrition_record import NutritionRecord
+from app.utils.tracing import tracer
 from app.constants.nutrition_constant import (
     NUTRIENT_WEIGHTS,
     MICRONUTRIENTS,
@@ -15,40 +17,60 @@ class HealthScore:
     color: str
     message: str
 
+# (HEALTHY_RANGES / NUTRIENT_WEIGHTS key, NutritionRecord field) for every scored nutrient.
+# Total fat and total carbohydrates are represented by their scored parts.
+SCORED_NUTRIENTS = (
+    ('calories', 'calories'),
+    ('protein', 'protein'),
+    ('saturated', 'saturated_fat'),
+    ('trans', 'trans_fat'),
+    ('polyunsaturated', 'polyunsaturated_fat'),
+    ('monounsaturated', 'monounsaturated_fat'),
+    ('sugar', 'carbohydrate_sugar'),
+    ('added_sugar', 'added_sugar'),
+    ('fiber', 'fiber'),
+    ('sugar', 'sugar'),
+    ('sodium', 'sodium'),
+    ('vitamin_a', 'vitamin_a'),
+    ('vitamin_c', 'vitamin_c'),
+    ('vitamin_d', 'vitamin_d'),
+    ('calcium', 'calcium'),
+    ('iron', 'iron'),
+    ('potassium', 'potassium')
+)
+
 class NutritionAnalyzer:
 
     @classmethod
-    def calculate_health_score(cls, nutrition_info: Dict[str, Any]) -> HealthScore:
+    def calculate_health_score(cls, nutrition: Union[NutritionRecord, Dict[str, Any]]) -> HealthScore:
         """
         Calculate health score with a refined scoring system (1-10 scale).
         Better balance between positive nutrients and penalties.
+        Accepts a NutritionRecord, or a nutrition dict which is parsed into one first.
         """
+        with tracer.span('analyzer.health_score') as span:
+            health_score = cls._health_score(nutrition)
+            if span:
+                span.set(score=health_score.score)
+            return health_score
+
+    @classmethod
+    def _health_score(cls, nutrition: Union[NutritionRecord, Dict[str, Any]]) -> HealthScore:
         total_score = 0
         counted_nutrients = 0
         try:
-            excluded_fields = {'is_valid_food', 'insight', 'is_recipe'}
-            
-            for nutrient, value in {k: v for k, v in nutrition_info.items() if k not in excluded_fields}.items():
-                if isinstance(value, dict):
-                    # Handle nested objects (e.g., carbohydrates and fat)
-                    for sub_nutrient, sub_value in value.items():
-                        if sub_nutrient in HEALTHY_RANGES:
-                            min_val, max_val = HEALTHY_RANGES[sub_nutrient]
-                            weight = NUTRIENT_WEIGHTS[sub_nutrient]
-                            value = cls._get_nutrient_value({sub_nutrient: sub_value}, sub_nutrient)
-                            nutrient_score = cls._calculate_nutrient_score(sub_nutrient, value, min_val, max_val, weight, nutrition_info)
-                            
-                            total_score += nutrient_score * abs(weight)
-                            counted_nutrients += abs(weight)
-                else:
-                    if nutrient in HEALTHY_RANGES:
-                        min_val, max_val = HEALTHY_RANGES[nutrient]
-                        weight = NUTRIENT_WEIGHTS[nutrient]
-                        value = cls._get_nutrient_value({nutrient: value}, nutrient)
-                        nutrient_score = cls._calculate_nutrient_score(nutrient, value, min_val, max_val, weight, nutrition_info)
-                        
-                        total_score += nutrient_score * abs(weight)
-                        counted_nutrients += abs(weight)
+            record = nutrition if isinstance(nutrition, NutritionRecord) else NutritionRecord.from_dump(nutrition)
+            is_fruit = not record.is_recipe
+            nutrient_dense = cls._is_nutrient_dense(record)
+
+            for nutrient, field in SCORED_NUTRIENTS:
+                min_val, max_val = HEALTHY_RANGES[nutrient]
+                weight = NUTRIENT_WEIGHTS[nutrient]
+                nutrient_score = cls._calculate_nutrient_score(
+                    nutrient, getattr(record, field), min_val, max_val, weight, is_fruit, nutrient_dense
+                )
+                total_score += nutrient_score * abs(weight)
+                counted_nutrients += abs(weight)
 
             if counted_nutrients == 0:
                 return HealthScore(**DEFAULT_SCORE)
@@ -65,11 +87,8 @@ class NutritionAnalyzer:
             return HealthScore(**DEFAULT_SCORE)
 
     @classmethod
-    def _calculate_nutrient_score(cls, nutrient: str, value: float, min_val: float, max_val: float, weight: float, nutrition_info: Dict[str, Any]) -> float:
+    def _calculate_nutrient_score(cls, nutrient: str, value: float, min_val: float, max_val: float, weight: float, is_fruit: bool, nutrient_dense: bool) -> float:
         """Calculate score for a single nutrient."""
-        # First check if it's a fruit for special handling
-        is_fruit = not nutrition_info['is_recipe']
-        
         if weight > 0:  # Positive nutrients
             if value < min_val:
                 if is_fruit:
@@ -77,7 +96,7 @@ class NutritionAnalyzer:
                         return 8.0  # Base score for fruits' naturally low macros
                     elif nutrient in {'fiber', 'vitamin_c', 'potassium'}:
                         return max(8.0, (value / min_val) * 10)  # Higher base for key fruit nutrients
-                elif cls._is_nutrient_dense(nutrition_info):
+                elif nutrient_dense:
                     return max(7.0, (value / min_val) * 10)
                 return max((value / min_val) * 6, 1)
             elif value > max_val:
@@ -106,61 +125,33 @@ class NutritionAnalyzer:
                 return 10 - ((value - min_val) / (max_val - min_val) * 8)
 
     @classmethod
-    def _is_nutrient_dense(cls, nutrition_info: Dict[str, Any]) -> bool:
+    def _is_nutrient_dense(cls, record: NutritionRecord) -> bool:
         """Check if food is nutrient-dense relative to its calories"""
-        calories = cls._get_nutrient_value(nutrition_info, 'calories')
-        if calories == 0:
+        if record.calories == 0:
             return False
             
-        protein = cls._get_nutrient_value(nutrition_info, 'protein')
-        vitamins_present = cls._has_vitamins_minerals(nutrition_info)
-        sodium = cls._get_nutrient_value(nutrition_info, 'sodium')
-        
         # Check protein density and presence of micronutrients
-        protein_density = (protein * 4 / calories) if calories > 0 else 0
+        protein_density = record.protein * 4 / record.calories
         has_good_protein = protein_density > 0.15  # More than 15% protein calories
-        has_reasonable_sodium = sodium <= 400
+        has_reasonable_sodium = record.sodium <= 400
         
-        return has_good_protein and vitamins_present and has_reasonable_sodium
+        return has_good_protein and cls._has_vitamins_minerals(record) and has_reasonable_sodium
 
     @classmethod
-    def _is_quality_protein(cls, nutrition_info: Dict[str, Any]) -> bool:
+    def _is_quality_protein(cls, record: NutritionRecord) -> bool:
         """Check if it's a quality protein source with good nutrient density"""
-        protein = cls._get_nutrient_value(nutrition_info, 'protein')
-        calories = cls._get_nutrient_value(nutrition_info, 'calories')
-        sodium = cls._get_nutrient_value(nutrition_info, 'sodium')
-        
         # Check protein content, protein-to-calorie ratio, and sodium level
-        has_good_protein = protein > 5
-        has_good_protein_ratio = (protein * 4 / calories > 0.15) if calories > 0 else False
-        has_reasonable_sodium = sodium <= 400  # Not excessive sodium
+        has_good_protein = record.protein > 5
+        has_good_protein_ratio = (record.protein * 4 / record.calories > 0.15) if record.calories > 0 else False
+        has_reasonable_sodium = record.sodium <= 400  # Not excessive sodium
         
         return has_good_protein and has_good_protein_ratio and has_reasonable_sodium
 
     @classmethod
-    def _is_protein_rich(cls, nutrition_info: Dict[str, Any]) -> bool:
+    def _is_protein_rich(cls, record: NutritionRecord) -> bool:
         """Check if food is a good protein source (>5g per serving) and has good protein quality"""
-        protein = cls._get_nutrient_value(nutrition_info, 'protein')
-        calories = cls._get_nutrient_value(nutrition_info, 'calories')
-        
         # Check both absolute protein content and protein-to-calorie ratio
-        return protein > 5 and (protein * 4 / calories > 0.15 if calories > 0 else False)
-
-    @classmethod
-    def _get_nutrient_value(cls, nutrition_info: Dict[str, Any], nutrient: str) -> float:
-        """Extract numeric value from nutrient string, handling nested objects."""
-        try:
-            value = nutrition_info.get(nutrient)
-            
-            # Handle nested objects (carbohydrates and fat)
-            if isinstance(value, dict):
-                value = value.get('total', '0g')
-            
-            # Convert string to float, removing unit
-            return float(''.join(filter(str.isdigit, str(value))) or 0)
-        except (ValueError, TypeError, AttributeError):
-            current_app.logger.warning(f"Failed to parse numeric value for {nutrient}: '{value}'")
-            return 0.0
+        return record.protein > 5 and (record.protein * 4 / record.calories > 0.15 if record.calories > 0 else False)
 
     @staticmethod
     def _get_score_feedback(score: float) -> Dict[str, str]:
@@ -171,22 +162,15 @@ class NutritionAnalyzer:
         return SCORE_FEEDBACK[0.0]  # Default to lowest threshold
 
     @classmethod
-    def _has_vitamins_minerals(cls, nutrition_info: Dict[str, Any]) -> bool:
+    def _has_vitamins_minerals(cls, record: NutritionRecord) -> bool:
         """Check if food item contains significant vitamins or minerals."""
-        for nutrient in MICRONUTRIENTS:
-            if cls._get_nutrient_value(nutrition_info, nutrient) > 0:
-                return True
-        return False
+        return any(getattr(record, nutrient) > 0 for nutrient in MICRONUTRIENTS)
 
     @classmethod
-    def _is_balanced_meal(cls, nutrition_info: Dict[str, Any]) -> bool:
+    def _is_balanced_meal(cls, record: NutritionRecord) -> bool:
         """Check if the meal has balanced macronutrients."""
-        protein = cls._get_nutrient_value(nutrition_info, 'protein')
-        carbs = cls._get_nutrient_value(nutrition_info, 'carbohydrates')
-        fats = cls._get_nutrient_value(nutrition_info, 'fats')
-        
         return all([
-            protein >= 5,  # At least 5g protein
-            carbs >= 10,   # At least 10g carbs
-            fats >= 3      # At least 3g fats
-        ])
\ No newline at end of file
+            record.protein >= 5,        # At least 5g protein
+            record.carbohydrates >= 10, # At least 10g carbs
+            record.fat >= 3             # At least 3g fats
+        ])
@@ -1,129 +1,407 @@
-from openai import OpenAI
-from app.models.nutrition_models import NutritionScores, FoodSuggestions, FoodItem
+import re
+import time
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from app.models.nutrition_models import NutritionScores, NutritionBatch, FoodSuggestions, FoodItem, FoodItems
 from app.exceptions.api_exceptions import APIException
+from app.services.cache_service import ResultCache, cache_version
+from app.services.key_pool import KeyPool
+from app.services.model_router import ModelRouter, looks_like_recipe
+from app.config import Config
+from app.utils.deadline import Deadline
+from app.utils.image_utils import encode_data_url, hash_file
+from app.utils.tracing import tracer
 from http import HTTPStatus
-import base64
+from typing import Any, Callable, List, Optional, Tuple
 from flask import current_app, json
 from json.decoder import JSONDecodeError
+from pydantic import ValidationError
+
+# Retries of a transient error on the last key when a deadline is set (the SDK's own retries
+# are off then), with exponential backoff from DEADLINE_RETRY_BACKOFF_SECONDS
+DEADLINE_RETRIES = 2
+DEADLINE_RETRY_BACKOFF_SECONDS = 0.5
+
+SUGGESTIONS_PROMPT = (
+    "Provide a mix of list of top 20 popular dishes eaten in breakfast, lunch, and dinner mostly in Indian households."
+    "IMPORTANT: Provide the only the list without any explanation or extra text or numbers"
+)
+
+NUTRITION_SYSTEM_PROMPT = (
+    "You are a highly accurate and reliable nutritionist providing data from reputable sources, such as the USDA. "
+    "Provide nutritional information in JSON format based on the specified quantity and unit, ensuring values are accurate, scaled proportionally from standard serving size. "
+    "IMPORTANT: All numeric values should be rounded to the nearest whole number with units (e.g., '19g' instead of '18.7g', '98mg' instead of '98.3mg'). "
+    "Include an insightful one-sentence description of the food item. "
+    "If the food item is a prepared dish/recipe (not a simple ingredient), set is_recipe to true. "
+    "If the food item is not a valid food item, set is_valid_food to false. "
+    "IMPORTANT: Respond **only** with valid JSON in this exact format without any extra text: "
+    '{"calories": <string>, "protein": <string>, '
+    '"fat": {"total": <string>, "saturated": <string>, "trans": <string>, "polyunsaturated": <string>, "monounsaturated": <string>}, '
+    '"carbohydrates": {"total": <string>, "sugar": <string>, "added_sugar": <string>}, '
+    '"fiber": <string>, "sugar": <string>, "sodium": <string>, '
+    '"vitamin_a": <string>, "vitamin_c": <string>, "vitamin_d": <string>, '
+    '"calcium": <string>, "iron": <string>, "potassium": <string>, '
+    '"is_recipe": <boolean>, "is_valid_food": <boolean>, "insight": <string>}'
+)
+
+VISION_SYSTEM_PROMPT = """You are a precise food image analyzer with strict rules:
+                            1. Your primary task is to first determine if an image contains food or not
+                            2. You must NEVER classify non-food items as food
+                            3. If you see any humans, faces, or selfies, immediately return an error
+                            4. If you see landscapes, objects, or any non-food items, return an error
+                            5. Only proceed with food analysis if you are 100% certain the image contains food"""
+
+VISION_USER_PROMPT = """Analyze this image and return ONLY a JSON response in this exact format:
+                                    For non-food images:
+                                    {"error": "This image does not contain food. Please upload a food image only."}
+                                    
+                                    For images with people:
+                                    {"error": "This appears to be an image containing people. Please upload a food image only."}
+
+                                    For images with landscapes:
+                                    {"error": "This appears to be an image containing landscapes. Please upload a food image only."}
+                                    
+                                    For food images, list every distinct food item on the plate (e.g. each dish of a thali):
+                                    {"items": [{"food_item": "name of food", "quantity": number, "unit": "units/grams/ml/bowl/cup/tbsp/tsp/plate"}]}
+                                    
+                                    DO NOT include any additional text or explanation."""
+
+FORMAT_SYSTEM_PROMPT = """Format the provided food analysis into valid JSON of the form {"items": [...]} where each item has these exact fields:
+                            - food_item (string)
+                            - quantity (number)
+                            - unit (string: one of "units", "grams", "ml", "bowl", "cup", "tbsp", "tsp", "plate")"""
+
+NUTRITION_BATCH_PROMPT = (
+    "Provide precise nutritional information for each of the following food items, based on a standard serving size "
+    "and scaled accurately to the given quantity. Respond with {\"items\": [...]} containing exactly one entry per "
+    "food item, in the same order:\n"
+)
+
 class OpenAIService:
     """
     Service class for interacting with OpenAI API
     Handles food suggestions and nutrition information retrieval
+    Results are served from the shared ResultCache when one is provided; rejected inputs
+    (invalid foods, non-food images) are answered from the negative cache when one is provided
+    Models are chosen per call type by the ModelRouter; calls are spread over the API keys
+    of the KeyPool when one is provided
     """
 
-    def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        cache: Optional[ResultCache] = None,
+        router: Optional[ModelRouter] = None,
+        negative_cache: Optional[ResultCache] = None,
+        key_pool: Optional[KeyPool] = None
+    ):
+        self.key_pool = key_pool or KeyPool([api_key])
+        # Client of the first key, for callers that need a single one
+        self.client = self.key_pool.keys[0].client
+        self.cache = cache
+        self.negative_cache = negative_cache
+        self.router = router or ModelRouter.from_config()
+        # Cache versions change whenever a prompt or a model the call can reach changes
+        route = self.router.signature
+        self.versions = {
+            'suggestions': cache_version(SUGGESTIONS_PROMPT, *route('suggestions')),
+            'nutrition': cache_version(
+                NUTRITION_SYSTEM_PROMPT, NUTRITION_BATCH_PROMPT,
+                *route('nutrition'), *route('nutrition_recipe'), *route('nutrition_batch')
+            ),
+            'food_items': cache_version(
+                VISION_SYSTEM_PROMPT, VISION_USER_PROMPT, FORMAT_SYSTEM_PROMPT, *route('vision'), *route('format')
+            )
+        }
+        # Rejections expire with the results they were derived from
+        self.versions['invalid_food'] = self.versions['nutrition']
+        self.versions['rejected_image'] = self.versions['food_items']
+
+    def cache_key(self, namespace: str, *parts) -> str:
+        """Builds the versioned cache key for a call type and its arguments"""
+        return ResultCache.make_key(namespace, self.versions[namespace], *parts)
+
+    @staticmethod
+    def nutrition_key_parts(food_item: str, quantity: float, unit: str) -> tuple:
+        """Normalizes nutrition lookup arguments so equivalent requests share one entry"""
+        return (food_item.lower().strip(), float(quantity), unit)
+
+    @staticmethod
+    def normalize_food_name(food_item: str) -> str:
+        """Reduces a name to lowercase words so trivial variations of a rejected input match"""
+        return " ".join(re.findall(r"[a-z0-9]+", food_item.lower()))
 
-    def get_food_suggestions(self) -> FoodSuggestions:
+    def _rejected_food(self, food_item: str) -> Optional[NutritionScores]:
+        """The earlier invalid-food answer for this name, whatever the quantity, or None"""
+        if not self.negative_cache:
+            return None
+        return self.negative_cache.get_model(self.cache_key('invalid_food', self.normalize_food_name(food_item)), NutritionScores)
+
+    def has_cached_nutrition(self, food_item: Any, quantity: Any, unit: Any) -> bool:
+        """Whether get_nutrition_info would answer without an upstream call"""
+        try:
+            key = self.cache_key('nutrition', *self.nutrition_key_parts(str(food_item), float(quantity), unit))
+        except (TypeError, ValueError):
+            return False
+        if self.cache and self.cache.get(key) is not None:
+            return True
+        return self._rejected_food(str(food_item)) is not None
+
+    def has_cached_suggestions(self) -> bool:
+        """Whether get_food_suggestions would answer without an upstream call"""
+        return bool(self.cache) and self.cache.get(self.cache_key('suggestions')) is not None
+
+    def _remember_invalid(self, food_item: str, nutrition: NutritionScores) -> None:
+        if self.negative_cache and not nutrition.is_valid_food:
+            self.negative_cache.set_model(self.cache_key('invalid_food', self.normalize_food_name(food_item)), nutrition)
+
+    def _create(
+        self,
+        call_type: str,
+        parse: Optional[Callable[[Any], Any]] = None,
+        escalate: Optional[Callable[[Any], bool]] = None,
+        deadline: Optional[Deadline] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Sends every chat completion: the router picks the model for call_type, moves to the
+        next tier when parse rejects the output, and records latency and tokens per tier
+        Args:
+            call_type: Route in the ModelRouter
+            parse: Turns the response into the result (default: the parsed model for
+                structured calls, the message text otherwise)
+            escalate: Returns True when a lower tier's result should be redone on the next tier
+            deadline: Request time budget; every attempt (fallbacks and hedges included) gets
+                what is left of it as its timeout
+        """
+        structured = isinstance(kwargs.get('response_format'), type)
+        if structured:
+            parse = parse or self._parsed
+        else:
+            parse = parse or (lambda response: response.choices[0].message.content)
+
+        def send(client, model: str) -> Any:
+            create = client.beta.chat.completions.parse if structured else client.chat.completions.create
+            if deadline is None:
+                return create(model=model, **kwargs)
+            timeout = deadline.timeout(Config.DEADLINE_MIN_CALL_SECONDS, call_type)
+            try:
+                return create(model=model, timeout=timeout, **kwargs)
+            except APITimeoutError:
+                if deadline.allows(Config.DEADLINE_MIN_CALL_SECONDS):
+                    raise
+                raise APIException.deadline_exceeded(deadline.seconds, call_type)
+
+        def request(model: str) -> Any:
+            # A rate-limited or failing key hands the call to the next best key. The last key
+            # tried keeps the SDK's own retries, unless a deadline is set: each SDK retry would
+            # get the whole remaining budget again, so retries are made here within the budget
+            tried = []
+            retries = 0
+            while True:
+                last = len(tried) == len(self.key_pool) - 1
+                with self.key_pool.lease(exclude=tried) as key:
+                    try:
+                        return send(key.client if last and deadline is None else key.failover_client, model)
+                    except (RateLimitError, InternalServerError, APIConnectionError) as e:
+                        if isinstance(e, APITimeoutError):
+                            raise
+                        if not last:
+                            self.key_pool.logger.warning(f"{call_type} call on key {key.name} failed ({type(e).__name__}); trying another key")
+                            tried.append(key)
+                            continue
+                        backoff = DEADLINE_RETRY_BACKOFF_SECONDS * 2 ** retries
+                        if deadline is None or retries >= DEADLINE_RETRIES \
+                                or not deadline.allows(backoff + Config.DEADLINE_MIN_CALL_SECONDS):
+                            raise
+                        retries += 1
+                        self.key_pool.logger.warning(f"{call_type} call failed ({type(e).__name__}); retry {retries} within the deadline")
+                time.sleep(backoff)
+
+        with tracer.span(f"openai.{call_type}"):
+            return self.router.call(call_type, request, parse, escalate)
+
+    @staticmethod
+    def _parsed(response) -> Any:
+        parsed = response.choices[0].message.parsed
+        if parsed is None:
+            raise ValueError("Model returned no parsable output")
+        return parsed
+
+    def get_food_suggestions(self, deadline: Optional[Deadline] = None) -> FoodSuggestions:
         """
         Fetches food suggestions using OpenAI
+        Args:
+            deadline: Request time budget, used as the call timeout
         Returns:
             FoodSuggestions object containing list of food items
         """
-        prompt = (
-            "Provide a mix of list of top 20 popular dishes eaten in breakfast, lunch, and dinner mostly in Indian households."
-            "IMPORTANT: Provide the only the list without any explanation or extra text or numbers"
-        )
+        key = self.cache_key('suggestions')
+        if self.cache:
+            cached = self.cache.get_model(key, FoodSuggestions)
+            if cached is not None:
+                return cached
 
-        response = self.client.beta.chat.completions.parse(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
+        suggestions = self._create(
+            'suggestions',
+            deadline=deadline,
+            messages=[{"role": "user", "content": SUGGESTIONS_PROMPT}],
             response_format=FoodSuggestions,
             temperature=0.5
         )
-        return response.choices[0].message.parsed
+        if self.cache:
+            self.cache.set_model(key, suggestions, ttl=Config.SUGGESTIONS_CACHE_TTL_SECONDS)
+        return suggestions
 
-    def get_nutrition_info(self, food_item: str, quantity: float, unit: str) -> NutritionScores:
+    def get_nutrition_info(self, food_item: str, quantity: float, unit: str, deadline: Optional[Deadline] = None) -> NutritionScores:
         """
         Gets nutrition information for a food item using OpenAI
         Args:
             food_item: Name of the food item
             quantity: Amount of food
             unit: Unit of measurement
+            deadline: Request time budget, used as the call timeout
         Returns:
             NutritionScores object containing detailed nutrition information
         """
-        system_prompt = (
-            "You are a highly accurate and reliable nutritionist providing data from reputable sources, such as the USDA. "
-            "Provide nutritional information in JSON format based on the specified quantity and unit, ensuring values are accurate, scaled proportionally from standard serving size. "
-            "IMPORTANT: All numeric values should be rounded to the nearest whole number with units (e.g., '19g' instead of '18.7g', '98mg' instead of '98.3mg'). "
-            "Include an insightful one-sentence description of the food item. "
-            "If the food item is a prepared dish/recipe (not a simple ingredient), set is_recipe to true. "
-            "If the food item is not a valid food item, set is_valid_food to false. "
-            "IMPORTANT: Respond **only** with valid JSON in this exact format without any extra text: "
-            '{"calories": <string>, "protein": <string>, '
-            '"fat": {"total": <string>, "saturated": <string>, "trans": <string>, "polyunsaturated": <string>, "monounsaturated": <string>}, '
-            '"carbohydrates": {"total": <string>, "sugar": <string>, "added_sugar": <string>}, '
-            '"fiber": <string>, "sugar": <string>, "sodium": <string>, '
-            '"vitamin_a": <string>, "vitamin_c": <string>, "vitamin_d": <string>, '
-            '"calcium": <string>, "iron": <string>, "potassium": <string>, '
-            '"is_recipe": <boolean>, "is_valid_food": <boolean>, "insight": <string>}'
-        )
+        key = self.cache_key('nutrition', *self.nutrition_key_parts(food_item, quantity, unit))
+        if self.cache:
+            cached = self.cache.get_model(key, NutritionScores)
+            if cached is not None:
+                return cached
+        rejected = self._rejected_food(food_item)
+        if rejected is not None:
+            return rejected
 
         user_prompt = f"Provide precise nutritional information for {quantity} {unit} of {food_item} based on a standard serving size. Ensure values scale accurately."
 
+        # Plain ingredients start on the fast tier; dishes (guessed from the name, or reported
+        # by the fast model) go to the standard tier
         try:
-            response = self.client.beta.chat.completions.parse(
-                model="gpt-4o",
+            nutrition = self._create(
+                'nutrition_recipe' if looks_like_recipe(food_item, unit) else 'nutrition',
+                escalate=(lambda result: result.is_recipe) if Config.MODEL_ESCALATE_RECIPES else None,
+                deadline=deadline,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": NUTRITION_SYSTEM_PROMPT},
                     {"role": "user", "content": user_prompt}
                 ],
                 response_format=NutritionScores,
                 temperature=0.3
             )
-            return response.choices[0].message.parsed
 
+        except APIException:
+            raise
         except Exception as e:
             raise APIException(
                 message="Failed to get nutrition information from OpenAI",
                 status_code=HTTPStatus.SERVICE_UNAVAILABLE,
                 error_type="openai_api_error"
-            ) 
-    def get_food_item_from_image(self, image_file):
+            )
+
+        # Rejections go only to the negative cache, with its shorter TTL and size bound
+        if nutrition.is_valid_food and self.cache:
+            self.cache.set_model(key, nutrition)
+        self._remember_invalid(food_item, nutrition)
+        return nutrition
+
+    def get_nutrition_batch(self, items: List[Tuple[str, float, str]], deadline: Optional[Deadline] = None) -> List[NutritionScores]:
+        """
+        Gets nutrition information for several food items in one pass
+        Cached items are served from the cache; all misses are resolved in a single call.
+        Args:
+            items: (food_item, quantity, unit) tuples
+            deadline: Request time budget, used as the call timeout
+        Returns:
+            NutritionScores for each item, in the same order
         """
-        Gets the food item from an image using OpenAI
+        keys = [self.cache_key('nutrition', *self.nutrition_key_parts(*item)) for item in items]
+        results: List[Optional[NutritionScores]] = [
+            (self.cache.get_model(key, NutritionScores) if self.cache else None) or self._rejected_food(item[0])
+            for key, item in zip(keys, items)
+        ]
+        missing = [index for index, result in enumerate(results) if result is None]
+        if len(missing) == 1:
+            results[missing[0]] = self.get_nutrition_info(*items[missing[0]], deadline=deadline)
+        elif missing:
+            user_prompt = NUTRITION_BATCH_PROMPT + "\n".join(
+                f"{position}. {items[index][1]} {items[index][2]} of {items[index][0]}"
+                for position, index in enumerate(missing, start=1)
+            )
+            try:
+                batch = self._create(
+                    'nutrition_batch',
+                    deadline=deadline,
+                    messages=[
+                        {"role": "system", "content": NUTRITION_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    response_format=NutritionBatch,
+                    temperature=0.3
+                ).items
+            except APIException:
+                raise
+            except Exception as e:
+                raise APIException(
+                    message="Failed to get nutrition information from OpenAI",
+                    status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                    error_type="openai_api_error"
+                )
+
+            if len(batch) != len(missing):
+                current_app.logger.warning(f"Nutrition batch returned {len(batch)} items for {len(missing)}; resolving one by one")
+                batch = [self.get_nutrition_info(*items[index], deadline=deadline) for index in missing]
+            else:
+                for index, nutrition in zip(missing, batch):
+                    if nutrition.is_valid_food and self.cache:
+                        self.cache.set_model(keys[index], nutrition)
+                    self._remember_invalid(items[index][0], nutrition)
+            for index, nutrition in zip(missing, batch):
+                results[index] = nutrition
+        return results
+
+    def get_food_items_from_image(self, image_file, deadline: Optional[Deadline] = None) -> List[FoodItem]:
+        """
+        Detects every food item in an image (e.g. each dish of a thali) using OpenAI
+        Args:
+            image_file: Validated image file object
+            deadline: Request time budget, shared by the vision and format calls
+        Returns:
+            The detected food items, in the order the model listed them
         """
         try:
-            image_data = image_file.read()
-            
-            # First get raw analysis from vision model
-            only_vision_response = self.client.chat.completions.create(
-                model="gpt-4o",
+            image_hash = hash_file(image_file)
+            key = self.cache_key('food_items', image_hash)
+            if self.cache:
+                cached = self.cache.get_models(key, FoodItem)
+                if cached is not None:
+                    return cached
+            rejected_key = self.cache_key('rejected_image', image_hash)
+            if self.negative_cache:
+                rejection = self.negative_cache.get(rejected_key)
+                if rejection is not None:
+                    raise APIException.invalid_image(json.loads(rejection))
+
+            # Get the detections straight from the vision model
+            vision_result = self._create(
+                'vision',
+                parse=self._vision_json,
+                deadline=deadline,
                 messages=[
                     {
                         "role": "system",
-                        "content": """You are a precise food image analyzer with strict rules:
-                            1. Your primary task is to first determine if an image contains food or not
-                            2. You must NEVER classify non-food items as food
-                            3. If you see any humans, faces, or selfies, immediately return an error
-                            4. If you see landscapes, objects, or any non-food items, return an error
-                            5. Only proceed with food analysis if you are 100% certain the image contains food"""
+                        "content": VISION_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
                         "content": [
                             {
                                 "type": "text",
-                                "text": """Analyze this image and return ONLY a JSON response in this exact format:
-                                    For non-food images:
-                                    {"error": "This image does not contain food. Please upload a food image only."}
-                                    
-                                    For images with people:
-                                    {"error": "This appears to be an image containing people. Please upload a food image only."}
-
-                                    For images with landscapes:
-                                    {"error": "This appears to be an image containing landscapes. Please upload a food image only."}
-                                    
-                                    For food images:
-                                    {"food_item": "name of food", "quantity": number, "unit": "units/grams/ml/bowl/cup/tbsp/tsp/plate"}
-                                    
-                                    DO NOT include any additional text or explanation."""
+                                "text": VISION_USER_PROMPT
                             },
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64.b64encode(image_data).decode()}"
+                                    "url": encode_data_url(image_file)
                                 }
                             }
                         ]
@@ -131,71 +409,89 @@ class OpenAIService:
                 ],
                 response_format={ "type": "json_object" }
             )
-            try:
-                vision_result = json.loads(only_vision_response.choices[0].message.content)
-            except JSONDecodeError as e:
-                current_app.logger.error(f"Failed to parse vision API response: {only_vision_response.choices[0].message.content}")
-                raise APIException.parse_error()
-            # If there's an error, return it directly
+            # If there's an error, return it directly (and remember the rejection)
             if "error" in vision_result:
-                raise APIException.invalid_image(vision_result["error"])
-            
-            # Format the result using GPT-4 to ensure it matches FoodItem schema
-            format_response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """Format the provided food analysis into valid JSON with these exact fields:
-                            - food_item (string)
-                            - quantity (number)
-                            - unit (string: one of "units", "grams", "ml", "bowl", "cup", "tbsp", "tsp", "plate")"""
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Format this into the required schema: {json.dumps(vision_result)}"
-                    }
-                ],
-                response_format={ "type": "json_object" }
-            )
-            try:    
-                formatted_result = json.loads(format_response.choices[0].message.content)
-            except JSONDecodeError as e:
-                current_app.logger.error(f"Failed to parse format API response for FoodItem: {format_response.choices[0].message.content}")
-                raise APIException.parse_error()
-            return FoodItem(**formatted_result)
+                raise self._reject_image(rejected_key, vision_result["error"])
+
+            try:
+                food_items = FoodItems.model_validate(vision_result).items
+            except ValidationError:
+                food_items = self._format_food_items(vision_result, deadline)
+            if not food_items:
+                raise self._reject_image(rejected_key, "No food items could be identified in this image.")
+            if self.cache:
+                self.cache.set_models(key, food_items)
+            return food_items
 
+        except APIException:
+            raise
         except Exception as e:
-            current_app.logger.error(f"Error in get_food_item_from_image: {e}")
+            current_app.logger.error(f"Error in get_food_items_from_image: {e}")
             raise APIException(
                 message=e,
                 status_code=HTTPStatus.SERVICE_UNAVAILABLE,
                 error_type="openai_api_error"
             )
-        
-    def validate_food_item(self, food_item: str):
-        """
-        Validates the food item, quantity, and unit
-        """
-        current_app.logger.info("In validate_food_item for %s", food_item)
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                 messages=[
+
+    def _reject_image(self, key: str, message: str) -> APIException:
+        """Records an image the vision model refused and returns the error to raise"""
+        if self.negative_cache:
+            self.negative_cache.set(key, json.dumps(message))
+        return APIException.invalid_image(message)
+
+    def _format_food_items(self, vision_result: dict, deadline: Optional[Deadline] = None) -> List[FoodItem]:
+        """Coerces a vision result that does not match the schema into FoodItems with a second call"""
+        return self._create(
+            'format',
+            parse=lambda response: FoodItems(**json.loads(response.choices[0].message.content)).items,
+            deadline=deadline,
+            messages=[
                 {
                     "role": "system",
-                    "content": "You are a food validator. Respond with only 'true' if the input is a valid food item, or 'false' if it's not."
+                    "content": FORMAT_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
-                    "content": f"Is this a valid food item: {food_item}"
+                    "content": f"Format this into the required schema: {json.dumps(vision_result)}"
                 }
             ],
-                temperature=0.3
+            response_format={ "type": "json_object" }
         )
-            validation_result = response.choices[0].message.content.strip().lower() == 'true'
+
+    @staticmethod
+    def _vision_json(response) -> dict:
+        try:
+            return json.loads(response.choices[0].message.content)
+        except JSONDecodeError:
+            current_app.logger.error(f"Failed to parse vision API response: {response.choices[0].message.content}")
+            raise APIException.parse_error()
+        
+    def validate_food_item(self, food_item: str, deadline: Optional[Deadline] = None):
+        """
+        Validates the food item, quantity, and unit
+        """
+        current_app.logger.info("In validate_food_item for %s", food_item)
+        try:
+            validation_result = self._create(
+                'validate',
+                parse=lambda response: response.choices[0].message.content.strip().lower() == 'true',
+                deadline=deadline,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a food validator. Respond with only 'true' if the input is a valid food item, or 'false' if it's not."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Is this a valid food item: {food_item}"
+                    }
+                ],
+                temperature=0.3
+            )
             current_app.logger.info("Validation result for %s: %s", food_item, validation_result)
             return validation_result
+        except APIException:
+            raise
         except Exception as e:
             print(f"Error in validate_food_item: {e}")
             raise APIException(
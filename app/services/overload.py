@@ -0,0 +1,162 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import Config
+from app.exceptions.api_exceptions import APIException
+
+# Priority classes, most valuable first; under overload they are shed from the end
+PRIORITIES = ('cached', 'text', 'image', 'suggestions')
+# Share of the worker's slots each class may fill, so slow image pipelines can never hold
+# the slots that cheap lookups need
+PRIORITY_SHARES = {'cached': 1.0, 'text': 0.85, 'image': 0.5, 'suggestions': 0.5}
+
+class OverloadController:
+    """
+    Admits requests to a fixed number of slots per worker, by priority class
+    Requests finding no free slot wait in one queue ordered by priority, then arrival, for up
+    to max_wait seconds. The controller watches queue delay the way CoDel does: when even
+    the shortest wait over an interval exceeds target_delay, the queue is not draining, so
+    the lowest class still served is shed (rejected at once with a 503, waiting requests
+    included); each interval back under target serves one more class again. The top class
+    is never shed, only bounded by max_wait.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        target_delay: float = 0.1,
+        interval: float = 1.0,
+        max_wait: float = 2.0
+    ):
+        self.max_concurrent = max_concurrent
+        self.target_delay = target_delay
+        self.interval = interval
+        self.max_wait = max_wait
+        self.logger = logging.getLogger(__name__)
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting: List[Tuple[int, int]] = []
+        self._arrivals = itertools.count()
+        # Classes at this rank and below are shed
+        self._shed_from = len(PRIORITIES)
+        self._window_start = time.monotonic()
+        self._window_min: Optional[float] = None
+        self._stats = {priority: {'admitted': 0, 'shed': 0, 'queue_seconds': 0.0} for priority in PRIORITIES}
+
+    @classmethod
+    def from_config(cls) -> Optional['OverloadController']:
+        """Creates the controller, or None when load shedding is disabled"""
+        if not Config.OVERLOAD_ENABLED:
+            return None
+        return cls(
+            Config.OVERLOAD_MAX_CONCURRENT,
+            target_delay=Config.OVERLOAD_TARGET_DELAY_SECONDS,
+            interval=Config.OVERLOAD_INTERVAL_SECONDS,
+            max_wait=Config.OVERLOAD_MAX_WAIT_SECONDS
+        )
+
+    def acquire(self, priority: str) -> None:
+        """
+        Waits for a slot for a request of this class
+        Raises:
+            APIException: 503 when the class is being shed or no slot frees up within max_wait
+        """
+        rank = PRIORITIES.index(priority)
+        limit = self.max_concurrent * PRIORITY_SHARES[priority]
+        arrived = time.monotonic()
+        with self._cond:
+            self._update(arrived)
+            if rank >= self._shed_from:
+                raise self._shed(priority)
+            if not self._waiting and self._active < limit:
+                self._admit(priority, arrived, arrived)
+                return
+
+            entry = (rank, next(self._arrivals))
+            heapq.heappush(self._waiting, entry)
+            try:
+                # Only the head of the queue may take a slot, so a class never overtakes a better one
+                while self._waiting[0] != entry or self._active >= limit:
+                    now = time.monotonic()
+                    # Waiters wake every interval, so a queue that stopped draining is noticed
+                    self._update(now)
+                    if rank >= self._shed_from:
+                        raise self._shed(priority)
+                    if now - arrived >= self.max_wait:
+                        self._sample(now - arrived)
+                        raise self._shed(priority)
+                    self._cond.wait(min(self.max_wait - (now - arrived), self.interval))
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                # The next waiter may now be the head
+                self._cond.notify_all()
+            self._admit(priority, arrived, time.monotonic())
+
+    def release(self) -> None:
+        """Frees the slot of an admitted request"""
+        with self._cond:
+            self._active -= 1
+            self._update(time.monotonic())
+            self._cond.notify_all()
+
+    def is_shedding(self) -> bool:
+        """Whether any class is being shed, i.e. the worker is overloaded"""
+        with self._cond:
+            return self._shed_from < len(PRIORITIES)
+
+    def _admit(self, priority: str, arrived: float, now: float) -> None:
+        self._active += 1
+        self._sample(now - arrived)
+        stats = self._stats[priority]
+        stats['admitted'] += 1
+        stats['queue_seconds'] += now - arrived
+
+    def _shed(self, priority: str) -> APIException:
+        self._stats[priority]['shed'] += 1
+        return APIException.overloaded(self.interval)
+
+    def _sample(self, delay: float) -> None:
+        """Records one request's queue delay for the current interval"""
+        if self._window_min is None or delay < self._window_min:
+            self._window_min = delay
+
+    def _update(self, now: float) -> None:
+        """At the end of each interval, sheds one more class or serves one more again"""
+        if now - self._window_start < self.interval:
+            return
+        # No request got a slot all interval: overloaded if any were waiting for one
+        overloaded = self._window_min > self.target_delay if self._window_min is not None else bool(self._waiting)
+        if overloaded and self._shed_from > 1:
+            self._shed_from -= 1
+            self.logger.warning(
+                f"Overloaded (queue delay {self._window_min or now - self._window_start:.2f}s); "
+                f"shedding {', '.join(PRIORITIES[self._shed_from:])} requests"
+            )
+            # Waiters of the shed class leave now instead of at their timeout
+            self._cond.notify_all()
+        elif not overloaded and self._shed_from < len(PRIORITIES):
+            self._shed_from += 1
+            self.logger.info(f"Queue delay back under target; serving {PRIORITIES[self._shed_from - 1]} requests again")
+        self._window_start = now
+        self._window_min = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Slots in use, queued requests, shed classes and per-class admissions for this worker"""
+        with self._cond:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'active': self._active,
+                'waiting': len(self._waiting),
+                'shedding': list(PRIORITIES[self._shed_from:]),
+                'classes': {
+                    priority: {
+                        'admitted': stats['admitted'],
+                        'shed': stats['shed'],
+                        'avg_queue_ms': round(stats['queue_seconds'] / stats['admitted'] * 1000, 1) if stats['admitted'] else 0.0
+                    } for priority, stats in self._stats.items()
+                }
+            }
@@ -0,0 +1,182 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import secrets
+import sys
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from app.config import Config
+
+_PROFILE_ID = re.compile(r'^[0-9a-f]{16}$')
+
+class RequestProfiler:
+    """
+    Runs single, explicitly requested requests under cProfile and keeps the results
+    Only one request is profiled at a time (cProfile hooks the interpreter, so overlapping
+    profiles would distort each other); the newest `keep` profiles are kept on disk.
+    """
+
+    def __init__(self, directory: str, keep: int = 50):
+        self.directory = directory
+        self.keep = keep
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> 'RequestProfiler':
+        return cls(Config.PROFILE_DIR, keep=Config.PROFILE_KEEP)
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Starts profiling the calling thread, or returns None if another profile is running"""
+        if not self._lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool is active in this interpreter
+            self._lock.release()
+            return None
+        return profile
+
+    def stop(self, profile: cProfile.Profile) -> str:
+        """
+        Stops a profile started by start() and saves it
+        Returns:
+            The profile id to download it by
+        """
+        try:
+            profile.disable()
+        finally:
+            self._lock.release()
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = secrets.token_hex(8)
+        profile.dump_stats(self.path(profile_id))
+        self._prune()
+        return profile_id
+
+    def path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.prof")
+
+    def exists(self, profile_id: str) -> bool:
+        return bool(_PROFILE_ID.match(profile_id)) and os.path.isfile(self.path(profile_id))
+
+    def report(self, profile_id: str, sort: str = 'cumulative', limit: int = 50) -> str:
+        """Human-readable pstats table of a saved profile"""
+        output = io.StringIO()
+        stats = pstats.Stats(self.path(profile_id), stream=output)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def list(self) -> List[Dict[str, float]]:
+        """Saved profiles, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = [
+            {'profile_id': name[:-5], 'created_at': os.path.getmtime(os.path.join(self.directory, name))}
+            for name in os.listdir(self.directory) if name.endswith('.prof')
+        ]
+        return sorted(entries, key=lambda entry: entry['created_at'], reverse=True)
+
+    def _prune(self) -> None:
+        for entry in self.list()[self.keep:]:
+            try:
+                os.remove(self.path(entry['profile_id']))
+            except OSError as e:
+                self.logger.warning(f"Could not remove old profile {entry['profile_id']}: {e}")
+
+class StackSampler:
+    """
+    Low-overhead sampling profiler for live traffic
+    A background thread wakes every `interval` seconds and records the Python stack of
+    each thread currently serving a tracked request, aggregated as collapsed stacks
+    ("outer;inner" -> samples) ready for flame graph tools. Started lazily in each worker
+    process, since threads do not survive a fork.
+    """
+
+    def __init__(self, interval: float = 0.02, max_stacks: int = 2000, depth: int = 48):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.depth = depth
+        self._lock = threading.Lock()
+        self._active: Dict[int, str] = {}
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_config(cls) -> Optional['StackSampler']:
+        """Creates the sampler, or None when it is disabled"""
+        if not Config.PROFILE_SAMPLER_ENABLED:
+            return None
+        return cls(Config.PROFILE_SAMPLER_INTERVAL_MS / 1000, max_stacks=Config.PROFILE_SAMPLER_MAX_STACKS)
+
+    def ensure_started(self) -> None:
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='stack-sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def track(self, label: str) -> None:
+        """Samples the calling thread, labelled with its endpoint, until untrack()"""
+        with self._lock:
+            self._active[threading.get_ident()] = label
+
+    def untrack(self) -> None:
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+
+    def sample(self) -> None:
+        """Takes one sample of every tracked thread"""
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, label in self._active.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = self._collapse(label, frame)
+                if stack not in self._stacks and len(self._stacks) >= self.max_stacks:
+                    stack = f"{label};[other]"
+                self._stacks[stack] += 1
+                self._samples += 1
+
+    def top(self, limit: int = 50) -> Tuple[int, List[Tuple[str, int]]]:
+        """Total samples and the most frequent stacks"""
+        with self._lock:
+            return self._samples, self._stacks.most_common(limit)
+
+    def collapsed(self) -> str:
+        """All stacks in collapsed format, one "frame;frame;frame count" per line"""
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self._samples = 0
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def _collapse(self, label: str, frame) -> str:
+        names = []
+        while frame is not None and len(names) < self.depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join([label, *reversed(names)])
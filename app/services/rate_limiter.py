@@ -0,0 +1,118 @@
+import math
+import sqlite3
+import threading
+import time
+from app.config import Config
+from app.exceptions.api_exceptions import APIException
+from app.services.sqlite_store import SQLiteStore
+
+GLOBAL_BUCKET = 'global'
+
+class RateLimiter(SQLiteStore):
+    """
+    Per-client and global token buckets shared by every worker through SQLite
+    A request is admitted only when both its client bucket and the global bucket hold
+    enough tokens for its cost; both are debited in one transaction. Callers that are
+    short of tokens may wait in a bounded per-process queue for up to max_wait seconds,
+    otherwise they are rejected with a 429 carrying Retry-After.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        client_capacity: float,
+        client_refill_per_second: float,
+        global_capacity: float,
+        global_refill_per_second: float,
+        max_wait: float = 5.0,
+        queue_size: int = 16
+    ):
+        super().__init__(db_path)
+        self.buckets = {
+            'client': (client_capacity, client_refill_per_second),
+            GLOBAL_BUCKET: (global_capacity, global_refill_per_second)
+        }
+        self.max_wait = max_wait
+        self._queue = threading.BoundedSemaphore(queue_size)
+
+    @classmethod
+    def from_config(cls) -> 'RateLimiter':
+        return cls(
+            Config.RATE_LIMIT_DB_PATH,
+            client_capacity=Config.RATE_LIMIT_CLIENT_CAPACITY,
+            client_refill_per_second=Config.RATE_LIMIT_CLIENT_REFILL_PER_SECOND,
+            global_capacity=Config.RATE_LIMIT_GLOBAL_CAPACITY,
+            global_refill_per_second=Config.RATE_LIMIT_GLOBAL_REFILL_PER_SECOND,
+            max_wait=Config.RATE_LIMIT_MAX_WAIT_SECONDS,
+            queue_size=Config.RATE_LIMIT_QUEUE_SIZE
+        )
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def try_acquire(self, client_id: str, cost: float) -> float:
+        """
+        Debits cost from the client and global buckets if both can afford it
+        Returns:
+            0.0 when admitted, otherwise the seconds until both buckets could afford it
+        """
+        keys = [(f"client:{client_id}", self.buckets['client']), (GLOBAL_BUCKET, self.buckets[GLOBAL_BUCKET])]
+        now = time.time()
+        conn = self._connection()
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent workers serialize here
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = []
+            for key, (capacity, refill) in keys:
+                row = conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE key = ?", (key,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * refill)
+                levels.append(tokens)
+
+            wait = max(
+                self._time_to_afford(tokens, cost, capacity, refill)
+                for tokens, (_, (capacity, refill)) in zip(levels, keys)
+            )
+            for tokens, (key, _) in zip(levels, keys):
+                conn.execute(
+                    "INSERT OR REPLACE INTO token_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, tokens - cost if wait == 0 else tokens, now)
+                )
+            conn.execute("COMMIT")
+            return wait
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def admit(self, client_id: str, cost: float) -> None:
+        """
+        Admits a request, waiting in the bounded queue when tokens arrive within max_wait
+        Raises:
+            APIException: 429 with Retry-After when the request cannot be admitted in time
+        """
+        wait = self.try_acquire(client_id, cost)
+        if wait == 0:
+            return
+        if wait > self.max_wait or not self._queue.acquire(blocking=False):
+            raise APIException.rate_limited(min(wait, 3600))
+
+        deadline = time.monotonic() + self.max_wait
+        try:
+            while wait > 0:
+                remaining = deadline - time.monotonic()
+                if wait > remaining:
+                    raise APIException.rate_limited(min(wait, 3600))
+                time.sleep(wait)
+                wait = self.try_acquire(client_id, cost)
+        finally:
+            self._queue.release()
+
+    @staticmethod
+    def _time_to_afford(tokens: float, cost: float, capacity: float, refill: float) -> float:
+        if tokens >= cost:
+            return 0.0
+        if cost > capacity or refill <= 0:
+            return math.inf
+        return (cost - tokens) / refill
@@ -0,0 +1,40 @@
+import os
+import sqlite3
+import threading
+
+class SQLiteStore:
+    """
+    Base class for state shared between worker processes through one SQLite file
+    Each thread gets its own connection in WAL mode, so readers in every worker run
+    concurrently with a single writer. Connections are opened lazily, never at import
+    time, so nothing is inherited across a gunicorn fork.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection, creating the schema on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            self._create_schema(conn)
+        self._local.conn = conn
+        self._on_connect(conn)
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        """Creates tables and indexes; statements must be idempotent"""
+        raise NotImplementedError
+
+    def _on_connect(self, conn: sqlite3.Connection) -> None:
+        """Hook run once per new connection after the schema exists"""
@@ -1,24 +1,41 @@
+import httplib2
 from googleapiclient.discovery import build
 from app.models.nutrition_models import VideoInfo
+from app.services.cache_service import ResultCache, cache_version
+from app.utils.deadline import Deadline
+from app.utils.tracing import tracer
 import logging
 from typing import Optional, List
 
+# Bump when the search queries below change
+SEARCH_QUERY_VERSION = 1
+
 class YouTubeService:
     """
     Service class for interacting with YouTube Data API
     Handles fetching recipe videos for food items
+    Results are served from the shared ResultCache when one is provided
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[ResultCache] = None):
         self.api_key = api_key
+        self.cache = cache
+        self.version = cache_version(SEARCH_QUERY_VERSION)
         self.logger = logging.getLogger(__name__)
 
-    def get_recipe_videos(self, is_recipe: bool, food_item: str, max_results: int = 10) -> Optional[List[VideoInfo]]:
+    def cache_key(self, is_recipe: bool, food_item: str, max_results: int = 10) -> str:
+        """Builds the versioned cache key for a video search"""
+        return ResultCache.make_key('videos', self.version, is_recipe, food_item.lower().strip(), max_results)
+
+    def get_recipe_videos(
+        self, is_recipe: bool, food_item: str, max_results: int = 10, deadline: Optional[Deadline] = None
+    ) -> Optional[List[VideoInfo]]:
         """
         Fetches recipe videos for a given food item from YouTube
         Args:
             food_item: Name of the food/recipe to search for
             max_results: Maximum number of videos to return
+            deadline: Request time budget; what is left becomes the search timeout
         Returns:
             List of VideoInfo objects or None if no videos found/error occurs
         """
@@ -26,21 +43,24 @@ class YouTubeService:
             self.logger.error("YouTube API key not found")
             return None
 
+        key = self.cache_key(is_recipe, food_item, max_results)
+        if self.cache:
+            cached = self.cache.get_models(key, VideoInfo)
+            if cached is not None:
+                return cached
+
         try:
+            # Videos are optional, so running out of time here just means no videos
+            http = httplib2.Http(timeout=deadline.timeout(stage='video search')) if deadline else None
             youtube = build('youtube', 'v3', 
-                          developerKey=self.api_key)
-            search_response = None
+                          developerKey=self.api_key, http=http)
             if is_recipe:
-                search_response = youtube.search().list(
-                    q=f"how to make {food_item} recipe",
-                    part='id,snippet',
-                    maxResults=max_results,
-                    type='video',
-                    regionCode='IN'
-                ).execute()
+                query = f"how to make {food_item} recipe"
             else:
+                query = f"suggest me a few recipes with {food_item}"
+            with tracer.span('youtube.search', is_recipe=is_recipe):
                 search_response = youtube.search().list(
-                    q=f"suggest me a few recipes with {food_item}",
+                    q=query,
                     part='id,snippet',
                     maxResults=max_results,
                     type='video',
@@ -59,7 +79,9 @@ class YouTubeService:
                 )
                 for item in search_response['items']
             ]
-            
+
+            if self.cache:
+                self.cache.set_models(key, videos)
             return videos
 
         except Exception as e:
@@ -1,3 +1,227 @@
+// Worker script for image downscaling, passed in by the page template
+const IMAGE_WORKER_URL = document.currentScript ? document.currentScript.dataset.imageWorker : null;
+
+// Upload limits advertised by the server (/client_config); defaults until it loads
+let clientConfig = {
+    image: {
+        max_dimension: 1280,
+        quality: 0.8,
+        mime_type: 'image/jpeg',
+        max_upload_bytes: 10 * 1024 * 1024
+    },
+    results: {
+        version: null,
+        max_entries: 200,
+        revalidate_after: 3600
+    }
+};
+
+// Loads the server's client settings, keeping the defaults if that fails
+function fetchClientConfig() {
+    return fetch('/client_config')
+        .then(response => response.ok ? response.json() : null)
+        .then(data => {
+            if (data && data.image && data.results) {
+                clientConfig = data;
+            }
+        })
+        .catch(error => console.error('Error fetching client config:', error));
+}
+
+const clientConfigReady = fetchClientConfig();
+
+// Service worker: precached app shell, suggestions served stale-while-revalidate and
+// recently viewed results available offline
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('/sw.js')
+            .catch(error => console.warn('Service worker registration failed:', error));
+    });
+}
+
+// Browser-side cache of nutrition results in IndexedDB. Entries carry the server's
+// result version (from /client_config) and the response ETag; an entry from another
+// version is ignored, and an entry older than revalidate_after is shown at once and
+// revalidated in the background. The least recently viewed entries beyond
+// max_entries are evicted.
+const RESULT_DB_NAME = 'calorie-counter';
+const RESULT_STORE = 'nutrition';
+let resultDBPromise = null;
+
+function idbRequest(request) {
+    return new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+function openResultDB() {
+    if (!resultDBPromise) {
+        if (!window.indexedDB) {
+            resultDBPromise = Promise.resolve(null);
+        } else {
+            const request = indexedDB.open(RESULT_DB_NAME, 1);
+            request.onupgradeneeded = () => {
+                const store = request.result.createObjectStore(RESULT_STORE, { keyPath: 'key' });
+                store.createIndex('accessedAt', 'accessedAt');
+            };
+            resultDBPromise = idbRequest(request).catch(error => {
+                console.warn('Result cache unavailable:', error);
+                return null;
+            });
+        }
+    }
+    return resultDBPromise;
+}
+
+// Normalized (food_item, quantity, unit) so "Idli " x 2 and "idli" x 2.0 share an entry
+function resultKey(foodItem, quantity, unit) {
+    return `${foodItem.trim().toLowerCase().replace(/\s+/g, ' ')}|${Number(quantity)}|${unit}`;
+}
+
+async function getCachedResult(key) {
+    const db = await openResultDB();
+    if (!db) return null;
+    try {
+        const entry = await idbRequest(db.transaction(RESULT_STORE).objectStore(RESULT_STORE).get(key));
+        return entry && entry.version === clientConfig.results.version ? entry : null;
+    } catch (error) {
+        console.warn('Result cache read failed:', error);
+        return null;
+    }
+}
+
+async function putCachedResult(entry) {
+    const db = await openResultDB();
+    if (!db) return;
+    try {
+        const store = db.transaction(RESULT_STORE, 'readwrite').objectStore(RESULT_STORE);
+        await idbRequest(store.put({ ...entry, version: clientConfig.results.version, accessedAt: Date.now() }));
+        let excess = await idbRequest(store.count()) - clientConfig.results.max_entries;
+        if (excess > 0) {
+            const cursorRequest = store.index('accessedAt').openCursor();
+            cursorRequest.onsuccess = () => {
+                const cursor = cursorRequest.result;
+                if (cursor && excess-- > 0) {
+                    cursor.delete();
+                    cursor.continue();
+                }
+            };
+        }
+    } catch (error) {
+        console.warn('Result cache write failed:', error);
+    }
+}
+
+// Fetches a nutrition result with GET so it carries an ETag; with etag set, a
+// matching result comes back as 304 and no body
+async function fetchNutrition(foodItem, quantity, unit, etag) {
+    const params = new URLSearchParams({ food_item: foodItem, quantity: quantity, unit: unit });
+    const response = await fetch(`/calculate_nutrition?${params}`, {
+        headers: etag ? { 'If-None-Match': etag } : {},
+        cache: 'no-store'
+    });
+    if (response.status === 304) {
+        return { notModified: true };
+    }
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    return { data: await response.json(), etag: response.headers.get('ETag') };
+}
+
+// Results are only kept when complete (nothing skipped for lack of time)
+function isCacheable(data) {
+    return !data.error && (!data.skipped || data.skipped.length === 0);
+}
+
+// Shows the cached result at once and refreshes it in the background when stale
+async function revalidateResult(entry, foodItem, quantity, unit) {
+    if (Date.now() - entry.storedAt < clientConfig.results.revalidate_after * 1000) {
+        await putCachedResult(entry);
+        return;
+    }
+    try {
+        const fresh = await fetchNutrition(foodItem, quantity, unit, entry.etag);
+        if (fresh.notModified) {
+            await putCachedResult({ ...entry, storedAt: Date.now() });
+        } else if (isCacheable(fresh.data)) {
+            await putCachedResult({ key: entry.key, data: fresh.data, etag: fresh.etag, storedAt: Date.now() });
+            if (currentResultKey === entry.key) {
+                renderNutritionResult(fresh.data);
+            }
+        }
+    } catch (error) {
+        console.warn('Revalidation failed, keeping the cached result:', error);
+    }
+}
+
+let imageWorker = null;
+let imageWorkerRequests = 0;
+
+// Resizes a photo to the advertised max dimension and re-encodes it, in a worker
+// when possible and on the main thread otherwise. Resolves to the original file if
+// the browser cannot decode it or re-encoding would not make it smaller.
+async function downscaleImage(file) {
+    const options = {
+        maxDimension: clientConfig.image.max_dimension,
+        quality: clientConfig.image.quality,
+        mimeType: clientConfig.image.mime_type
+    };
+    let resized = null;
+    try {
+        resized = IMAGE_WORKER_URL && window.Worker && window.OffscreenCanvas
+            ? await downscaleInWorker(file, options)
+            : await downscaleOnMainThread(file, options);
+    } catch (error) {
+        console.warn('Downscaling failed, uploading the original:', error);
+    }
+    if (!resized || resized.size >= file.size) {
+        return file;
+    }
+    console.log(`Downscaled image from ${file.size} to ${resized.size} bytes`);
+    return resized;
+}
+
+function downscaleInWorker(file, options) {
+    if (!imageWorker) {
+        imageWorker = new Worker(IMAGE_WORKER_URL);
+    }
+    const id = ++imageWorkerRequests;
+    return new Promise((resolve, reject) => {
+        function onMessage(event) {
+            if (event.data.id !== id) return;
+            imageWorker.removeEventListener('message', onMessage);
+            if (event.data.error) {
+                reject(new Error(event.data.error));
+            } else {
+                resolve(event.data.blob);
+            }
+        }
+        imageWorker.addEventListener('message', onMessage);
+        imageWorker.postMessage({ id, file, ...options });
+    });
+}
+
+async function downscaleOnMainThread(file, options) {
+    const bitmap = await createImageBitmap(file, { imageOrientation: 'from-image' });
+    const scale = Math.min(1, options.maxDimension / Math.max(bitmap.width, bitmap.height));
+    const canvas = document.createElement('canvas');
+    canvas.width = Math.max(1, Math.round(bitmap.width * scale));
+    canvas.height = Math.max(1, Math.round(bitmap.height * scale));
+    canvas.getContext('2d').drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+    bitmap.close();
+    return new Promise(resolve => canvas.toBlob(resolve, options.mimeType, options.quality));
+}
+
+// File name matching the re-encoded type, e.g. IMG_0001.HEIC -> IMG_0001.jpg
+function uploadFileName(file, blob) {
+    const name = file.name || 'photo';
+    if (blob === file) return name;
+    const extension = blob.type === 'image/webp' ? 'webp' : 'jpg';
+    return `${name.replace(/\.[^.]*$/, '')}.${extension}`;
+}
+
 // Utility function to prevent rapid-fire API calls
 function debounce(func, wait) {
     let timeout;
@@ -11,6 +235,17 @@ function debounce(func, wait) {
     };
 }
 
+// Milliseconds to wait before retrying a 503: the server's Retry-After (1 s if absent),
+// doubled on each further attempt, at most maxMs
+function retryDelay(response, attempt, maxMs) {
+    const retryAfter = parseFloat(response.headers.get('Retry-After')) || 1;
+    return Math.min(retryAfter * 1000 * 2 ** attempt, maxMs);
+}
+
+function sleep(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+}
+
 // Fetches food suggestions from the backend API
 function fetchFoodSuggestions() {
     const datalist = document.getElementById("food-suggestions");
@@ -269,6 +504,31 @@ function toggleSubRows(id) {
     });
 }
 
+// Lists each food detected on a plate with its calories and health score
+function generatePlateItemsHTML(items) {
+    return `
+        <div style="margin-bottom: 24px;">
+            <h3 style="
+                margin: 0 0 12px 0;
+                color: var(--text, #1e293b);
+                font-size: 1rem;
+                font-weight: 600;
+            ">On this plate</h3>
+            <table style="width: 100%; border-collapse: collapse;">
+                <tbody>
+                    ${items.map(item => `
+                        <tr>
+                            <td>${item.food_item} <span style="color: var(--text-muted, #64748b); font-size: 0.875rem;">(${item.quantity} ${item.unit})</span></td>
+                            <td style="text-align: right;">${item.is_valid_food ? item.nutrition_info.calories : '—'}</td>
+                            <td style="text-align: right; font-weight: 600; color: ${item.health_score.color};">${item.is_valid_food ? item.health_score.score : ''}</td>
+                        </tr>
+                    `).join('')}
+                </tbody>
+            </table>
+        </div>
+    `;
+}
+
 function generateRecipeVideosHTML(data) {
     if (!data.recipe_urls || data.recipe_urls.length === 0) return '';
 
@@ -355,6 +615,36 @@ function resetForm() {
     document.getElementById('quantity_unit').value = '';
 }
 
+// Key of the result currently on screen, so a background refresh only redraws its own result
+let currentResultKey = null;
+
+function renderNutritionResult(data) {
+    const result = document.getElementById('result');
+    if (data.error) {
+        result.innerHTML = `
+            <div style="
+                color: #dc2626;
+                padding: 16px;
+                border: 1px solid #fecaca;
+                border-radius: 12px;
+                margin-top: 16px;
+                background: #fef2f2;
+            ">
+                <p style="margin: 0;">${data.error}</p>
+                ${data.error_type ? `<p style="margin: 8px 0 0; font-size: 0.875rem; opacity: 0.8;">Error type: ${data.error_type}</p>` : ''}
+            </div>
+        `;
+    } else {
+        result.innerHTML = `
+            <div>
+                ${data.insight ? `<p style="margin: 0 0 16px 0; font-style: italic; color: var(--text-muted, #64748b); line-height: 1.6;">${data.insight}</p>` : ''}
+                ${data.is_valid_food && data.health_score ? generateHealthScoreHTML(data.health_score) : ''}
+                ${data.is_valid_food ? generateNutritionTableHTML(data) : ''}
+                ${data.recipe_urls ? generateRecipeVideosHTML(data) : ''}
+            </div>`;
+    }
+}
+
 // Handles form submission and displays results
 async function submitForm() {
     const loader = document.getElementById('loader');
@@ -390,46 +680,23 @@ async function submitForm() {
     result.innerHTML = '';
 
     try {
-        const response = await fetch("/calculate_nutrition", {
-            method: "POST",
-            headers: {
-                "Content-Type": "application/json"
-            },
-            body: JSON.stringify({
-                food_item: foodItem,
-                quantity: quantity,
-                unit: quantityUnit
-            })
-        });
-
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
+        await clientConfigReady;
+        const key = resultKey(foodItem, quantity, quantityUnit);
+        currentResultKey = key;
+
+        // Repeat lookups are answered from the browser cache without waiting on the network
+        const cached = await getCachedResult(key);
+        if (cached) {
+            renderNutritionResult(cached.data);
+            resetForm();
+            revalidateResult(cached, foodItem, quantity, quantityUnit);
+            return;
         }
 
-        const data = await response.json();
-
-        if (data.error) {
-            result.innerHTML = `
-                <div style="
-                    color: #dc2626;
-                    padding: 16px;
-                    border: 1px solid #fecaca;
-                    border-radius: 12px;
-                    margin-top: 16px;
-                    background: #fef2f2;
-                ">
-                    <p style="margin: 0;">${data.error}</p>
-                    ${data.error_type ? `<p style="margin: 8px 0 0; font-size: 0.875rem; opacity: 0.8;">Error type: ${data.error_type}</p>` : ''}
-                </div>
-            `;
-        } else {
-            result.innerHTML = `
-                <div>
-                    ${data.insight ? `<p style="margin: 0 0 16px 0; font-style: italic; color: var(--text-muted, #64748b); line-height: 1.6;">${data.insight}</p>` : ''}
-                    ${data.is_valid_food && data.health_score ? generateHealthScoreHTML(data.health_score) : ''}
-                    ${data.is_valid_food ? generateNutritionTableHTML(data) : ''}
-                    ${data.recipe_urls ? generateRecipeVideosHTML(data) : ''}
-                </div>`;
+        const { data, etag } = await fetchNutrition(foodItem, quantity, quantityUnit);
+        renderNutritionResult(data);
+        if (isCacheable(data)) {
+            putCachedResult({ key, data, etag, storedAt: Date.now() });
         }
         resetForm();
     } catch (error) {
@@ -550,11 +817,7 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
 
-        // Size validation (10MB limit)
-        if (file.size > 10 * 1024 * 1024) {
-            alert('Please select an image smaller than 10MB');
-            return;
-        }
+        // Size is checked after downscaling, just before upload
 
         // Store the file globally
         selectedImageFile = file;
@@ -615,10 +878,6 @@ document.addEventListener('DOMContentLoaded', function() {
                 alert('Please drop an image file');
                 return;
             }
-            if (file.size > 10 * 1024 * 1024) {
-                alert('Please drop an image smaller than 10MB');
-                return;
-            }
             selectedImageFile = file;
             const reader = new FileReader();
             reader.onload = function(evt) {
@@ -654,17 +913,18 @@ document.addEventListener('DOMContentLoaded', function() {
         result.innerHTML = '';
 
         try {
+            // Shrink the photo to the server's limits before it goes over the network
+            const upload = await downscaleImage(fileToUpload);
+            const maxBytes = clientConfig.image.max_upload_bytes;
+            if (upload.size > maxBytes) {
+                throw new Error(`Please select an image smaller than ${Math.floor(maxBytes / (1024 * 1024))}MB`);
+            }
             const formData = new FormData();
-            formData.append('image', fileToUpload, fileToUpload.name || 'photo.jpg');
+            formData.append('image', upload, uploadFileName(fileToUpload, upload));
 
-            console.log('Sending image:', fileToUpload.name, fileToUpload.size, fileToUpload.type);
+            console.log('Sending image:', fileToUpload.name, upload.size, upload.type);
 
-            const response = await fetch('/analyze_image', {
-                method: 'POST',
-                body: formData
-            });
-
-            const data = await response.json();
+            const data = await analyzeImage(formData);
             console.log('Response:', data);
 
             if (data.error) {
@@ -685,6 +945,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     <div>
                         ${data.insight ? `<p style="margin: 0 0 16px 0; font-style: italic; color: var(--text-muted, #64748b); line-height: 1.6;">${data.insight}</p>` : ''}
                         ${data.is_valid_food && data.health_score ? generateHealthScoreHTML(data.health_score) : ''}
+                        ${data.items ? generatePlateItemsHTML(data.items) : ''}
                         ${data.is_valid_food ? generateNutritionTableHTML(data) : ''}
                         ${data.recipe_urls ? generateRecipeVideosHTML(data) : ''}
                     </div>`;
@@ -704,6 +965,60 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    // Submits the image as a background job and long-polls until it finishes.
+    // Falls back to the synchronous endpoint only where job mode is not deployed (404). A
+    // full job queue or an overloaded server (503) is retried after its Retry-After, never
+    // run synchronously, which would bypass the bounded job pool.
+    async function analyzeImage(formData) {
+        const JOB_POLL_INTERVAL_MS = 1000;
+        const deadline = Date.now() + 120000;
+        let submit;
+        for (let attempt = 0; ; attempt++) {
+            submit = await fetch('/analyze_image/jobs', {
+                method: 'POST',
+                body: formData
+            });
+            if (submit.status !== 503) break;
+            const delay = retryDelay(submit, attempt, deadline - Date.now());
+            // Out of time: the 503's error is shown
+            if (Date.now() + delay >= deadline) break;
+            await sleep(delay);
+        }
+        if (submit.status === 404) {
+            const response = await fetch('/analyze_image', {
+                method: 'POST',
+                body: formData
+            });
+            return response.json();
+        }
+        const job = await submit.json();
+        if (submit.status !== 202) {
+            return job;
+        }
+
+        for (let attempt = 0; Date.now() < deadline; ) {
+            const response = await fetch(`${job.status_url}?wait=20`);
+            if (response.status === 503) {
+                // A shed poll says nothing about the job, which keeps running
+                await sleep(retryDelay(response, attempt++, Math.max(0, deadline - Date.now())));
+                continue;
+            }
+            const status = await response.json();
+            if (!response.ok) {
+                return status;
+            }
+            if (status.status === 'succeeded') {
+                return status.result;
+            }
+            if (status.status === 'failed') {
+                return { error: status.error };
+            }
+            // Under load the server answers polls at once instead of long-polling
+            await sleep(JOB_POLL_INTERVAL_MS);
+        }
+        return { error: 'Image analysis timed out. Please try again.' };
+    }
+
     // Reset upload state
     function resetUpload() {
         selectedImageFile = null;
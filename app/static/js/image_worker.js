@@ -0,0 +1,23 @@
+// Downscales and re-encodes a photo off the main thread before upload.
+// Receives { id, file, maxDimension, quality, mimeType } and replies with
+// { id, blob, width, height } or { id, error }.
+self.onmessage = async function(event) {
+    const { id, file, maxDimension, quality, mimeType } = event.data;
+    try {
+        const bitmap = await createImageBitmap(file, { imageOrientation: 'from-image' });
+        const scale = Math.min(1, maxDimension / Math.max(bitmap.width, bitmap.height));
+        const width = Math.max(1, Math.round(bitmap.width * scale));
+        const height = Math.max(1, Math.round(bitmap.height * scale));
+
+        const canvas = new OffscreenCanvas(width, height);
+        const context = canvas.getContext('2d');
+        context.imageSmoothingQuality = 'high';
+        context.drawImage(bitmap, 0, 0, width, height);
+        bitmap.close();
+
+        const blob = await canvas.convertToBlob({ type: mimeType, quality: quality });
+        self.postMessage({ id, blob, width, height });
+    } catch (error) {
+        self.postMessage({ id, error: String(error) });
+    }
+};
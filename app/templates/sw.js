@@ -0,0 +1,101 @@
+// Service worker, rendered by page_routes.service_worker. VERSION changes whenever
+// a precached asset is rebuilt, which installs a fresh shell cache and drops the old ones.
+const VERSION = {{ version|tojson }};
+const SHELL_CACHE = `shell-${VERSION}`;
+const RUNTIME_CACHE = `runtime-${VERSION}`;
+const RESULTS_CACHE = 'results';
+const PRECACHE = {{ precache|tojson }};
+const MAX_RESULTS = {{ max_results|tojson }};
+
+// Served from cache at once and refreshed in the background
+const STALE_WHILE_REVALIDATE = ['/get_food_suggestions', '/client_config'];
+const FONT_HOSTS = ['fonts.googleapis.com', 'fonts.gstatic.com'];
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => cache.addAll(PRECACHE))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys.filter(key => key !== SHELL_CACHE && key !== RUNTIME_CACHE && key !== RESULTS_CACHE)
+                    .map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+
+    if (request.mode === 'navigate' && url.pathname === '/') {
+        // The app shell itself: the precached page, whatever its query string
+        event.respondWith(staleWhileRevalidate(SHELL_CACHE, request, '/'));
+    } else if (request.mode === 'navigate') {
+        // Any other page is cached under its own URL, never over the shell
+        event.respondWith(networkFirst(RUNTIME_CACHE, request));
+    } else if (url.origin === self.location.origin && PRECACHE.includes(url.pathname)) {
+        event.respondWith(cacheFirst(request));
+    } else if (url.origin === self.location.origin && STALE_WHILE_REVALIDATE.includes(url.pathname)) {
+        event.respondWith(staleWhileRevalidate(RUNTIME_CACHE, request));
+    } else if (url.origin === self.location.origin && url.pathname === '/calculate_nutrition') {
+        event.respondWith(networkFirst(RESULTS_CACHE, request, MAX_RESULTS));
+    } else if (FONT_HOSTS.includes(url.hostname)) {
+        event.respondWith(staleWhileRevalidate(RUNTIME_CACHE, request));
+    }
+});
+
+// Fingerprinted assets never change under the same URL
+async function cacheFirst(request) {
+    const cached = await caches.match(request);
+    return cached || fetch(request);
+}
+
+async function staleWhileRevalidate(cacheName, request, cacheKey) {
+    const cache = await caches.open(cacheName);
+    const key = cacheKey || request;
+    const cached = await cache.match(key);
+    const refresh = fetch(request)
+        .then(response => {
+            if (response.ok || response.type === 'opaque') {
+                cache.put(key, response.clone());
+            }
+            return response;
+        })
+        .catch(error => {
+            if (cached) return cached;
+            throw error;
+        });
+    return cached || refresh;
+}
+
+// Recently viewed pages and results stay available offline; with maxEntries only the
+// newest are kept
+async function networkFirst(cacheName, request, maxEntries) {
+    const cache = await caches.open(cacheName);
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            await cache.put(request, response.clone());
+            if (maxEntries) trimCache(cache, maxEntries);
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(request, { ignoreVary: true });
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+async function trimCache(cache, maxEntries) {
+    const keys = await cache.keys();
+    // Keys come back in insertion order
+    await Promise.all(keys.slice(0, Math.max(0, keys.length - maxEntries)).map(key => cache.delete(key)));
+}
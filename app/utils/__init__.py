@@ -1,3 +1,4 @@
 from .constants import VALID_UNITS, NUTRIENT_RANGES
+from .http_utils import compress_response, conditional, json_response
 
-__all__ = ['VALID_UNITS', 'NUTRIENT_RANGES'] 
\ No newline at end of file
+__all__ = ['VALID_UNITS', 'NUTRIENT_RANGES', 'compress_response', 'conditional', 'json_response']
\ No newline at end of file
@@ -0,0 +1,39 @@
+import time
+from typing import Optional
+from app.exceptions.api_exceptions import APIException
+
+class Deadline:
+    """
+    Time budget of one request, set at the route and handed down to every upstream call
+    Each call uses what is left as its timeout, and optional stages ask whether enough
+    is left before starting.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left, never negative"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def allows(self, seconds: float) -> bool:
+        """Whether at least this many seconds are left"""
+        return self.remaining() >= seconds
+
+    def timeout(self, minimum: float = 0.0, stage: Optional[str] = None) -> float:
+        """
+        Timeout for the next upstream call
+        Args:
+            minimum: Seconds below which the call is not worth starting
+            stage: Name of the call, for the error message
+        Raises:
+            APIException: If less than minimum (or nothing) is left
+        """
+        remaining = self.remaining()
+        if remaining <= 0 or remaining < minimum:
+            raise APIException.deadline_exceeded(self.seconds, stage)
+        return remaining
+
+    def __repr__(self) -> str:
+        return f"Deadline({self.remaining():.2f}s of {self.seconds}s left)"
@@ -0,0 +1,115 @@
+import gzip
+import hashlib
+import json
+from functools import wraps
+from http import HTTPStatus
+from typing import Any, Dict, Optional
+from flask import request, make_response, current_app
+from app.config import Config
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json'}
+
+def dumps_json(data: Any) -> bytes:
+    """
+    Serializes a response body: compact, UTF-8, keys sorted so equal data always hashes
+    to the same ETag. Uses orjson when installed and the standard library otherwise.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers beyond 64 bits, which the standard encoder still handles
+            pass
+    return json.dumps(data, default=str, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+
+def json_response(data: Any, status: int = HTTPStatus.OK, headers: Optional[Dict[str, str]] = None):
+    """Response with a body serialized once by dumps_json, for the large analysis results"""
+    return current_app.response_class(dumps_json(data), status=status, headers=headers, mimetype='application/json')
+
+def negotiate_encoding() -> Optional[str]:
+    """
+    Picks the best content coding the client accepts
+    Returns:
+        'br', 'gzip' or None when the response should be sent uncompressed
+    """
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def compress_response(response):
+    """
+    after_request hook compressing JSON bodies above Config.COMPRESSION_MIN_SIZE.
+    A strong ETag is suffixed with the coding so each representation keeps a distinct validator.
+    """
+    if (response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < Config.COMPRESSION_MIN_SIZE:
+        return response
+
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    if encoding == 'br':
+        response.set_data(brotli.compress(body, quality=Config.BROTLI_QUALITY))
+    else:
+        response.set_data(gzip.compress(body, compresslevel=Config.GZIP_LEVEL))
+    response.content_encoding = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+def conditional(max_age: int = 0):
+    """
+    Decorator adding a strong content-hash ETag to successful GET responses and
+    answering matching If-None-Match requests with 304 Not Modified.
+    Args:
+        max_age: Seconds the client may reuse the response without revalidating
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+                return response
+
+            etag = hashlib.sha256(response.get_data()).hexdigest()[:32]
+            response.set_etag(etag)
+            if max_age:
+                response.cache_control.max_age = max_age
+            else:
+                response.cache_control.no_cache = True
+
+            # Clients may hold any encoded variant produced by compress_response
+            for tag in (etag, f"{etag}-br", f"{etag}-gzip"):
+                if request.if_none_match.contains(tag):
+                    not_modified = current_app.response_class(status=304)
+                    not_modified.set_etag(tag)
+                    not_modified.headers['Cache-Control'] = response.headers['Cache-Control']
+                    not_modified.vary.add('Accept-Encoding')
+                    return not_modified
+            return response
+        return wrapper
+    return decorator
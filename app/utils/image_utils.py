@@ -0,0 +1,72 @@
+import base64
+import hashlib
+import io
+import shutil
+from tempfile import SpooledTemporaryFile
+from typing import IO, Tuple
+from flask import Request
+from PIL import Image
+from app.config import Config
+from app.exceptions.api_exceptions import APIException
+
+# Multiple of 3 so every chunk but the last encodes to base64 without padding
+CHUNK_SIZE = 3 * 64 * 1024
+
+class SpoolingRequest(Request):
+    """Request that keeps uploaded files in memory only up to UPLOAD_SPOOL_BYTES"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None) -> IO[bytes]:
+        return SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_BYTES, mode='rb+')
+
+def spool_upload(file) -> IO[bytes]:
+    """Copies an upload that must outlive its request, spilling to disk above UPLOAD_SPOOL_BYTES"""
+    spooled = SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_BYTES, mode='rb+')
+    shutil.copyfileobj(file, spooled, CHUNK_SIZE)
+    spooled.seek(0)
+    return spooled
+
+def check_image_header(file, max_pixels: int) -> Tuple[str, int, int]:
+    """
+    Validates an image from its header only, without decoding the pixel data
+    Returns:
+        The image format, width and height
+    Raises:
+        APIException: If the file is not a readable image or has more than max_pixels pixels
+    """
+    try:
+        with Image.open(file) as image:
+            image_format, (width, height) = image.format, image.size
+    except Image.DecompressionBombError:
+        raise APIException.image_too_large(max_pixels)
+    except (OSError, SyntaxError, ValueError):
+        raise APIException.invalid_image_format()
+    finally:
+        file.seek(0)
+    if width * height > max_pixels:
+        raise APIException.image_too_large(max_pixels)
+    return image_format, width, height
+
+def hash_file(file) -> str:
+    """sha256 of a file's remaining bytes, read in chunks; rewinds to where it started"""
+    start = file.tell()
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    file.seek(start)
+    return digest.hexdigest()
+
+def encode_data_url(file, mime: str = 'image/jpeg') -> str:
+    """
+    Builds a base64 data URL from a file in fixed-size chunks
+    Only the encoded URL is held in memory, never the raw bytes alongside a full base64 copy.
+    """
+    output = io.StringIO()
+    output.write(f"data:{mime};base64,")
+    pending = b''
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+        chunk = pending + chunk
+        whole = len(chunk) - len(chunk) % 3
+        output.write(base64.b64encode(chunk[:whole]).decode('ascii'))
+        pending = chunk[whole:]
+    output.write(base64.b64encode(pending).decode('ascii'))
+    return output.getvalue()
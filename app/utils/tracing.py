@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+from app.config import Config
+
+# Incoming X-Request-ID values are reused only when they look like an id
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+class Span:
+    """One timed step of a request, e.g. an upstream call or the health score"""
+
+    __slots__ = ('name', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_ns': self.start_ns,
+            'duration_ms': round(self.duration_ms, 2),
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+class Trace:
+    """Spans of one request (or background job), collected until it finishes"""
+
+    def __init__(self, request_id: str, recording: bool, sampled: bool):
+        self.request_id = request_id
+        self.trace_id = secrets.token_hex(16)
+        self.recording = recording
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('trace', default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar('span', default=None)
+
+class FileExporter:
+    """Appends each finished trace to a JSON-lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps({
+            'trace_id': trace.trace_id,
+            'request_id': trace.request_id,
+            'name': trace.root.name,
+            'duration_ms': round(trace.root.duration_ms, 2),
+            'spans': [span.to_dict() for span in trace.spans]
+        }, default=str)
+        with self._lock, open(self.path, 'a') as f:
+            f.write(line + '\n')
+
+class OTLPExporter:
+    """
+    Sends finished traces to an OTLP/HTTP collector as JSON, from a background thread
+    Traces are dropped rather than queued without bound when the collector is slow.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, queue_size: int = 1000, timeout: float = 2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self._queue: 'queue.Queue[Trace]' = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._send_loop, name='otlp-exporter', daemon=True)
+        self._thread.start()
+
+    def export(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.logger.warning("Trace export queue full; dropping trace %s", trace.request_id)
+
+    def payload(self, trace: Trace) -> Dict[str, Any]:
+        """The trace as an OTLP ExportTraceServiceRequest in JSON encoding"""
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [self._attribute('service.name', self.service_name)]},
+                'scopeSpans': [{
+                    'scope': {'name': 'calorie_counter'},
+                    'spans': [{
+                        'traceId': trace.trace_id,
+                        'spanId': span.span_id,
+                        'parentSpanId': span.parent_id or '',
+                        'name': span.name,
+                        'kind': 2 if span is trace.root else 1,
+                        'startTimeUnixNano': str(span.start_ns),
+                        'endTimeUnixNano': str(span.end_ns or span.start_ns),
+                        'attributes': [
+                            self._attribute(key, value)
+                            for key, value in {**span.attributes, 'request.id': trace.request_id}.items()
+                        ],
+                        'status': {'code': 2, 'message': span.error} if span.error else {'code': 1}
+                    } for span in trace.spans]
+                }]
+            }]
+        }
+
+    def _send_loop(self) -> None:
+        while True:
+            trace = self._queue.get()
+            try:
+                request = urllib.request.Request(
+                    self.endpoint,
+                    data=json.dumps(self.payload(trace), default=str).encode(),
+                    headers={'Content-Type': 'application/json'}
+                )
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except Exception as e:
+                self.logger.warning(f"Trace export to {self.endpoint} failed: {e}")
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {'key': key, 'value': {'boolValue': value}}
+        if isinstance(value, int):
+            return {'key': key, 'value': {'intValue': str(value)}}
+        if isinstance(value, float):
+            return {'key': key, 'value': {'doubleValue': value}}
+        return {'key': key, 'value': {'stringValue': str(value)}}
+
+class Tracer:
+    """
+    Request-scoped tracing: a trace per request, nested spans around each step
+    The current trace and span live in context variables, so services open spans without
+    any argument threading. A trace is exported when it was sampled (sample_rate) or when
+    it took at least slow_seconds, so slow requests are always kept. Without an exporter
+    only request ids are tracked and spans cost nothing.
+    """
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0, slow_seconds: Optional[float] = None, max_spans: int = 256):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.max_spans = max_spans
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls) -> 'Tracer':
+        exporter = None
+        if Config.TRACE_EXPORTER == 'file':
+            exporter = FileExporter(Config.TRACE_FILE_PATH)
+        elif Config.TRACE_EXPORTER == 'otlp':
+            exporter = OTLPExporter(Config.TRACE_OTLP_ENDPOINT, Config.TRACE_SERVICE_NAME)
+        return cls(
+            exporter,
+            sample_rate=Config.TRACE_SAMPLE_RATE,
+            slow_seconds=Config.TRACE_SLOW_MS / 1000 if Config.TRACE_SLOW_MS else None
+        )
+
+    @staticmethod
+    def request_id_from(header: Optional[str]) -> str:
+        """Reuses a caller's request id when it is well formed, otherwise makes one"""
+        return header if header and _REQUEST_ID.match(header) else uuid.uuid4().hex
+
+    def start_trace(self, name: str, request_id: Optional[str] = None, **attributes) -> Trace:
+        """Starts the trace of the current request or job and opens its root span"""
+        sampled = self.exporter is not None and random.random() < self.sample_rate
+        recording = sampled or (self.exporter is not None and self.slow_seconds is not None)
+        trace = Trace(request_id or uuid.uuid4().hex, recording, sampled)
+        _current_trace.set(trace)
+        _current_span.set(None)
+        if recording:
+            trace.root = self._open(trace, name, attributes)
+            _current_span.set(trace.root)
+        return trace
+
+    def finish_trace(self, error: Optional[str] = None, **attributes) -> Optional[Trace]:
+        """Closes the root span and exports the trace if it was sampled or slow"""
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        _current_trace.set(None)
+        _current_span.set(None)
+        if not trace.recording:
+            return trace
+
+        trace.root.end_ns = time.time_ns()
+        trace.root.set(**attributes)
+        trace.root.error = error
+        slow = self.slow_seconds is not None and trace.root.duration_ms >= self.slow_seconds * 1000
+        if trace.sampled or slow:
+            try:
+                self.exporter.export(trace)
+            except Exception as e:
+                self.logger.warning(f"Trace export failed: {e}")
+        return trace
+
+    @contextmanager
+    def trace(self, name: str, request_id: Optional[str] = None, **attributes) -> Iterator[Trace]:
+        """Traces a unit of work outside a request, e.g. a background job"""
+        trace = self.start_trace(name, request_id, **attributes)
+        try:
+            yield trace
+        except BaseException as e:
+            self.finish_trace(error=f"{type(e).__name__}: {e}")
+            raise
+        self.finish_trace()
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """
+        Times the enclosed step as a child of the current span
+        Yields the span (to add attributes) or None when the trace is not recorded
+        """
+        trace = _current_trace.get()
+        if trace is None or not trace.recording or len(trace.spans) >= self.max_spans:
+            yield None
+            return
+        span = self._open(trace, name, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+
+    def _open(self, trace: Trace, name: str, attributes: Dict[str, Any]) -> Span:
+        parent = _current_span.get()
+        span = Span(name, parent.span_id if parent else None, dict(attributes))
+        trace.spans.append(span)
+        return span
+
+def current_request_id() -> Optional[str]:
+    """Request id of the trace in progress, if any"""
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+tracer = Tracer.from_config()
@@ -0,0 +1,277 @@
+"""
+Offline accuracy-vs-cost evaluation of nutrition backends against a labelled reference set
+
+    # Record a configuration once (needs OPENAI_API_KEY), then replay it offline
+    python -m benchmarks.nutrition_eval --live mini --model-fast gpt-4o-mini --record benchmarks/data/recordings/mini.json
+    python -m benchmarks.nutrition_eval --replay benchmarks/data/recordings/*.json \\
+        --backend table=mypackage.local_table:lookup --details
+
+Recordings hold every completion one configuration returned for the reference foods,
+with its model, tokens and latency. Replays run them through
+OpenAIService.get_nutrition_info with a stand-in client, so routing, fallbacks and
+escalation behave as they did live, at no cost. A local backend is any function
+(food_item, quantity, unit) -> NutritionScores (or a dict of the same shape).
+
+The table shows the mean absolute percentage error per nutrient, how often the
+NutritionAnalyzer health score lands in the same band as the reference's, and the
+latency, tokens and estimated cost (MODEL_PRICES) per lookup.
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from unittest.mock import patch
+
+os.environ.setdefault("OPENAI_API_KEY", "evaluation")
+
+from flask import Flask
+from app.config import Config
+from app.models.nutrition_models import NutritionScores
+from app.models.nutrition_record import NUTRIENT_FIELDS, NutritionRecord
+from app.services.model_router import ModelRouter, parse_pairs
+from app.services.nutrition_analyzer import NutritionAnalyzer
+from app.services.openai_service import OpenAIService
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+REFERENCE = os.path.join(ROOT, "data", "nutrition_reference.json")
+# Nutrients shown in the comparison table; --details lists all of them
+TABLE_NUTRIENTS = ['calories', 'protein', 'fat', 'carbohydrates', 'sugar', 'fiber', 'sodium']
+
+@dataclass
+class Observation:
+    """One reference food looked up by one configuration"""
+    food: Dict[str, Any]
+    predicted: Optional[NutritionRecord]
+    latency: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+def food_key(food: Dict[str, Any]) -> str:
+    return f"{food['food_item']}|{float(food['quantity']):g}|{food['unit']}"
+
+def load_reference(path: str = REFERENCE) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return json.load(f)["foods"]
+
+def make_router(models: Dict[str, str], routes: str = "") -> ModelRouter:
+    """Router without hedging, so every lookup sends exactly the calls the routes require"""
+    prices = {}
+    for model, price in parse_pairs(Config.MODEL_PRICES).items():
+        input_price, _, output_price = price.partition(':')
+        prices[model] = (float(input_price), float(output_price or input_price))
+    return ModelRouter(models, routes=parse_pairs(routes), prices=prices)
+
+def run_service(
+    reference: List[Dict[str, Any]],
+    service: OpenAIService,
+    replay: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> Tuple[List[Observation], Dict[str, List[Dict[str, Any]]]]:
+    """
+    Looks every food up through get_nutrition_info, live or from recorded completions
+    Returns:
+        The observations and the completions seen per food (the recording of a live run)
+    """
+    completions = service.client.beta.chat.completions
+    live_parse = completions.parse
+    observations, recording = [], {}
+    for food in reference:
+        key = food_key(food)
+        seen: List[Dict[str, Any]] = []
+        queued = list((replay or {}).get(key, []))
+
+        def parse(**kwargs):
+            if replay is not None:
+                if not queued:
+                    raise RuntimeError(f"No recorded completion left for {key}")
+                entry = queued.pop(0)
+                parsed = NutritionScores(**entry["parsed"]) if entry["parsed"] else None
+                response = SimpleNamespace(
+                    choices=[SimpleNamespace(message=SimpleNamespace(parsed=parsed, content=None))],
+                    usage=SimpleNamespace(prompt_tokens=entry["prompt_tokens"], completion_tokens=entry["completion_tokens"])
+                )
+                seen.append(entry)
+                return response
+            start = time.perf_counter()
+            response = live_parse(**kwargs)
+            parsed = response.choices[0].message.parsed
+            seen.append({
+                "model": kwargs["model"],
+                "parsed": parsed.model_dump() if parsed is not None else None,
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1)
+            })
+            return response
+
+        before = service.router.stats()
+        start = time.perf_counter()
+        predicted = None
+        with patch.object(completions, 'parse', side_effect=parse):
+            try:
+                nutrition = service.get_nutrition_info(food["food_item"], float(food["quantity"]), food["unit"])
+                predicted = NutritionRecord.from_dump(nutrition.model_dump())
+            except Exception as e:
+                print(f"  {key}: failed ({e})")
+        latency = time.perf_counter() - start
+        if replay is not None:
+            latency = sum(entry["latency_ms"] for entry in seen) / 1000
+        recording[key] = seen
+        observations.append(Observation(food, predicted, latency, *usage_delta(service.router, before)))
+    return observations, recording
+
+def usage_delta(router: ModelRouter, before: Dict[str, Dict[str, Any]]) -> Tuple[int, int, float]:
+    """Tokens and estimated cost of the calls made since the `before` snapshot of router.stats()"""
+    after = router.stats()
+    prompt = sum(after[tier]['prompt_tokens'] - before[tier]['prompt_tokens'] for tier in after)
+    completion = sum(after[tier]['completion_tokens'] - before[tier]['completion_tokens'] for tier in after)
+    cost = sum(after[tier]['estimated_cost_usd'] - before[tier]['estimated_cost_usd'] for tier in after)
+    return prompt, completion, cost
+
+def run_backend(reference: List[Dict[str, Any]], backend: Callable[[str, float, str], Any]) -> List[Observation]:
+    """Looks every food up through a local backend"""
+    observations = []
+    for food in reference:
+        start = time.perf_counter()
+        predicted = None
+        try:
+            nutrition = backend(food["food_item"], float(food["quantity"]), food["unit"])
+            dump = nutrition.model_dump() if hasattr(nutrition, 'model_dump') else nutrition
+            predicted = NutritionRecord.from_dump(dump)
+        except Exception as e:
+            print(f"  {food_key(food)}: failed ({e})")
+        observations.append(Observation(food, predicted, time.perf_counter() - start))
+    return observations
+
+def summarize(name: str, observations: List[Observation]) -> Dict[str, Any]:
+    """Per-nutrient error, health-score agreement, latency and cost of one configuration"""
+    answered = [observation for observation in observations if observation.predicted is not None]
+    errors = {}
+    for field in NUTRIENT_FIELDS:
+        pairs = [(getattr(NutritionRecord.from_dump(o.food["nutrition"]), field), getattr(o.predicted, field)) for o in answered]
+        relative = [abs(predicted - expected) / expected for expected, predicted in pairs if expected > 0]
+        errors[field] = {
+            "mae": statistics.fmean(abs(predicted - expected) for expected, predicted in pairs) if pairs else None,
+            "mape": statistics.fmean(relative) * 100 if relative else None,
+            "unit": NUTRIENT_FIELDS[field][1]
+        }
+
+    same_band, score_errors = 0, []
+    for observation in answered:
+        expected = NutritionAnalyzer.calculate_health_score(NutritionRecord.from_dump(observation.food["nutrition"]))
+        predicted = NutritionAnalyzer.calculate_health_score(observation.predicted)
+        same_band += expected.message == predicted.message
+        score_errors.append(abs(expected.score - predicted.score))
+
+    latencies = sorted(observation.latency * 1000 for observation in answered)
+    return {
+        "name": name,
+        "foods": len(observations),
+        "failed": len(observations) - len(answered),
+        "errors": errors,
+        "score_agreement": same_band / len(answered) * 100 if answered else None,
+        "score_mae": statistics.fmean(score_errors) if score_errors else None,
+        "latency_p50_ms": statistics.median(latencies) if latencies else None,
+        "latency_p95_ms": latencies[max(0, int(len(latencies) * 0.95) - 1)] if latencies else None,
+        "tokens_per_lookup": statistics.fmean(o.prompt_tokens + o.completion_tokens for o in observations),
+        "cost_per_1k_usd": statistics.fmean(o.cost for o in observations) * 1000
+    }
+
+def _cell(value: Optional[float], width: int, digits: int = 1) -> str:
+    return f"{'-' if value is None else f'{value:.{digits}f}':>{width}}"
+
+def format_table(summaries: List[Dict[str, Any]]) -> str:
+    """One comparison row per configuration"""
+    short = {'calories': 'kcal', 'protein': 'prot', 'carbohydrates': 'carb', 'sodium': 'Na'}
+    header = (f"{'config':<16}" + "".join(f"{short.get(field, field):>7}" for field in TABLE_NUTRIENTS)
+              + f"{'band%':>7}{'|Δscore|':>9}{'p50 ms':>8}{'p95 ms':>8}{'tokens':>8}{'$/1k':>8}{'failed':>7}")
+    lines = ["mean absolute % error per nutrient; band% = health score in the reference's band", header]
+    for summary in summaries:
+        lines.append(
+            f"{summary['name']:<16}"
+            + "".join(_cell(summary["errors"][field]["mape"], 7) for field in TABLE_NUTRIENTS)
+            + _cell(summary["score_agreement"], 7, 0) + _cell(summary["score_mae"], 9, 2)
+            + _cell(summary["latency_p50_ms"], 8, 0) + _cell(summary["latency_p95_ms"], 8, 0)
+            + _cell(summary["tokens_per_lookup"], 8, 0) + _cell(summary["cost_per_1k_usd"], 8, 3)
+            + f"{summary['failed']:>7}"
+        )
+    return "\n".join(lines)
+
+def format_details(summaries: List[Dict[str, Any]]) -> str:
+    """Mean absolute error (canonical unit) and % error of every nutrient, per configuration"""
+    lines = [f"{'nutrient':<22}" + "".join(f"{summary['name']:>22}" for summary in summaries)]
+    for field, (_, unit) in NUTRIENT_FIELDS.items():
+        cells = []
+        for summary in summaries:
+            error = summary["errors"][field]
+            mae = '-' if error["mae"] is None else f"{error['mae']:.2f}{unit}"
+            mape = '-' if error["mape"] is None else f"{error['mape']:.0f}%"
+            cells.append(f"{f'{mae} / {mape}':>22}")
+        lines.append(f"{field:<22}" + "".join(cells))
+    return "\n".join(lines)
+
+def load_backend(spec: str) -> Callable[[str, float, str], Any]:
+    module, _, function = spec.partition(':')
+    return getattr(importlib.import_module(module), function)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reference", default=REFERENCE, help="labelled reference set (JSON)")
+    parser.add_argument("--replay", nargs="*", default=[], metavar="RECORDING", help="recordings to replay")
+    parser.add_argument("--backend", action="append", default=[], metavar="NAME=MODULE:FUNCTION", help="local backend, repeatable")
+    parser.add_argument("--live", metavar="NAME", help="also run the live OpenAI configuration under this name")
+    parser.add_argument("--model-fast", default=Config.MODEL_FAST)
+    parser.add_argument("--model-standard", default=Config.MODEL_STANDARD)
+    parser.add_argument("--routes", default=Config.MODEL_ROUTES, help="MODEL_ROUTES override for the live run")
+    parser.add_argument("--record", metavar="PATH", help="save the live run as a recording")
+    parser.add_argument("--details", action="store_true", help="also print every nutrient's error")
+    parser.add_argument("--json", metavar="PATH", help="write all summaries as JSON")
+    args = parser.parse_args()
+
+    reference = load_reference(args.reference)
+    summaries = []
+    with Flask(__name__).app_context():
+        if args.live:
+            models = {'fast': args.model_fast, 'standard': args.model_standard}
+            service = OpenAIService(Config.OPENAI_API_KEY, router=make_router(models, args.routes))
+            observations, recording = run_service(reference, service)
+            summaries.append(summarize(args.live, observations))
+            if args.record:
+                os.makedirs(os.path.dirname(os.path.abspath(args.record)), exist_ok=True)
+                with open(args.record, "w") as f:
+                    json.dump({
+                        "name": args.live, "models": models, "routes": args.routes,
+                        "prompt_version": service.versions['nutrition'], "completions": recording
+                    }, f, indent=1)
+
+        for path in args.replay:
+            with open(path) as f:
+                recorded = json.load(f)
+            service = OpenAIService("replay", router=make_router(recorded["models"], recorded.get("routes", "")))
+            observations, _ = run_service(reference, service, replay=recorded["completions"])
+            summaries.append(summarize(recorded["name"], observations))
+            if recorded.get("prompt_version") != service.versions['nutrition']:
+                print(f"  note: {recorded['name']} was recorded with a different nutrition prompt or models")
+
+        for spec in args.backend:
+            name, _, target = spec.partition('=')
+            summaries.append(summarize(name, run_backend(reference, load_backend(target))))
+
+    if not summaries:
+        parser.error("nothing to evaluate: pass --replay, --backend and/or --live")
+    print(f"\n{len(reference)} reference foods")
+    print(format_table(summaries))
+    if args.details:
+        print()
+        print(format_details(summaries))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summaries, f, indent=2)
+
+if __name__ == '__main__':
+    main()
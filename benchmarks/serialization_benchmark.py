@@ -0,0 +1,99 @@
+"""
+Times building and serializing one analysis response, old path against new
+
+    python -m benchmarks.serialization_benchmark --iterations 20000 --plate 6
+
+"jsonify" is the previous path: the model dumped twice (score and response), videos and
+health score copied by hand, Flask's jsonify. "json_response" is the shared builder in
+nutrition_routes with http_utils.dumps_json, run once with orjson and once with the
+standard library fallback. The "encode" columns time serialization of the finished dict
+alone. --plate N also times an image result with N scored items.
+"""
+import argparse
+import json
+import time
+from unittest.mock import patch
+
+from benchmarks.stub_app import app, NUTRITION, VIDEOS
+from flask import jsonify
+from app.models.nutrition_record import NutritionRecord
+from app.routes.nutrition_routes import analyzer, complete_response, score_food_item, summarize_plate
+from app.utils import http_utils
+
+def legacy_response():
+    health_score = analyzer.calculate_health_score(NutritionRecord.from_dump(NUTRITION.model_dump()))
+    return jsonify({
+        "food_item": "eggs",
+        "quantity": 2,
+        "unit": "units",
+        "nutrition_info": NUTRITION.model_dump(),
+        "insight": NUTRITION.insight,
+        "is_recipe": NUTRITION.is_recipe,
+        "is_valid_food": NUTRITION.is_valid_food,
+        "recipe_urls": [{"title": video.title, "url": video.url, "id": video.id} for video in VIDEOS],
+        "health_score": {
+            "score": health_score.score,
+            "message": health_score.message,
+            "color": health_score.color
+        },
+        "skipped": [],
+        "status": "success"
+    })
+
+def single_response():
+    response_data, _ = score_food_item("eggs", 2, "units", NUTRITION)
+    recipe_urls = [{"title": video.title, "url": video.url, "id": video.id} for video in VIDEOS]
+    return http_utils.json_response(complete_response(response_data, recipe_urls, []))
+
+def legacy_plate(size: int):
+    scored_items = []
+    for _ in range(size):
+        health_score = analyzer.calculate_health_score(NutritionRecord.from_dump(NUTRITION.model_dump()))
+        item = {
+            "food_item": "eggs", "quantity": 2.0, "unit": "units",
+            "nutrition_info": NUTRITION.model_dump(), "insight": NUTRITION.insight,
+            "is_recipe": NUTRITION.is_recipe, "is_valid_food": NUTRITION.is_valid_food,
+            "health_score": {"score": health_score.score, "message": health_score.message, "color": health_score.color}
+        }
+        scored_items.append((item, NutritionRecord.from_dump(NUTRITION.model_dump())))
+    return jsonify({**summarize_plate(scored_items), "recipe_urls": None, "skipped": [], "status": "success"})
+
+def single_plate(size: int):
+    scored_items = [score_food_item("eggs", 2.0, "units", NUTRITION) for _ in range(size)]
+    return http_utils.json_response(complete_response(summarize_plate(scored_items), None, []))
+
+def time_per_call(build, iterations: int) -> float:
+    """Mean microseconds per built response"""
+    build()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--plate", type=int, default=6, help="items in the plate result (0 skips it)")
+    args = parser.parse_args()
+
+    cases = [("single item", legacy_response, single_response)]
+    if args.plate:
+        cases.append((f"plate of {args.plate}", lambda: legacy_plate(args.plate), lambda: single_plate(args.plate)))
+
+    print(f"{'response':<16}{'path':<26}{'us/response':>12}{'us/encode':>10}{'bytes':>8}")
+    with app.app_context():
+        for name, legacy, single in cases:
+            rows = [("jsonify", legacy)]
+            if http_utils.orjson is not None:
+                rows.append(("json_response (orjson)", single))
+            rows.append(("json_response (stdlib)", single))
+            for path, build in rows:
+                with patch.object(http_utils, 'orjson', None if path.endswith("(stdlib)") else http_utils.orjson):
+                    body = build().get_data()
+                    data = json.loads(body)
+                    encode = (lambda: jsonify(data)) if path == "jsonify" else (lambda: http_utils.json_response(data))
+                    print(f"{name:<16}{path:<26}{time_per_call(build, args.iterations):>12.1f}"
+                          f"{time_per_call(encode, args.iterations):>10.1f}{len(body):>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Compares gunicorn worker models on the stubbed /calculate_nutrition hot path
+
+    python -m benchmarks.serving_benchmark --requests 400 --concurrency 64
+
+Each model gets the same number of processes; upstream calls sleep for a fixed
+latency (see benchmarks/stub_app.py), so the numbers show how many slow upstream
+waits each model overlaps, not how fast OpenAI is.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAYLOAD = json.dumps({"food_item": "eggs", "quantity": 2, "unit": "units"}).encode()
+
+def wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+def post(url: str) -> float:
+    start = time.perf_counter()
+    request = urllib.request.Request(url, data=PAYLOAD, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=120) as response:
+        response.read()
+    return time.perf_counter() - start
+
+def run(worker_class: str, args) -> dict:
+    port = str(args.port)
+    env = dict(
+        os.environ,
+        PORT=port,
+        GUNICORN_WORKER_CLASS=worker_class,
+        WEB_CONCURRENCY=str(args.workers),
+        # gunicorn silently switches sync workers with several threads to gthread
+        GUNICORN_THREADS=str(args.threads if worker_class == "gthread" else 1),
+        GUNICORN_ACCESS_LOG="",
+        GUNICORN_LOG_LEVEL="warning"
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "benchmarks.stub_app:app"],
+        cwd=ROOT, env=env
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        wait_until_ready(f"{base}/")
+        url = f"{base}/calculate_nutrition"
+        # Warm every worker before timing
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            list(pool.map(lambda _: post(url), range(args.workers * 2)))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = sorted(pool.map(lambda _: post(url), range(args.requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=90)
+    return {
+        "worker_class": worker_class,
+        "throughput": args.requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1]
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", default=["sync", "gthread", "gevent"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    results = []
+    for worker_class in args.models:
+        if worker_class == "gevent" and importlib.util.find_spec("gevent") is None:
+            print("Skipping gevent (pip install gevent to include it)")
+            continue
+        results.append(run(worker_class, args))
+
+    print(f"\n{args.workers} workers, {args.requests} requests, concurrency {args.concurrency}")
+    print(f"{'model':<10}{'req/s':>10}{'p50 (s)':>10}{'p95 (s)':>10}")
+    for result in results:
+        print(f"{result['worker_class']:<10}{result['throughput']:>10.1f}{result['p50']:>10.2f}{result['p95']:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+The real app with upstream calls replaced by fixed-latency stubs, for benchmarking
+the serving setup without network access or API keys:
+
+    gunicorn -c gunicorn.conf.py benchmarks.stub_app:app
+"""
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("CACHE_ENABLED", "false")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from app import app
+from app.models.nutrition_models import NutritionScores, VideoInfo
+from app.services.openai_service import OpenAIService
+from app.services.youtube_service import YouTubeService
+
+# Typical upstream latencies in seconds
+NUTRITION_LATENCY = float(os.getenv("STUB_NUTRITION_LATENCY", 0.8))
+VIDEO_LATENCY = float(os.getenv("STUB_VIDEO_LATENCY", 0.3))
+
+NUTRITION = NutritionScores(
+    calories="143kcal", protein="12g",
+    fat={"total": "10g", "saturated": "3g", "trans": "0g", "polyunsaturated": "2g", "monounsaturated": "4g"},
+    carbohydrates={"total": "1g", "sugar": "1g", "added_sugar": "0g"},
+    fiber="0g", sugar="1g", sodium="124mg", vitamin_a="270IU", vitamin_c="0mg", vitamin_d="82IU",
+    calcium="56mg", iron="2mg", potassium="138mg",
+    is_recipe=False, is_valid_food=True, insight="Eggs are a nutrient-rich source of protein."
+)
+VIDEOS = [VideoInfo(url="https://www.youtube.com/watch?v=stub", id="stub", title="Stub video")]
+
+def _nutrition(self, food_item, quantity, unit, deadline=None):
+    time.sleep(NUTRITION_LATENCY)
+    return NUTRITION
+
+def _videos(self, is_recipe, food_item, max_results=10, deadline=None):
+    time.sleep(VIDEO_LATENCY)
+    return VIDEOS
+
+OpenAIService.get_nutrition_info = _nutrition
+YouTubeService.get_recipe_videos = _videos
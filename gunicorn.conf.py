@@ -0,0 +1,39 @@
+"""
+Production server settings: gunicorn -c gunicorn.conf.py wsgi:app
+
+Requests spend most of their time waiting on OpenAI and YouTube, so the default is
+a few processes with many threads each (gthread): a thread blocked on an upstream
+call costs little, and threads in one process share the in-memory cache tier.
+Set GUNICORN_WORKER_CLASS=gevent (pip install gevent) for thousands of green threads,
+or sync to get one request per process. See "Production Serving" in the README.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2, 8)))
+# Threads per worker (gthread only)
+threads = int(os.getenv("GUNICORN_THREADS", 16))
+# Concurrent green threads per worker (gevent only)
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 500))
+
+# Image analysis chains several upstream calls; keep well above the slowest request
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+# Time a stopping worker gets to finish in-flight requests and background jobs
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 60))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks cannot accumulate
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+# Empty disables the access log
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+def worker_exit(server, worker):
+    """Waits for queued and running image analysis jobs before the worker process exits"""
+    from app.routes.nutrition_routes import job_queue
+    if not job_queue.drain(graceful_timeout):
+        server.log.warning("Worker %s exited with unfinished image analysis jobs", worker.pid)
@@ -20,7 +20,8 @@ def app():
         'DEBUG': False,
         'SERVER_NAME': 'localhost.localdomain',
         'OPENAI_API_KEY': os.getenv('OPENAI_API_KEY'),
-        'YOUTUBE_API_KEY': os.getenv('YOUTUBE_API_KEY')
+        'YOUTUBE_API_KEY': os.getenv('YOUTUBE_API_KEY'),
+        'RATE_LIMIT_ENABLED': False
     })
     
     # Register the nutrition blueprint
@@ -0,0 +1,90 @@
+import gzip
+import json
+from flask import Flask, url_for
+from app.services.asset_pipeline import AssetPipeline
+from app.handlers.asset_handlers import register_asset_handlers
+
+class TestAssetPipeline:
+    """Test cases for the static asset build step"""
+
+    def _make_static(self, tmp_path):
+        static = tmp_path / 'static'
+        (static / 'js').mkdir(parents=True)
+        (static / 'css').mkdir()
+        (static / 'js' / 'app.js').write_text("// comment\nfunction a() {\n    return `x\n    y`;\n}\n")
+        (static / 'css' / 'styles.css').write_text("/* c */\nbody {\n    color : red;\n    background: url(\"a b.svg\");\n}\n")
+        return static
+
+    def test_build_writes_fingerprinted_and_precompressed_assets(self, tmp_path):
+        """Test that the build minifies, fingerprints and gzips every text asset"""
+        static = self._make_static(tmp_path)
+        manifest = AssetPipeline(str(static), ['js/app.js', 'css/styles.css']).build()
+
+        assert set(manifest) == {'js/app.js', 'css/styles.css'}
+        js_path = static / 'dist' / manifest['js/app.js']
+        assert js_path.name.startswith('app.') and js_path.name.endswith('.js')
+        assert 'comment' not in js_path.read_text()
+        # Template literal contents are kept, indentation included
+        assert 'return `x\n    y`;' in js_path.read_text()
+        assert gzip.decompress((static / 'dist' / (manifest['js/app.js'] + '.gz')).read_bytes()) == js_path.read_bytes()
+
+        css = (static / 'dist' / manifest['css/styles.css']).read_text()
+        assert css == 'body{color : red;background: url("a b.svg")}'
+        assert json.loads((static / 'dist' / 'manifest.json').read_text()) == manifest
+
+    def test_js_fallback_keeps_literals_and_gives_up_when_unsure(self):
+        """Test that the fallback minifier never changes template literals or scripts it cannot follow"""
+        script = "const page = `\n  <div>\n  // not a comment\n  ${items.map(i => `<b>${i}</b>`)}  \n`;\n  /* a\n  // b */\n  go();\n"
+        assert AssetPipeline._minify_js(script) == (
+            "const page = `\n  <div>\n  // not a comment\n  ${items.map(i => `<b>${i}</b>`)}  \n`;\n/* a\n  // b */\ngo();\n"
+        )
+        unsure = "const quote = /\"/;\n    go();\n"
+        assert AssetPipeline._minify_js(unsure) == unsure
+
+    def test_fingerprint_changes_with_content(self):
+        """Test that the file name hash tracks the file content"""
+        assert AssetPipeline.fingerprint('js/app.js', b'a') != AssetPipeline.fingerprint('js/app.js', b'b')
+        assert AssetPipeline.fingerprint('js/app.js', b'a') == AssetPipeline.fingerprint('js/app.js', b'a')
+
+    def test_static_urls_are_rewritten_from_manifest(self, tmp_path):
+        """Test that url_for('static') resolves to the fingerprinted file after a build"""
+        static = self._make_static(tmp_path)
+        manifest = AssetPipeline(str(static), ['js/app.js']).build()
+
+        app = Flask(__name__, static_folder=str(static))
+        register_asset_handlers(app)
+        with app.test_request_context():
+            assert url_for('static', filename='js/app.js') == f"/static/dist/{manifest['js/app.js']}"
+            assert url_for('static', filename='css/styles.css') == '/static/css/styles.css'
+
+    def test_service_worker_precaches_fingerprinted_shell(self, tmp_path):
+        """Test that /sw.js lists the built asset URLs and changes version when an asset changes"""
+        import os
+        import shutil
+        from app.routes.page_routes import page_bp
+
+        static = tmp_path / 'static'
+        shutil.copytree(os.path.join(os.path.dirname(__file__), '..', 'app', 'static'), static,
+                        ignore=shutil.ignore_patterns('dist'))
+        manifest = AssetPipeline(str(static)).build()
+        app = Flask(__name__, static_folder=str(static),
+                    template_folder=os.path.join(os.path.dirname(__file__), '..', 'app', 'templates'))
+        app.register_blueprint(page_bp)
+        register_asset_handlers(app)
+
+        response = app.test_client().get('/sw.js')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/javascript'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        worker = response.get_data(as_text=True)
+        assert f'"/static/dist/{manifest["js/app.js"]}"' in worker
+        assert '"/site.webmanifest"' in worker
+        assert f'"/static/dist/{manifest["js/image_worker.js"]}"' in worker
+
+        # Sources are hashed once at startup: an edit shows up after the next restart
+        (static / 'css' / 'styles.css').write_text("body{}")
+        assert app.test_client().get('/sw.js').get_data(as_text=True) == worker
+        restarted = Flask(__name__, static_folder=str(static), template_folder=app.template_folder)
+        restarted.register_blueprint(page_bp)
+        register_asset_handlers(restarted)
+        assert restarted.test_client().get('/sw.js').get_data(as_text=True) != worker
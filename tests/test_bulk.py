@@ -0,0 +1,115 @@
+import io
+import json
+import math
+from unittest.mock import patch
+from . import TEST_DATA
+from app.commands.bulk_commands import enrich_nutrition_command
+from app.config import Config
+from app.routes import nutrition_routes
+from app.models.nutrition_models import NutritionScores
+from app.services.bulk_service import BulkPipeline, read_rows, resume_point
+
+EGGS = NutritionScores(**TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"])
+CSV_ROWS = b"Food_Item,Quantity,Unit\neggs,2,units\nbanana,1,spoonful\npoha,1,plate\n"
+
+def parse_lines(data: bytes):
+    return [json.loads(line) for line in data.decode().splitlines() if line.endswith('}')]
+
+class TestBulkEnrichment:
+    """Test cases for bulk CSV/NDJSON nutrition enrichment"""
+
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    def test_bulk_endpoint_streams_rows(self, mock_nutrition, client):
+        """Test that every row gets one NDJSON line and start_row resumes a run"""
+        mock_nutrition.return_value = EGGS
+
+        response = client.post('/calculate_nutrition/bulk', data=CSV_ROWS, content_type='text/csv')
+        assert response.mimetype == 'application/x-ndjson'
+        results = {line["row"]: line for line in parse_lines(response.data)}
+        assert sorted(results) == [1, 2, 3]
+        assert results[1]["food_item"] == "eggs" and results[1]["health_score"]["score"] > 0
+        assert results[2]["status"] == "error" and results[2]["error"]["message"] == "Invalid unit of measurement"
+        assert max(line["done_through"] for line in results.values()) == 3
+        assert mock_nutrition.call_count == 2
+
+        response = client.post('/calculate_nutrition/bulk?start_row=3', data=CSV_ROWS, content_type='text/csv')
+        assert [line["row"] for line in parse_lines(response.data)] == [3]
+
+        ndjson = b'{"food_item": "eggs", "quantity": 2, "unit": "units"}\n\nnot json\n'
+        response = client.post('/calculate_nutrition/bulk', data={'file': (io.BytesIO(ndjson), 'foods.ndjson')})
+        results = {line["row"]: line for line in parse_lines(response.data)}
+        assert results[1]["status"] == "success" and results[2]["status"] == "error"
+
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    def test_bulk_upload_over_the_image_limit(self, mock_nutrition, client, app, monkeypatch):
+        """Test that a file just over MAX_CONTENT_LENGTH is enriched, up to BULK_MAX_UPLOAD_BYTES"""
+        mock_nutrition.return_value = EGGS
+        monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', Config.MAX_UPLOAD_BYTES)
+        row = b'{"food_item": "eggs", "quantity": 2, "unit": "units"}\n'
+        # Blank lines are skipped, so only the two rows are looked up
+        body = row + b"\n" * Config.MAX_UPLOAD_BYTES + row
+        assert len(body) > Config.MAX_UPLOAD_BYTES
+
+        response = client.post('/calculate_nutrition/bulk', data=body, content_type='application/x-ndjson')
+        assert response.status_code == 200
+        assert sorted(line["row"] for line in parse_lines(response.data)) == [1, 2]
+
+        response = client.post('/calculate_nutrition/bulk', data={'file': (io.BytesIO(body), 'foods.ndjson')})
+        assert sorted(line["row"] for line in parse_lines(response.data)) == [1, 2]
+
+        with patch.object(Config, 'BULK_MAX_UPLOAD_BYTES', Config.MAX_UPLOAD_BYTES):
+            response = client.post('/calculate_nutrition/bulk', data=body, content_type='application/x-ndjson')
+            assert response.status_code == 413
+
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    def test_bulk_rate_limit_charges_misses_and_ends_resumably(self, mock_nutrition, client, app, monkeypatch):
+        """Test that cached rows are free and an exhausted rate limit ends the stream with a resume line"""
+        mock_nutrition.return_value = EGGS
+        monkeypatch.setitem(app.config, 'RATE_LIMIT_ENABLED', True)
+        rows = b"food_item,quantity,unit\neggs,2,units\nbanana,1,units\npoha,1,plate\n"
+        with patch.object(nutrition_routes.openai_service, 'has_cached_nutrition', side_effect=lambda food, quantity, unit: food == "eggs"), \
+                patch.object(nutrition_routes.rate_limiter, 'try_acquire', side_effect=[0, math.inf]) as mock_acquire:
+            response = client.post('/calculate_nutrition/bulk', data=rows, content_type='text/csv')
+
+        lines = parse_lines(response.data)
+        assert mock_acquire.call_count == 2
+        assert sorted(line["row"] for line in lines[:-1]) == [1, 2]
+        assert lines[-1]["row"] == 3 and lines[-1]["error"]["type"] == "RATE_LIMITED" and lines[-1]["done_through"] == 2
+        assert resume_point(json.dumps(line) for line in lines) == (3, set())
+
+    def test_pipeline_is_bounded_and_resumable(self, app):
+        """Test that rows are read at most `concurrency` ahead and done_through tracks finished rows"""
+        read = []
+
+        def rows():
+            for number, row in read_rows(io.BytesIO(b"".join(b'{"n": %d}\n' % n for n in range(1, 21))), 'ndjson'):
+                read.append(number)
+                yield number, row
+
+        def process(row):
+            # Results never run more than the pipeline's window ahead of the input
+            assert len(read) - row["n"] <= 2
+            return {"status": "success"}
+
+        results = list(BulkPipeline(app, process, concurrency=2, max_rows=15).run(rows(), start_row=3, skip=[5]))
+        assert {result["row"] for result in results} == set(range(3, 20)) - {5}
+        assert results[-1]["error"]["type"] == "too_many_rows" and results[-1]["row"] == 19
+
+        start_row, skip = resume_point(json.dumps(result) for result in results)
+        assert (start_row, skip) == (19, set())
+        assert resume_point(['{"row": 1, "done_through": 1}', '{"row": 3, "done_through": 1}', '{"row": 4, "do']) == (2, {3})
+
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    def test_cli_resumes_output(self, mock_nutrition, app, tmp_path):
+        """Test that the CLI appends only the rows missing from an existing output file"""
+        mock_nutrition.return_value = EGGS
+        source = tmp_path / 'foods.csv'
+        source.write_bytes(CSV_ROWS)
+        output = tmp_path / 'results.ndjson'
+        output.write_text('{"row": 1, "done_through": 1, "status": "success"}\n{"row": 3, "done_thr')
+
+        result = app.test_cli_runner().invoke(enrich_nutrition_command, [str(source), '--output', str(output)])
+        assert result.exit_code == 0, result.output
+        rows = sorted(line["row"] for line in parse_lines(output.read_bytes()) if "food_item" in line or "error" in line)
+        assert rows == [2, 3]
+        assert resume_point(output.read_text().splitlines()) == (4, set())
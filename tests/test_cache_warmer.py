@@ -0,0 +1,55 @@
+from unittest.mock import patch, Mock
+from . import TEST_DATA
+from app.models.nutrition_models import NutritionScores, VideoInfo
+from app.services.cache_service import ResultCache
+from app.services.cache_warmer import CacheWarmer
+from app.services.nutrition_analyzer import NutritionAnalyzer
+from app.services.openai_service import OpenAIService
+from app.services.youtube_service import YouTubeService
+
+class TestCacheWarmer:
+    """Test cases for offline cache warming"""
+
+    def _services(self, tmp_path):
+        cache = ResultCache(str(tmp_path / 'cache.sqlite3'))
+        return (
+            OpenAIService(api_key="test", cache=cache),
+            YouTubeService(api_key="test", cache=cache)
+        )
+
+    def test_warm_populates_cache_and_resumes(self, tmp_path, app):
+        """Test that a second run finds everything cached and makes no upstream calls"""
+        openai_service, youtube_service = self._services(tmp_path)
+        nutrition = NutritionScores(**TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"])
+        videos = [VideoInfo(url="http://example.com/1", id="1", title="Eggs")]
+
+        def fake_videos(is_recipe, food_item, max_results=10):
+            youtube_service.cache.set_models(youtube_service.cache_key(is_recipe, food_item, max_results), videos)
+            return videos
+
+        warmer = CacheWarmer(app, openai_service, youtube_service, NutritionAnalyzer(), calls_per_minute=0)
+        with patch.object(openai_service.client.beta.chat.completions, 'parse') as mock_parse, \
+                patch.object(youtube_service, 'get_recipe_videos', side_effect=fake_videos) as mock_videos:
+            mock_parse.return_value = Mock(choices=[Mock(message=Mock(parsed=nutrition))])
+
+            first = warmer.warm(["Eggs", "eggs", "poha"], [(2, "units"), (100, "grams")])
+            assert (first.fetched, first.already_cached, first.failed) == (6, 0, [])
+            assert mock_parse.call_count == 4
+            assert mock_videos.call_count == 2
+
+            second = warmer.warm(["eggs", "poha"], [(2, "units"), (100, "grams")])
+            assert mock_parse.call_count == 4
+            assert second.already_cached == 6 and second.fetched == 0
+
+    def test_pacer_is_charged_per_model_call(self, tmp_path, app):
+        """Test that a lookup escalated from the fast to the standard tier takes two pacer slots"""
+        openai_service, youtube_service = self._services(tmp_path)
+        dish = NutritionScores(**{**TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"], "is_recipe": True})
+        warmer = CacheWarmer(app, openai_service, youtube_service, NutritionAnalyzer(), include_videos=False)
+
+        with patch.object(openai_service.client.beta.chat.completions, 'parse') as mock_parse, \
+                patch.object(warmer.pacer, 'wait') as mock_wait:
+            mock_parse.return_value = Mock(choices=[Mock(message=Mock(parsed=dish))])
+            report = warmer.warm(["khichdi"], [(100, "grams")])
+        assert report.fetched == 1
+        assert mock_parse.call_count == 2 and mock_wait.call_count == 2
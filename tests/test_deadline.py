@@ -0,0 +1,82 @@
+import json
+import pytest
+from unittest.mock import patch, Mock
+from openai import InternalServerError
+from . import TEST_DATA
+from app.config import Config
+from app.exceptions.api_exceptions import APIException
+from app.models.nutrition_models import NutritionScores
+from app.services.model_router import ModelRouter
+from app.services.openai_service import OpenAIService
+from app.utils.deadline import Deadline
+
+def nutrition_mock():
+    return Mock(
+        model_dump=lambda: TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"],
+        insight="Eggs are a good source of protein",
+        is_recipe=False,
+        is_valid_food=True
+    )
+
+class TestDeadline:
+    """Test cases for per-request deadline propagation"""
+
+    def test_remaining_budget_becomes_call_timeout(self, app_context):
+        """Test that upstream calls get what is left of the budget as their timeout"""
+        eggs = NutritionScores(**TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"])
+        service = OpenAIService(api_key="test", router=ModelRouter({'fast': 'small', 'standard': 'large'}))
+
+        key = service.key_pool.keys[0]
+        with patch.object(key.failover_client.beta.chat.completions, 'parse') as mock_parse, \
+                patch.object(key.client.beta.chat.completions, 'parse') as retrying_parse:
+            mock_parse.return_value = Mock(choices=[Mock(message=Mock(parsed=eggs))], usage=None)
+            service.get_nutrition_info("eggs", 2, "units", deadline=Deadline(10))
+            assert 9 < mock_parse.call_args.kwargs["timeout"] <= 10
+            # The SDK's own retries would each get the whole remaining budget again
+            retrying_parse.assert_not_called()
+
+            with pytest.raises(APIException) as error:
+                service.get_nutrition_info("bread", 1, "units", deadline=Deadline(0))
+            assert error.value.status_code == 504
+            assert mock_parse.call_count == 1
+
+    def test_transient_errors_are_retried_within_the_deadline(self, app_context):
+        """Test that a failed call is retried only while the budget allows another attempt"""
+        eggs = NutritionScores(**TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"])
+        service = OpenAIService(api_key="test", router=ModelRouter({'fast': 'small', 'standard': 'large'}))
+        failure = InternalServerError("Server error", response=Mock(status_code=500, headers={}), body=None)
+        parse = service.key_pool.keys[0].failover_client.beta.chat.completions
+
+        with patch.object(parse, 'parse', side_effect=[failure, Mock(choices=[Mock(message=Mock(parsed=eggs))], usage=None)]) as mock_parse, \
+                patch('app.services.openai_service.time.sleep') as mock_sleep:
+            assert service.get_nutrition_info("eggs", 2, "units", deadline=Deadline(10)) == eggs
+        assert mock_parse.call_count == 2 and mock_sleep.call_count == 1
+
+        with patch.object(parse, 'parse', side_effect=failure) as mock_parse, \
+                patch.object(Config, 'DEADLINE_MIN_CALL_SECONDS', 5):
+            with pytest.raises(APIException):
+                service.get_nutrition_info("bread", 1, "units", deadline=Deadline(5.2))
+        assert mock_parse.call_count == 1
+
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    @patch('app.services.youtube_service.YouTubeService.get_recipe_videos')
+    def test_videos_skipped_when_short_of_time(self, mock_videos, mock_nutrition, client):
+        """Test that recipe videos are left out and reported when too little budget is left"""
+        mock_nutrition.return_value = nutrition_mock()
+        mock_videos.return_value = [Mock(title="Recipe", url="http://example.com/1", id="1")]
+        payload = json.dumps({"food_item": "eggs", "quantity": 2, "unit": "units"})
+
+        response = client.post('/calculate_nutrition', data=payload, content_type='application/json')
+        data = json.loads(response.data)
+        assert data["skipped"] == []
+        assert len(data["recipe_urls"]) == 1
+        assert isinstance(mock_nutrition.call_args.kwargs["deadline"], Deadline)
+
+        mock_videos.reset_mock()
+        with patch.object(Config, 'DEADLINE_VIDEO_MIN_SECONDS', Config.REQUEST_DEADLINE_SECONDS + 1):
+            response = client.post('/calculate_nutrition', data=payload, content_type='application/json')
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data["skipped"] == ["recipe_urls"]
+        assert data["recipe_urls"] is None
+        mock_videos.assert_not_called()
@@ -0,0 +1,87 @@
+import contextvars
+import itertools
+import threading
+import time
+from app.services.hedging import Hedger
+
+REQUEST_ID = contextvars.ContextVar('request_id', default=None)
+
+class TestHedger:
+    """Test cases for hedged upstream requests"""
+
+    def _hedger(self, **overrides):
+        options = dict(percentile=90, max_rate=1.0, min_samples=5)
+        options.update(overrides)
+        hedger = Hedger(**options)
+        for _ in range(5):
+            hedger._sample('nutrition:model', 0.02)
+        return hedger
+
+    def _slow_then_fast(self, first_delay=1.0, first_error=None):
+        counter = itertools.count()
+
+        def request():
+            if next(counter) == 0:
+                time.sleep(first_delay)
+                if first_error:
+                    raise first_error
+                return 'primary'
+            return 'hedge'
+        return request
+
+    def test_slow_call_is_hedged(self):
+        """Test that a call outliving the percentile delay is raced against a second one"""
+        hedger = self._hedger()
+        start = time.perf_counter()
+        assert hedger.run('nutrition', 'nutrition:model', self._slow_then_fast()) == 'hedge'
+        assert time.perf_counter() - start < 0.5
+        stats = hedger.stats()
+        assert stats['hedges'] == 1
+        assert stats['hedge_wins'] == 1
+
+    def test_hedge_rate_is_capped(self):
+        """Test that no hedge is sent once the hedge budget is spent"""
+        hedger = self._hedger(max_rate=0.0)
+        assert hedger.run('nutrition', 'nutrition:model', self._slow_then_fast(0.2)) == 'primary'
+        assert hedger.stats()['hedges'] == 0
+
+    def test_failed_winner_waits_for_other(self):
+        """Test that an error from the first finisher does not beat a pending success"""
+        hedger = self._hedger()
+        counter = itertools.count()
+        release = threading.Event()
+
+        def request():
+            if next(counter) == 0:
+                release.wait(1)
+                return 'primary'
+            release.set()
+            raise RuntimeError("upstream error")
+
+        assert hedger.run('nutrition', 'nutrition:model', request) == 'primary'
+
+    def test_unlisted_call_types_and_cold_start_are_not_hedged(self):
+        """Test that only configured call types with enough samples are hedged"""
+        hedger = self._hedger(call_types=['nutrition'])
+        assert hedger.run('vision', 'vision:model', self._slow_then_fast(0.1)) == 'primary'
+        assert hedger.delay('unknown') is None
+        assert hedger.stats()['calls'] == 0
+
+    def test_busy_pool_runs_unhedged_in_callers_context(self):
+        """Test that abandoned losers never queue new calls, and calls keep the caller's context"""
+        hedger = self._hedger(pool_size=2)
+        REQUEST_ID.set('req-1')
+        assert hedger.run('nutrition', 'nutrition:model', lambda: REQUEST_ID.get()) == 'req-1'
+
+        # The slow primary is abandoned once the hedge wins and keeps its thread for a while
+        assert hedger.run('nutrition', 'nutrition:model', self._slow_then_fast(0.5)) == 'hedge'
+        holder = threading.Event()
+        threading.Thread(target=hedger.run, args=('nutrition', 'nutrition:model', lambda: holder.wait(1))).start()
+        time.sleep(0.05)
+        assert hedger.stats()['busy_threads'] == 2
+
+        caller = threading.current_thread()
+        start = time.perf_counter()
+        assert hedger.run('nutrition', 'nutrition:model', lambda: threading.current_thread() is caller) is True
+        assert time.perf_counter() - start < 0.1
+        holder.set()
@@ -0,0 +1,78 @@
+import base64
+import io
+import json
+import os
+import tracemalloc
+import pytest
+from tempfile import SpooledTemporaryFile
+from PIL import Image
+from app.config import Config
+from app.exceptions.api_exceptions import APIException
+from app.utils.image_utils import check_image_header, encode_data_url, hash_file
+
+class TestImageUtils:
+    """Test cases for bounded-memory image upload handling"""
+
+    def test_encode_data_url_matches_base64(self):
+        """Test that chunked encoding equals one-shot base64 for any length"""
+        for size in (0, 1, 2, 3, 196607, 196609):
+            data = os.urandom(size)
+            assert encode_data_url(io.BytesIO(data)) == f"data:image/jpeg;base64,{base64.b64encode(data).decode()}"
+
+    def test_encode_peak_memory_is_bounded(self):
+        """Test that encoding a spooled upload never holds the raw bytes next to full base64 copies"""
+        size = 3 * 1024 * 1024
+        spooled = SpooledTemporaryFile(max_size=64 * 1024, mode='rb+')
+        spooled.write(os.urandom(size))
+        spooled.seek(0)
+
+        tracemalloc.start()
+        try:
+            hash_file(spooled)
+            url = encode_data_url(spooled)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert len(url) > size * 4 // 3
+        # The previous read() + b64encode() + f-string approach peaked above 3.6x the upload
+        assert peak < size * 3
+
+    def test_header_check_limits_pixels(self):
+        """Test that dimensions are checked from the header and the file is rewound"""
+        buffer = io.BytesIO()
+        Image.new('RGB', (100, 100), color='white').save(buffer, 'PNG')
+        buffer.seek(0)
+
+        assert check_image_header(buffer, max_pixels=10_000) == ('PNG', 100, 100)
+        assert buffer.tell() == 0
+        with pytest.raises(APIException) as excinfo:
+            check_image_header(buffer, max_pixels=9_999)
+        assert excinfo.value.status_code == 413
+
+        with pytest.raises(APIException) as excinfo:
+            check_image_header(io.BytesIO(b'not an image'), max_pixels=10_000)
+        assert excinfo.value.error_type == "INVALID_IMAGE_FORMAT"
+
+    def test_oversized_upload_rejected(self, app, client, monkeypatch):
+        """Test that uploads over MAX_CONTENT_LENGTH get 413 before the body is parsed"""
+        monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 1024)
+        response = client.post(
+            '/analyze_image',
+            data={'image': (io.BytesIO(os.urandom(4096)), 'big.jpg')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 413
+        assert json.loads(response.data)["error"]["type"] == "UPLOAD_TOO_LARGE"
+
+    def test_client_config_advertises_upload_limits(self, app, client, monkeypatch):
+        """Test that the browser is told how far to downscale and how much it may upload"""
+        monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 2 * 1024 * 1024)
+        response = client.get('/client_config')
+        assert response.status_code == 200
+        assert response.headers["ETag"]
+        image = json.loads(response.data)["image"]
+        assert image["max_dimension"] == Config.CLIENT_IMAGE_MAX_DIMENSION
+        assert 0 < image["quality"] <= 1
+        assert image["mime_type"] == "image/jpeg"
+        assert image["max_upload_bytes"] == 2 * 1024 * 1024
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+import pytest
+from unittest.mock import patch, Mock
+from flask import Flask
+from PIL import Image
+from . import TEST_DATA
+from app.exceptions.api_exceptions import APIException
+from app.handlers.error_handlers import register_error_handlers
+from app.services.job_service import JobQueue, JobStore, QUEUED, SUCCEEDED, FAILED
+import app.routes.nutrition_routes as nutrition_routes
+
+class TestJobs:
+    """Test cases for background image analysis jobs"""
+
+    @pytest.fixture
+    def job_app(self, tmp_path, monkeypatch):
+        queue = JobQueue(JobStore(str(tmp_path / 'jobs.sqlite3')), workers=1, queue_size=1)
+        monkeypatch.setattr(nutrition_routes, 'job_queue', queue)
+        app = Flask(__name__)
+        app.config.update({'TESTING': True, 'RATE_LIMIT_ENABLED': False})
+        app.register_blueprint(nutrition_routes.nutrition_bp)
+        register_error_handlers(app)
+        yield app
+        queue.shutdown()
+
+    def test_store_roundtrip_and_expiry(self, tmp_path):
+        """Test that job results are visible to other store instances until the TTL passes"""
+        store = JobStore(str(tmp_path / 'jobs.sqlite3'), ttl=0.2)
+        job_id = store.create()
+        assert store.get(job_id)["status"] == QUEUED
+
+        store.update(job_id, SUCCEEDED, result={"food_item": "eggs"})
+        other_worker = JobStore(str(tmp_path / 'jobs.sqlite3'))
+        assert other_worker.get(job_id) == {"job_id": job_id, "status": SUCCEEDED, "result": {"food_item": "eggs"}}
+
+        time.sleep(0.3)
+        assert store.get(job_id) is None
+
+    def test_queue_rejects_when_full(self, tmp_path):
+        """Test that submissions beyond workers + queue_size get 503 and failures are stored"""
+        queue = JobQueue(JobStore(str(tmp_path / 'jobs.sqlite3')), workers=1, queue_size=0)
+        release = threading.Event()
+
+        def pipeline():
+            release.wait(5)
+            raise APIException("Invalid food", 400, "validation_error")
+
+        job_id = queue.submit(Flask(__name__), pipeline)
+        with pytest.raises(APIException) as excinfo:
+            queue.submit(Flask(__name__), pipeline)
+        assert excinfo.value.status_code == 503
+        assert excinfo.value.headers["Retry-After"] == "5"
+
+        release.set()
+        job = queue.store.wait(job_id, timeout=5)
+        assert job["status"] == FAILED
+        assert job["error"]["message"] == "Invalid food"
+        queue.shutdown()
+
+    def test_drain_waits_for_running_jobs(self, tmp_path):
+        """Test that draining refuses new jobs and returns once running ones finish"""
+        queue = JobQueue(JobStore(str(tmp_path / 'jobs.sqlite3')), workers=2, queue_size=2)
+        job_id = queue.submit(Flask(__name__), lambda: time.sleep(0.3) or {"done": True})
+
+        assert queue.drain(timeout=5) is True
+        assert queue.store.get(job_id)["status"] == SUCCEEDED
+        with pytest.raises(APIException):
+            queue.submit(Flask(__name__), dict)
+
+    @patch('app.services.openai_service.OpenAIService.get_food_items_from_image')
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    @patch('app.services.youtube_service.YouTubeService.get_recipe_videos')
+    def test_submit_and_long_poll(self, mock_videos, mock_nutrition, mock_image_analysis, job_app, tmp_path):
+        """Test that an upload returns 202 and the status endpoint returns the analysis"""
+        mock_image_analysis.return_value = [Mock(food_item="eggs", quantity="2", unit="units")]
+        mock_nutrition.return_value = Mock(
+            model_dump=lambda: TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"],
+            insight="Eggs are nutrient-rich.",
+            is_recipe=False,
+            is_valid_food=True
+        )
+        mock_videos.return_value = []
+
+        image_path = os.path.join(tmp_path, 'eggs.jpg')
+        Image.new('RGB', (100, 100), color='white').save(image_path)
+        client = job_app.test_client()
+        with open(image_path, 'rb') as img_file:
+            response = client.post(
+                '/analyze_image/jobs',
+                data={'image': (img_file, 'eggs.jpg')},
+                content_type='multipart/form-data'
+            )
+        assert response.status_code == 202
+        data = json.loads(response.data)
+        assert data["status"] == QUEUED
+        assert response.headers["Location"] == data["status_url"]
+
+        response = client.get(f"{data['status_url']}?wait=5")
+        job = json.loads(response.data)
+        assert job["status"] == SUCCEEDED
+        assert job["result"]["food_item"] == "eggs"
+        assert job["result"]["health_score"]["color"] == "#3b82f6"
+
+    def test_unknown_job(self, job_app):
+        """Test that unknown or expired jobs return 404 and uploads are validated up front"""
+        client = job_app.test_client()
+        response = client.get('/analyze_image/jobs/missing')
+        assert response.status_code == 404
+
+        response = client.post('/analyze_image/jobs')
+        assert response.status_code == 400
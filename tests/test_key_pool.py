@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+import pytest
+from unittest.mock import patch, Mock
+from openai import RateLimitError
+from . import TEST_DATA
+from .test_model_router import MODELS, completion
+from app.models.nutrition_models import NutritionScores
+from app.services.key_pool import KeyPool, parse_duration
+from app.services.model_router import ModelRouter
+from app.services.openai_service import OpenAIService
+from app.config import Config
+from app.exceptions.api_exceptions import APIException
+from app.routes.nutrition_routes import openai_service
+
+def response(status_code=200, body=b'', **headers):
+    return SimpleNamespace(
+        status_code=status_code,
+        headers={name.replace('_', '-'): value for name, value in headers.items()},
+        read=lambda: body
+    )
+
+def limits(remaining_requests, remaining_tokens=90000):
+    return response(
+        x_ratelimit_limit_requests='100', x_ratelimit_remaining_requests=str(remaining_requests),
+        x_ratelimit_limit_tokens='100000', x_ratelimit_remaining_tokens=str(remaining_tokens),
+        x_ratelimit_reset_requests='6m0s', x_ratelimit_reset_tokens='1s'
+    )
+
+class TestKeyPool:
+    """Test cases for spreading OpenAI calls over several API keys"""
+
+    def test_balances_by_headroom_and_cools_down_on_429(self):
+        """Test that calls go to the key with most headroom and skip keys that returned 429"""
+        pool = KeyPool(['sk-first-aaaa', 'sk-second-bbbb@org-2'])
+        first, second = pool.keys
+        assert parse_duration('1h2m3.5s') == 3723.5 and parse_duration('20ms') == 0.02
+
+        pool._observe(first, limits(remaining_requests=10))
+        pool._observe(second, limits(remaining_requests=90))
+        for _ in range(3):
+            with pool.lease() as key:
+                assert key is second
+
+        with pool.lease() as busy:
+            # In-flight calls count against a key's headroom
+            with pool.lease() as key:
+                assert busy is second and key is second
+        pool._observe(second, limits(remaining_requests=90, remaining_tokens=5000))
+        with pool.lease() as key:
+            assert key is first
+
+        pool._observe(first, response(429, retry_after='30'))
+        pool._observe(second, response(429, body=b'{"error": {"code": "insufficient_quota"}}'))
+        stats = {entry['key']: entry for entry in pool.stats()}
+        assert stats[1]['cooling_down_seconds'] == 30.0
+        assert stats[2]['cooling_down_seconds'] == 600.0
+        with pool.lease() as key:
+            # Every key is cooling down: the one that recovers first is used
+            assert key is first
+
+    def test_rate_limited_call_moves_to_next_key(self, app_context):
+        """Test that a 429 on one key is retried on another instead of failing the request"""
+        eggs = NutritionScores(**TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"])
+        pool = KeyPool(['sk-first-aaaa', 'sk-second-bbbb'])
+        first, second = pool.keys
+        pool._observe(second, limits(remaining_requests=50))
+        service = OpenAIService(api_key="unused", router=ModelRouter(MODELS), key_pool=pool)
+        rate_limited = RateLimitError("Rate limit reached", response=Mock(status_code=429, headers={}), body=None)
+
+        with patch.object(first.failover_client.beta.chat.completions, 'parse', side_effect=rate_limited) as on_first, \
+                patch.object(second.client.beta.chat.completions, 'parse', return_value=completion(parsed=eggs)) as on_second:
+            assert service.get_nutrition_info("eggs", 2, "units") == eggs
+        assert on_first.call_count == 1 and on_second.call_count == 1
+        assert [entry['in_flight'] for entry in pool.stats()] == [0, 0]
+
+    def test_stats_need_the_token_and_hide_keys(self, client):
+        """Test that /stats/models is hidden without STATS_TOKEN and never shows key material"""
+        with patch.object(Config, 'STATS_TOKEN', 'secret'):
+            with pytest.raises(APIException) as error:
+                client.get('/stats/models', headers={'X-Stats-Token': 'wrong'})
+            assert error.value.status_code == 404
+
+            response = client.get('/stats/models', headers={'X-Stats-Token': 'secret'})
+            assert response.status_code == 200
+            assert response.json["keys"][0]["key"] == 1
+        assert not any(key.name in response.get_data(as_text=True) for key in openai_service.key_pool.keys)
@@ -0,0 +1,117 @@
+import copy
+import json
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from flask import Flask
+from unittest.mock import patch
+from . import TEST_DATA
+from app.exceptions.api_exceptions import APIException
+from app.models.nutrition_models import NutritionScores
+from app.services.meal_log_service import MealLog
+import app.routes.meal_routes as meal_routes
+
+NUTRITION = TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"]
+IST = timezone(timedelta(hours=5, minutes=30))
+
+class TestMealLog:
+    """Test cases for the meal log and its incremental totals"""
+
+    @pytest.fixture
+    def meal_log(self, tmp_path):
+        return MealLog(str(tmp_path / 'meals.sqlite3'))
+
+    def test_totals_follow_inserts_and_deletes(self, meal_log):
+        """Test that day and week totals are adjusted on every insert and delete"""
+        breakfast = meal_log.add_meal("u1", "eggs", 2, "units", NUTRITION, 7.7, datetime(2026, 10, 19, 8, tzinfo=IST))
+        meal_log.add_meal("u1", "eggs", 2, "units", NUTRITION, 6.3, datetime(2026, 10, 19, 20, tzinfo=IST))
+        meal_log.add_meal("u1", "eggs", 2, "units", NUTRITION, 5.0, datetime(2026, 10, 20, 8, tzinfo=IST))
+        meal_log.add_meal("u2", "eggs", 2, "units", NUTRITION, 9.0, datetime(2026, 10, 19, 8, tzinfo=IST))
+
+        days = meal_log.totals("u1", "day", date(2026, 10, 19), date(2026, 10, 20))
+        assert [d['period'] for d in days] == ['2026-10-19', '2026-10-20']
+        assert days[0]['meal_count'] == 2
+        assert days[0]['average_health_score'] == 7.0
+        assert days[0]['totals']['calories'] == 286
+        assert days[0]['totals']['fat'] == 20
+
+        weeks = meal_log.totals("u1", "week", date(2026, 10, 19), date(2026, 10, 19))
+        assert weeks[0]['period'] == '2026-W43' and weeks[0]['meal_count'] == 3
+
+        assert meal_log.delete_meal("u1", breakfast['id'])
+        days = meal_log.totals("u1", "day", date(2026, 10, 19), date(2026, 10, 19))
+        assert days[0]['meal_count'] == 1 and days[0]['totals']['calories'] == 143
+        assert not meal_log.delete_meal("u2", breakfast['id'])
+
+    def test_day_follows_meal_utc_offset(self, meal_log):
+        """Test that a late-night IST meal lands on the local calendar day"""
+        meal_log.add_meal("u1", "eggs", 2, "units", NUTRITION, 7.7, datetime(2026, 10, 19, 1, tzinfo=IST))
+        assert meal_log.totals("u1", "day", date(2026, 10, 19), date(2026, 10, 19))[0]['meal_count'] == 1
+
+    def test_empty_periods_are_dropped(self, meal_log):
+        """Test that deleting the last meal of a day removes its totals row"""
+        meal = meal_log.add_meal("u1", "eggs", 2, "units", NUTRITION, 7.7, datetime(2026, 10, 19, tzinfo=IST))
+        meal_log.delete_meal("u1", meal['id'])
+        assert meal_log.totals("u1", "day", date(2026, 10, 19), date(2026, 10, 19)) == []
+
+    def test_list_meals_by_range(self, meal_log):
+        """Test that range queries only return the user's meals inside the window"""
+        for hour in (6, 12, 18):
+            meal_log.add_meal("u1", "eggs", 2, "units", NUTRITION, 7.7, datetime(2026, 10, 19, hour, tzinfo=timezone.utc))
+
+        meals = meal_log.list_meals("u1", datetime(2026, 10, 19, 10, tzinfo=timezone.utc), datetime(2026, 10, 19, 23, tzinfo=timezone.utc))
+        assert [m['logged_at'] for m in meals] == ['2026-10-19T12:00:00+00:00', '2026-10-19T18:00:00+00:00']
+
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    def test_meal_routes(self, mock_nutrition, meal_log, monkeypatch):
+        """Test logging, summarising and deleting a meal over HTTP, scored on the server"""
+        mock_nutrition.return_value = NutritionScores(**NUTRITION)
+        monkeypatch.setattr(meal_routes, 'meal_log', meal_log)
+        app = Flask(__name__)
+        app.config['RATE_LIMIT_ENABLED'] = False
+        app.register_blueprint(meal_routes.meal_bp)
+        client = app.test_client()
+        headers = {'X-User-Id': 'u1'}
+
+        result = copy.deepcopy(TEST_DATA["expected_responses"]["nutrition_calculation"])
+        result["logged_at"] = "2026-10-19T08:00:00+05:30"
+        # Client-supplied totals are not trusted
+        result["nutrition_info"]["protein"] = "900g"
+        result["health_score"] = {"score": 10}
+        response = client.post('/meals', json=result, headers=headers)
+        assert response.status_code == 201
+        meal = json.loads(response.data)["meal"]
+        meal_id = meal["id"]
+        assert meal["health_score"] != 10
+        mock_nutrition.assert_called_once()
+        assert mock_nutrition.call_args.args == ("eggs", 2.0, "units")
+
+        response = client.get('/meals/totals?start=2026-10-19&end=2026-10-19', headers=headers)
+        assert json.loads(response.data)["totals"][0]["totals"]["protein"] == 12
+
+        app.testing = True
+        for logged_at in (123, ["2026-10-19"], "yesterday"):
+            with pytest.raises(APIException) as error:
+                client.post('/meals', json={**result, "logged_at": logged_at}, headers=headers)
+            assert error.value.status_code == 400 and error.value.error_type == "validation_error"
+
+        assert client.delete(f'/meals/{meal_id}', headers=headers).status_code == 200
+        response = client.get('/meals/totals?start=2026-10-19&end=2026-10-19', headers=headers)
+        assert json.loads(response.data)["totals"] == []
+
+    def test_totals_default_to_the_utc_day(self, meal_log, monkeypatch):
+        """Test that totals without a range cover today's UTC date, whatever the server's local date"""
+        monkeypatch.setattr(meal_routes, 'meal_log', meal_log)
+        now = datetime.now(timezone.utc)
+        meal_log.add_meal("u1", "eggs", 2, "units", NUTRITION, 7.7, now)
+        app = Flask(__name__)
+        app.register_blueprint(meal_routes.meal_bp)
+
+        class ServerDate(date):
+            @classmethod
+            def today(cls):
+                # A server clock far enough from UTC to be on another calendar day
+                return now.date() + timedelta(days=1)
+
+        monkeypatch.setattr(meal_routes, 'date', ServerDate)
+        response = app.test_client().get('/meals/totals', headers={'X-User-Id': 'u1'})
+        assert [day["period"] for day in json.loads(response.data)["totals"]] == [now.date().isoformat()]
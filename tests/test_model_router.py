@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import patch, Mock
+from pydantic import ValidationError
+from . import TEST_DATA
+from app.models.nutrition_models import FoodItem, NutritionScores
+from app.services.model_router import ModelRouter, looks_like_recipe
+from app.services.openai_service import OpenAIService
+
+MODELS = {'fast': 'small-model', 'standard': 'large-model'}
+
+def completion(parsed=None, content=None, prompt_tokens=100, completion_tokens=50):
+    return Mock(
+        choices=[Mock(message=Mock(parsed=parsed, content=content))],
+        usage=Mock(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    )
+
+class TestModelRouter:
+    """Test cases for per-call-type model routing"""
+
+    def test_schema_failure_falls_back_to_next_tier(self):
+        """Test that output failing validation on the fast tier is redone on the standard tier"""
+        router = ModelRouter(MODELS, prices={'small-model': (1.0, 2.0)})
+        models = []
+
+        def request(model):
+            models.append(model)
+            return completion(content='{"food_item": "idli"}' if model == 'small-model' else
+                              '{"food_item": "idli", "quantity": 2, "unit": "units"}')
+
+        result = router.call('format', request, lambda response: FoodItem.model_validate_json(response.choices[0].message.content))
+
+        assert models == ['small-model', 'large-model']
+        assert result.quantity == 2
+        stats = router.stats()
+        assert stats['fast']['schema_failures'] == 1
+        assert stats['fast']['fallbacks'] == 1
+        assert stats['standard']['calls'] == 1
+        assert stats['fast']['estimated_cost_usd'] == pytest.approx((100 * 1.0 + 50 * 2.0) / 1_000_000)
+
+    def test_last_tier_failure_raises(self):
+        """Test that a schema failure on the most capable tier is not swallowed"""
+        router = ModelRouter(MODELS)
+        with pytest.raises(ValidationError):
+            router.call('vision', lambda model: completion(content='{}'),
+                        lambda response: FoodItem.model_validate_json(response.choices[0].message.content))
+
+    def test_routes_are_configurable(self):
+        """Test that routes can be overridden per call type"""
+        router = ModelRouter(MODELS, routes={'vision': 'fast'})
+        assert router.chain('vision') == ['fast', 'standard']
+        assert router.chain('nutrition_batch') == ['standard']
+        assert looks_like_recipe("butter chicken", "units")
+        assert looks_like_recipe("rice", "plate")
+        assert not looks_like_recipe("banana", "units")
+
+    def test_nutrition_escalates_dishes(self, app_context):
+        """Test that simple foods use the fast tier and dishes it reports are redone on the standard tier"""
+        eggs = NutritionScores(**TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"])
+        dish = eggs.model_copy(update={"is_recipe": True})
+        service = OpenAIService(api_key="test", router=ModelRouter(MODELS))
+
+        with patch.object(service.client.beta.chat.completions, 'parse') as mock_parse:
+            mock_parse.return_value = completion(parsed=eggs)
+            service.get_nutrition_info("eggs", 2, "units")
+            assert [call.kwargs["model"] for call in mock_parse.call_args_list] == ['small-model']
+
+            mock_parse.reset_mock()
+            mock_parse.side_effect = [completion(parsed=dish), completion(parsed=dish)]
+            assert service.get_nutrition_info("upma", 1, "cup").is_recipe
+            assert [call.kwargs["model"] for call in mock_parse.call_args_list] == ['small-model', 'large-model']
+
+            mock_parse.reset_mock()
+            mock_parse.side_effect = [completion(parsed=dish)]
+            service.get_nutrition_info("chicken biryani", 1, "plate")
+            assert [call.kwargs["model"] for call in mock_parse.call_args_list] == ['large-model']
+
+        assert service.router.stats()['fast']['escalations'] == 1
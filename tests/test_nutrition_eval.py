@@ -0,0 +1,57 @@
+from benchmarks.nutrition_eval import food_key, format_table, load_reference, make_router, run_backend, run_service, summarize
+from app.models.nutrition_models import NutritionScores
+from app.services.openai_service import OpenAIService
+from .test_model_router import completion
+
+REFERENCE = load_reference()
+
+def labelled(food, scale=1.0):
+    """Reference nutrition for a food with every amount multiplied by `scale`"""
+    def scaled(value):
+        if isinstance(value, dict):
+            return {key: scaled(item) for key, item in value.items()}
+        number = value.rstrip('abcdefghijklmnopqrstuvwxyz')
+        return f"{float(number) * scale:g}{value[len(number):]}"
+    return NutritionScores(**scaled(food["nutrition"]), is_recipe=False, is_valid_food=True, insight="")
+
+class TestNutritionEval:
+    """Test cases for the accuracy-vs-cost evaluation harness"""
+
+    def test_local_backend_matching_reference_scores_perfectly(self, app_context):
+        """Test that a backend returning the reference values has no error and full band agreement"""
+        by_item = {food["food_item"]: food for food in REFERENCE}
+        summary = summarize("exact", run_backend(REFERENCE, lambda food_item, quantity, unit: labelled(by_item[food_item])))
+
+        assert summary["failed"] == 0
+        assert summary["errors"]["calories"]["mape"] == 0 and summary["errors"]["sodium"]["mae"] == 0
+        assert summary["score_agreement"] == 100 and summary["score_mae"] == 0
+        assert summary["tokens_per_lookup"] == 0 and summary["cost_per_1k_usd"] == 0
+
+    def test_recording_replays_like_the_live_run(self, app_context):
+        """Test that a recorded run replays to the same accuracy, tokens and cost without calling OpenAI"""
+        models = {'fast': 'gpt-4o-mini', 'standard': 'gpt-4o'}
+        live = OpenAIService("unused", router=make_router(models))
+        answers = {food_key(food): labelled(food, scale=1.2) for food in REFERENCE}
+
+        def parse(**kwargs):
+            prompt = kwargs["messages"][-1]["content"]
+            key = next(key for key in answers if f" of {key.split('|')[0]} based" in prompt)
+            return completion(parsed=answers[key], prompt_tokens=400, completion_tokens=200)
+
+        live.client.beta.chat.completions.parse = parse
+        observations, recording = run_service(REFERENCE, live)
+        expected = summarize("live", observations)
+        assert expected["failed"] == 0
+        assert round(expected["errors"]["calories"]["mape"]) == 20
+        assert expected["tokens_per_lookup"] >= 600 and expected["cost_per_1k_usd"] > 0
+
+        for entries in recording.values():
+            for entry in entries:
+                entry["latency_ms"] = 250.0
+        replayed = summarize("replay", run_service(REFERENCE, OpenAIService("unused", router=make_router(models)), replay=recording)[0])
+        assert replayed["errors"] == expected["errors"]
+        assert replayed["cost_per_1k_usd"] == expected["cost_per_1k_usd"]
+        assert replayed["latency_p50_ms"] >= 250
+
+        table = format_table([expected, replayed])
+        assert "replay" in table and "$/1k" in table
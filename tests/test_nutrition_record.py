@@ -0,0 +1,45 @@
+import pytest
+from . import TEST_DATA
+from app.models.nutrition_record import NutritionRecord, parse_quantity
+from app.services.nutrition_analyzer import NutritionAnalyzer
+
+EGGS = TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"]
+
+class TestNutritionRecord:
+    """Test cases for the numeric nutrition record"""
+
+    def test_parse_quantity_canonical_units(self):
+        """Test that decimals survive and units are converted to the canonical one"""
+        assert parse_quantity('protein', '0.5g') == 0.5
+        assert parse_quantity('protein', '500 mg') == pytest.approx(0.5)
+        assert parse_quantity('sodium', '1,200mg') == 1200
+        assert parse_quantity('sodium', '0.2g') == pytest.approx(200)
+        assert parse_quantity('vitamin_a', '270IU') == pytest.approx(81)
+        assert parse_quantity('vitamin_d', '82IU') == pytest.approx(2.05)
+        assert parse_quantity('vitamin_d', '2 µg') == 2
+        assert parse_quantity('calories', '418kJ') == pytest.approx(99.9, abs=0.1)
+        assert parse_quantity('fiber', None) == 0.0
+        assert parse_quantity('fiber', 'trace') == 0.0
+
+    def test_from_dump_and_total(self):
+        """Test that a NutritionScores dump is parsed once into slots and records add up"""
+        record = NutritionRecord.from_dump(EGGS)
+        assert record.calories == 143
+        assert record.saturated_fat == 3
+        assert record.carbohydrate_sugar == 1
+        assert not hasattr(record, '__dict__')
+
+        total = NutritionRecord.total([record, NutritionRecord.from_dump({**EGGS, "is_recipe": True})])
+        assert total.protein == 24
+        assert total.is_recipe is True
+        display = total.to_display("Two servings")
+        assert display["fat"]["total"] == "20g"
+        assert display["vitamin_a"] == "162mcg"
+        assert display["insight"] == "Two servings"
+
+    def test_analyzer_scores_record_and_dict_alike(self, app_context):
+        """Test that the analyzer gives the same score for a record and the dict it came from"""
+        from_dict = NutritionAnalyzer.calculate_health_score(EGGS)
+        from_record = NutritionAnalyzer.calculate_health_score(NutritionRecord.from_dump(EGGS))
+        assert from_dict == from_record
+        assert from_record.color == "#3b82f6"
@@ -1,3 +1,4 @@
+import gzip
 import json
 import pytest
 import os
@@ -5,6 +6,7 @@ from unittest.mock import patch, Mock
 from PIL import Image
 from . import TEST_DATA
 from app.exceptions.api_exceptions import APIException
+from app.utils import http_utils
 
 # Get the path to the test data directory
 TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), 'test_data')
@@ -78,17 +80,17 @@ class TestNutritionRoutes:
                 }
                 assert actual_response == expected_response
 
-    @patch('app.services.openai_service.OpenAIService.get_food_item_from_image')
+    @patch('app.services.openai_service.OpenAIService.get_food_items_from_image')
     @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
     @patch('app.services.youtube_service.YouTubeService.get_recipe_videos')
     def test_analyze_image_success(self, mock_videos, mock_nutrition, mock_image_analysis, client):
         """Test successful image analysis"""
         # Mock the OpenAI image analysis response
-        mock_image_analysis.return_value = Mock(
+        mock_image_analysis.return_value = [Mock(
             food_item="eggs",
             quantity="2",
             unit="units"
-        )
+        )]
         
         # Mock the OpenAI nutrition response
         mock_nutrition.return_value = Mock(
@@ -171,17 +173,17 @@ class TestNutritionRoutes:
         data = json.loads(response.data)
         assert "Uploaded file is not an image" in data.get("error", {}).get("message", "")
 
-    @patch('app.services.openai_service.OpenAIService.get_food_item_from_image')
+    @patch('app.services.openai_service.OpenAIService.get_food_items_from_image')
     @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
     @patch('app.services.youtube_service.YouTubeService.get_recipe_videos')
     def test_analyze_image_large_file(self, mock_videos, mock_nutrition, mock_image_analysis, client):
         """Test image analysis with a large file"""
         # Mock the OpenAI image analysis response
-        mock_image_analysis.return_value = Mock(
+        mock_image_analysis.return_value = [Mock(
             food_item="large plate of food",
             quantity="1",
             unit="plate"
-        )
+        )]
         
         # Mock the OpenAI nutrition response
         mock_nutrition.return_value = Mock(
@@ -218,18 +220,18 @@ class TestNutritionRoutes:
             if os.path.exists(large_image_path):
                 os.remove(large_image_path)
 
-    @patch('app.services.openai_service.OpenAIService.get_food_item_from_image')
+    @patch('app.services.openai_service.OpenAIService.get_food_items_from_image')
     @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
     @patch('app.services.youtube_service.YouTubeService.get_recipe_videos')
     def test_analyze_real_chicken_breast(self, mock_videos, mock_nutrition, mock_image_analysis, client):
         """Test analysis of a real chicken breast image"""
         
         # Mock the OpenAI image analysis response
-        mock_image_analysis.return_value = Mock(
+        mock_image_analysis.return_value = [Mock(
             food_item="chicken breast",
             quantity="1",
             unit="units"
-        )
+        )]
         
         # Mock the OpenAI nutrition response
         nutrition_data = {
@@ -321,3 +323,90 @@ class TestNutritionRoutes:
         assert "recipe_urls" in data, "Missing recipe_urls in response"
         assert len(data["recipe_urls"]) == 2, f"Expected 2 recipe videos, got {len(data.get('recipe_urls', []))}"
         assert all(["title" in video and "url" in video for video in data["recipe_urls"]]), "Invalid video data structure"
+
+    @patch('app.services.openai_service.OpenAIService.get_food_suggestions')
+    def test_get_food_suggestions_etag(self, mock_suggestions, client):
+        """Test that suggestions carry a strong ETag and revalidate with 304"""
+        mock_suggestions.return_value = Mock(
+            model_dump=lambda: TEST_DATA["expected_responses"]["food_suggestions"]
+        )
+
+        response = client.get('/get_food_suggestions')
+        etag, weak = response.get_etag()
+        assert response.status_code == 200
+        assert etag and not weak
+
+        response = client.get('/get_food_suggestions', headers={'If-None-Match': f'"{etag}"'})
+        assert response.status_code == 304
+        assert response.data == b''
+
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    @patch('app.services.youtube_service.YouTubeService.get_recipe_videos')
+    def test_calculate_nutrition_compressed(self, mock_videos, mock_nutrition, client):
+        """Test that large nutrition responses are gzip encoded when the client accepts it"""
+        mock_nutrition.return_value = Mock(
+            model_dump=lambda: TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"],
+            insight="Eggs are a versatile and nutrient-rich food, providing high-quality protein and essential vitamins.",
+            is_recipe=False,
+            is_valid_food=True
+        )
+        mock_videos.return_value = [
+            Mock(title=f"Egg recipe {i}", url=f"http://example.com/{i}", id=str(i))
+            for i in range(10)
+        ]
+
+        payload = {"food_item": "eggs", "quantity": "2", "unit": "units"}
+        response = client.post('/calculate_nutrition', json=payload, headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        data = json.loads(gzip.decompress(response.data))
+        assert data["food_item"] == "eggs"
+
+        response = client.post('/calculate_nutrition', json=payload, headers={'Accept-Encoding': 'identity'})
+        assert 'Content-Encoding' not in response.headers
+        assert json.loads(response.data)["food_item"] == "eggs"
+
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    @patch('app.services.youtube_service.YouTubeService.get_recipe_videos')
+    def test_calculate_nutrition_get_revalidates(self, mock_videos, mock_nutrition, client):
+        """Test that GET lookups carry an ETag the browser cache can revalidate with"""
+        mock_nutrition.return_value = Mock(
+            model_dump=lambda: TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"],
+            insight="Eggs are a good source of protein",
+            is_recipe=False,
+            is_valid_food=True
+        )
+        mock_videos.return_value = None
+
+        url = '/calculate_nutrition?food_item=Eggs&quantity=2&unit=units'
+        response = client.get(url)
+        etag, weak = response.get_etag()
+        assert response.status_code == 200
+        assert etag and not weak
+        assert json.loads(response.data)["quantity"] == 2.0
+
+        response = client.get(url, headers={'If-None-Match': f'"{etag}"'})
+        assert response.status_code == 304
+
+        with pytest.raises(APIException) as error:
+            client.get('/calculate_nutrition?food_item=eggs&quantity=lots&unit=units')
+        assert error.value.message == "Invalid quantity value"
+
+        results = json.loads(client.get('/client_config').data)["results"]
+        assert results["version"] and results["max_entries"] > 0
+
+    def test_dumps_json_matches_fallback(self):
+        """Test that orjson and the standard library fallback produce the same bytes"""
+        data = {
+            "food_item": "crème brûlée",
+            "nutrition_info": TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"],
+            "health_score": {"score": 6.5, "message": "Good", "color": "#4CAF50"},
+            "recipe_urls": None,
+            "skipped": []
+        }
+        fast = http_utils.dumps_json(data)
+        with patch.object(http_utils, 'orjson', None):
+            assert http_utils.dumps_json(data) == fast
+        assert json.loads(fast) == data
+        assert http_utils.dumps_json({"big": 2 ** 70}) == b'{"big":1180591620717411303424}'
@@ -0,0 +1,119 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app.exceptions.api_exceptions import APIException
+from app.routes import nutrition_routes
+from app.services.overload import PRIORITIES, OverloadController
+
+class TestOverloadController:
+    """Test cases for priority admission and load shedding"""
+
+    def test_queue_serves_higher_priority_first_and_sheds_lowest(self):
+        """Test that freed slots go to the best waiting class and sustained delay sheds the lowest"""
+        limited = OverloadController(max_concurrent=2, max_wait=0.05)
+        limited.acquire('image')
+        with pytest.raises(APIException) as error:
+            # Images may fill only half the slots
+            limited.acquire('image')
+        assert error.value.status_code == 503 and error.value.headers["Retry-After"] == "1"
+        limited.acquire('text')
+
+        controller = OverloadController(max_concurrent=2, target_delay=0.01, interval=60, max_wait=5.0)
+        controller.acquire('text')
+        controller.acquire('text')
+        order = []
+
+        def until(condition):
+            # Polls instead of sleeping a fixed time, so a loaded test machine cannot reorder steps
+            give_up = time.monotonic() + 5
+            while not condition():
+                assert time.monotonic() < give_up
+                time.sleep(0.005)
+
+        def waiter(priority):
+            controller.acquire(priority)
+            order.append(priority)
+
+        threads = []
+        for priority in ('suggestions', 'text', 'cached'):
+            threads.append(threading.Thread(target=waiter, args=(priority,)))
+            threads[-1].start()
+            until(lambda: controller.stats()['waiting'] == len(threads))
+        time.sleep(0.1)
+        # Suggestions may fill only half the slots: they start once the rest are free
+        for admitted in (1, 2, 2, 3):
+            controller.release()
+            until(lambda: len(order) >= admitted)
+            assert len(order) == admitted
+        for thread in threads:
+            thread.join()
+        assert order == ['cached', 'text', 'suggestions']
+        assert controller.stats()['classes']['suggestions']['avg_queue_ms'] >= 100
+
+        def end_interval(shortest_wait):
+            with controller._cond:
+                controller._sample(shortest_wait)
+                controller._update(controller._window_start + 60)
+
+        controller.release()
+        # Closes the interval of the admissions above
+        end_interval(0.0)
+        assert controller.stats()['shedding'] == []
+        # A whole interval in which even the shortest wait was over target sheds the lowest class
+        end_interval(0.5)
+        with pytest.raises(APIException):
+            controller.acquire('suggestions')
+        end_interval(0.5)
+        assert controller.stats()['shedding'] == ['image', 'suggestions']
+        # An interval back under target serves one class again
+        end_interval(0.0)
+        stats = controller.stats()
+        assert stats['shedding'] == ['suggestions'] and stats['classes']['suggestions']['shed'] == 1
+
+    @patch('app.services.openai_service.OpenAIService.get_food_suggestions')
+    def test_shed_request_gets_503_before_the_handler(self, mock_suggestions, client):
+        """Test that an endpoint whose class is being shed is rejected without running"""
+        controller = OverloadController(max_concurrent=4)
+        controller._shed_from = 2
+        with patch.object(nutrition_routes, 'overload_controller', controller), \
+                patch.object(nutrition_routes.openai_service, 'has_cached_suggestions', return_value=False):
+            with pytest.raises(APIException) as error:
+                client.get('/get_food_suggestions')
+            assert error.value.error_type == "OVERLOADED"
+            mock_suggestions.assert_not_called()
+
+            with patch.object(nutrition_routes.openai_service, 'has_cached_nutrition', return_value=True), \
+                    patch('app.services.openai_service.OpenAIService.get_nutrition_info', side_effect=APIException("stop", 400, "validation_error")):
+                with pytest.raises(APIException) as error:
+                    client.post('/calculate_nutrition', json={"food_item": "eggs", "quantity": 2, "unit": "units"})
+                assert error.value.message == "stop"
+        assert controller.stats()['classes']['cached']['admitted'] == 1 and controller.stats()['active'] == 0
+
+    def test_saturated_slots_shed_image_jobs(self, client):
+        """Test that job submissions get a 503 when the image share is full, while polls take no slot"""
+        controller = OverloadController(max_concurrent=2, max_wait=0.01)
+        waiters = threading.BoundedSemaphore(1)
+        with patch.object(nutrition_routes, 'overload_controller', controller), \
+                patch.object(nutrition_routes, 'long_poll_slots', waiters), \
+                patch.object(nutrition_routes.job_queue.store, 'get', return_value={"status": "queued"}) as mock_get, \
+                patch.object(nutrition_routes.job_queue.store, 'wait', return_value={"status": "queued"}) as mock_wait:
+            controller.acquire('image')
+            with pytest.raises(APIException) as error:
+                client.post('/analyze_image/jobs')
+            assert error.value.status_code == 503 and error.value.error_type == "OVERLOADED"
+            assert controller.stats()['classes']['image']['shed'] == 1
+
+            # A full image share does not block polls, which long-poll outside the slots
+            assert client.get('/analyze_image/jobs/abc?wait=10').status_code == 200
+            assert mock_wait.call_count == 1 and controller.stats()['active'] == 1
+            controller.release()
+
+            # Polls beyond JOB_LONG_POLL_MAX_WAITERS, or while a class is shed, answer at once
+            waiters.acquire()
+            assert client.get('/analyze_image/jobs/abc?wait=10').status_code == 200
+            waiters.release()
+            controller._shed_from = len(PRIORITIES) - 1
+            assert client.get('/analyze_image/jobs/abc?wait=10').status_code == 200
+            assert mock_wait.call_count == 1 and mock_get.call_count == 2
+        assert controller.stats()['active'] == 0
@@ -0,0 +1,66 @@
+import io
+import json
+from unittest.mock import patch, Mock
+from PIL import Image
+from . import TEST_DATA
+from app.models.nutrition_models import NutritionBatch, NutritionScores
+from app.services.cache_service import ResultCache
+from app.services.openai_service import OpenAIService
+
+EGGS = TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"]
+
+class TestPlateAnalysis:
+    """Test cases for detecting and scoring several foods in one image"""
+
+    def test_nutrition_batch_makes_one_call_for_misses(self, tmp_path, app_context):
+        """Test that uncached items are resolved together and cached items are not re-requested"""
+        service = OpenAIService(api_key="test", cache=ResultCache(str(tmp_path / 'cache.sqlite3')))
+        eggs = NutritionScores(**EGGS)
+        dal = NutritionScores(**{**EGGS, "calories": "150kcal", "insight": "Lentils."})
+        service.cache.set_model(service.cache_key('nutrition', *service.nutrition_key_parts("rice", 1, "cup")), eggs)
+
+        with patch.object(service.client.beta.chat.completions, 'parse') as mock_parse:
+            mock_parse.return_value = Mock(choices=[Mock(message=Mock(parsed=NutritionBatch(items=[eggs, dal])))])
+            results = service.get_nutrition_batch([("eggs", 2, "units"), ("rice", 1, "cup"), ("dal", 1, "bowl")])
+            repeat = service.get_nutrition_batch([("eggs", 2, "units"), ("dal", 1, "bowl")])
+
+        assert mock_parse.call_count == 1
+        assert "1. 2 units of eggs\n2. 1 bowl of dal" in mock_parse.call_args.kwargs["messages"][1]["content"]
+        assert [result.calories for result in results] == ["143kcal", "143kcal", "150kcal"]
+        assert repeat == [eggs, dal]
+
+    @patch('app.services.openai_service.OpenAIService.get_food_items_from_image')
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_batch')
+    @patch('app.services.youtube_service.YouTubeService.get_recipe_videos')
+    def test_analyze_thali(self, mock_videos, mock_batch, mock_image_analysis, client):
+        """Test that a plate returns every item scored plus totals, with one video lookup"""
+        mock_image_analysis.return_value = [
+            Mock(food_item="eggs", quantity="2", unit="units"),
+            Mock(food_item="dal", quantity="1", unit="bowl")
+        ]
+        mock_batch.return_value = [
+            Mock(model_dump=lambda: dict(EGGS), insight="Eggs.", is_recipe=False, is_valid_food=True),
+            Mock(model_dump=lambda: {**EGGS, "is_recipe": True}, insight="Dal.", is_recipe=True, is_valid_food=True)
+        ]
+        mock_videos.return_value = [Mock(title="Dal tadka", url="http://example.com/dal", id="1")]
+
+        image = io.BytesIO()
+        Image.new('RGB', (100, 100), color='white').save(image, 'JPEG')
+        image.seek(0)
+        response = client.post(
+            '/analyze_image',
+            data={'image': (image, 'thali.jpg')},
+            content_type='multipart/form-data'
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert mock_batch.call_args.args[0] == [("eggs", 2.0, "units"), ("dal", 1.0, "bowl")]
+        assert [item["food_item"] for item in data["items"]] == ["eggs", "dal"]
+        assert all("score" in item["health_score"] for item in data["items"])
+        assert data["food_item"] == "eggs, dal"
+        assert data["nutrition_info"]["calories"] == "286kcal"
+        assert data["nutrition_info"]["fat"]["total"] == "20g"
+        assert data["is_recipe"] is True
+        assert mock_videos.call_count == 1
+        assert data["recipe_urls"][0]["id"] == "1"
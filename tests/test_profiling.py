@@ -0,0 +1,83 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch, Mock
+from . import TEST_DATA
+from app.config import Config
+from app.routes import nutrition_routes
+from app.services.profiler import StackSampler
+from app.exceptions.api_exceptions import APIException
+
+class TestProfiling:
+    """Test cases for on-demand request profiling and the stack sampler"""
+
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    @patch('app.services.youtube_service.YouTubeService.get_recipe_videos')
+    def test_profile_single_request(self, mock_videos, mock_nutrition, client, tmp_path):
+        """Test that only requests presenting the token are profiled and downloadable"""
+        mock_nutrition.return_value = Mock(
+            model_dump=lambda: TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"],
+            insight="Eggs are a good source of protein",
+            is_recipe=False,
+            is_valid_food=True
+        )
+        mock_videos.return_value = None
+        payload = {"food_item": "eggs", "quantity": 2, "unit": "units"}
+
+        with patch.object(Config, 'PROFILING_TOKEN', 'secret'), \
+                patch.object(nutrition_routes.request_profiler, 'directory', str(tmp_path)):
+            response = client.post('/calculate_nutrition', json=payload)
+            assert 'X-Profile-ID' not in response.headers
+
+            response = client.post('/calculate_nutrition', json=payload, headers={'X-Profile': 'wrong'})
+            assert 'X-Profile-ID' not in response.headers
+
+            response = client.post('/calculate_nutrition', json=payload, headers={'X-Profile': 'secret'})
+            assert response.status_code == 200
+            profile_id = response.headers['X-Profile-ID']
+            assert response.headers['X-Profile-URL'] == f'/profiles/{profile_id}'
+
+            report = client.get(f'/profiles/{profile_id}?profile=secret')
+            assert b'calculate_nutrition' in report.data
+            download = client.get(f'/profiles/{profile_id}?format=prof', headers={'X-Profile': 'secret'})
+            assert download.data == (tmp_path / f'{profile_id}.prof').read_bytes()
+
+            listing = client.get('/profiles', headers={'X-Profile': 'secret'}).get_json()
+            assert [entry['profile_id'] for entry in listing['profiles']] == [profile_id]
+
+            with pytest.raises(APIException) as exc_info:
+                client.get(f'/profiles/{profile_id}')
+            assert exc_info.value.status_code == 404
+            with pytest.raises(APIException):
+                client.get('/profiles/config?profile=secret')
+
+        with pytest.raises(APIException):
+            client.get(f'/profiles/{profile_id}?profile=secret')
+
+    def test_sampler_aggregates_tracked_threads(self):
+        """Test that the sampler records the stacks of tracked threads only"""
+        sampler = StackSampler(interval=0.001, max_stacks=10)
+        running = threading.Event()
+        done = threading.Event()
+
+        def handler():
+            sampler.track('nutrition.calculate_nutrition')
+            running.set()
+            while not done.is_set():
+                time.sleep(0.001)
+            sampler.untrack()
+
+        worker = threading.Thread(target=handler)
+        worker.start()
+        running.wait()
+        for _ in range(5):
+            sampler.sample()
+        done.set()
+        worker.join()
+        sampler.sample()
+
+        samples, stacks = sampler.top()
+        assert samples == 5
+        assert all(stack.startswith('nutrition.calculate_nutrition;') for stack, _ in stacks)
+        assert any(stack.endswith('test_profiling.py:handler') for stack, _ in stacks)
+        assert sampler.collapsed().splitlines()[0].endswith(f' {stacks[0][1]}')
@@ -0,0 +1,65 @@
+import json
+import time
+import pytest
+from flask import Flask
+from app.exceptions.api_exceptions import APIException
+from app.handlers.error_handlers import register_error_handlers
+from app.services.rate_limiter import RateLimiter
+import app.routes.nutrition_routes as nutrition_routes
+
+class TestRateLimiter:
+    """Test cases for the shared token-bucket rate limiter"""
+
+    def _limiter(self, tmp_path, **overrides):
+        options = dict(
+            client_capacity=10, client_refill_per_second=1,
+            global_capacity=100, global_refill_per_second=10,
+            max_wait=0.5, queue_size=2
+        )
+        options.update(overrides)
+        return RateLimiter(str(tmp_path / 'limits.sqlite3'), **options)
+
+    def test_client_bucket_limits_one_client_only(self, tmp_path):
+        """Test that one client exhausting its bucket does not affect another"""
+        limiter = self._limiter(tmp_path)
+        assert limiter.try_acquire("a", 5) == 0
+        assert limiter.try_acquire("a", 5) == 0
+        assert limiter.try_acquire("a", 5) == pytest.approx(5, abs=0.1)
+        assert limiter.try_acquire("b", 5) == 0
+
+    def test_global_bucket_is_shared(self, tmp_path):
+        """Test that the global bucket caps all clients together, across limiter instances"""
+        limiter = self._limiter(tmp_path, global_capacity=10, global_refill_per_second=0.1)
+        other_worker = self._limiter(tmp_path, global_capacity=10, global_refill_per_second=0.1)
+        assert limiter.try_acquire("a", 6) == 0
+        assert other_worker.try_acquire("b", 6) > 0
+
+    def test_admit_waits_briefly_then_rejects(self, tmp_path):
+        """Test that short waits are queued and long ones get 429 with Retry-After"""
+        limiter = self._limiter(tmp_path, client_capacity=1, client_refill_per_second=5)
+        limiter.admit("a", 1)
+        started = time.monotonic()
+        limiter.admit("a", 1)
+        assert 0.1 <= time.monotonic() - started < 0.5
+
+        slow = self._limiter(tmp_path / 'slow', client_capacity=1, client_refill_per_second=0.1)
+        slow.admit("a", 1)
+        with pytest.raises(APIException) as exc_info:
+            slow.admit("a", 1)
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == "10"
+
+    def test_route_returns_429(self, tmp_path, monkeypatch):
+        """Test that an exhausted client gets a JSON 429 from the nutrition endpoints"""
+        monkeypatch.setattr(nutrition_routes, 'rate_limiter', self._limiter(tmp_path, client_capacity=5, client_refill_per_second=0.01))
+        app = Flask(__name__)
+        app.register_blueprint(nutrition_routes.nutrition_bp)
+        register_error_handlers(app)
+        client = app.test_client()
+
+        response = client.post('/analyze_image')
+        assert response.status_code == 400
+        response = client.post('/analyze_image')
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+        assert json.loads(response.data)["error_type"] == "RATE_LIMITED"
@@ -0,0 +1,147 @@
+import time
+from unittest.mock import patch, Mock
+from app.models.nutrition_models import FoodItem, VideoInfo
+from app.services.cache_service import ResultCache
+from app.services.openai_service import OpenAIService
+
+class TestResultCache:
+    """Test cases for the shared two-tier result cache"""
+
+    def test_set_and_get_across_instances(self, tmp_path):
+        """Test that an entry written by one worker is visible to a fresh one"""
+        db_path = str(tmp_path / 'cache.sqlite3')
+        key = ResultCache.make_key('food_item', 'v1', 'abc')
+        ResultCache(db_path).set_model(key, FoodItem(food_item="idli", quantity=2, unit="units"))
+
+        fresh = ResultCache(db_path)
+        assert fresh.get_model(key, FoodItem) == FoodItem(food_item="idli", quantity=2, unit="units")
+
+    def test_fresh_worker_starts_warm(self, tmp_path):
+        """Test that recently used entries are preloaded into the memory tier"""
+        db_path = str(tmp_path / 'cache.sqlite3')
+        keys = [ResultCache.make_key('videos', 'v1', i) for i in range(3)]
+        writer = ResultCache(db_path)
+        for key in keys:
+            writer.set(key, '[]')
+
+        fresh = ResultCache(db_path, memory_entries=2)
+        fresh.get(keys[0])
+        assert len(fresh._memory) == 2
+
+    def test_version_change_misses_and_purges(self, tmp_path):
+        """Test that a new version neither reads nor keeps entries of the old one"""
+        cache = ResultCache(str(tmp_path / 'cache.sqlite3'))
+        old_key = ResultCache.make_key('nutrition', 'old', 'dal')
+        cache.set(old_key, '{}')
+
+        assert cache.get(ResultCache.make_key('nutrition', 'new', 'dal')) is None
+        assert cache.purge_stale('nutrition', 'new') == 1
+        assert cache.get(old_key) is None
+
+    def test_expired_entries_are_ignored(self, tmp_path):
+        """Test that entries past their TTL are treated as misses"""
+        cache = ResultCache(str(tmp_path / 'cache.sqlite3'))
+        key = ResultCache.make_key('videos', 'v1', 'poha')
+        cache.set(key, '[]', ttl=-1)
+        assert cache.get(key) is None
+
+    def test_eviction_bounds_size(self, tmp_path):
+        """Test that the least recently used rows beyond max_entries are evicted"""
+        cache = ResultCache(str(tmp_path / 'cache.sqlite3'), max_entries=5, memory_entries=1)
+        keys = [ResultCache.make_key('videos', 'v1', i) for i in range(8)]
+        for key in keys:
+            cache.set(key, '[]')
+            time.sleep(0.001)
+        cache.evict()
+
+        count = cache._connection().execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+        assert count == 5
+        assert cache.get(keys[0]) is None
+        assert cache.get(keys[-1]) == '[]'
+
+    def test_list_models_round_trip(self, tmp_path):
+        """Test that video lists survive serialization"""
+        cache = ResultCache(str(tmp_path / 'cache.sqlite3'))
+        key = ResultCache.make_key('videos', 'v1', 'upma')
+        videos = [VideoInfo(url="http://example.com/1", id="1", title="Upma")]
+        cache.set_models(key, videos)
+        assert cache.get_models(key, VideoInfo) == videos
+
+    def test_openai_service_serves_repeat_lookups_from_cache(self, tmp_path, app_context):
+        """Test that a repeated nutrition lookup makes a single upstream call"""
+        from . import TEST_DATA
+        from app.models.nutrition_models import NutritionScores
+
+        nutrition = NutritionScores(**TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"])
+        service = OpenAIService(api_key="test", cache=ResultCache(str(tmp_path / 'cache.sqlite3')))
+        with patch.object(service.client.beta.chat.completions, 'parse') as mock_parse:
+            mock_parse.return_value = Mock(choices=[Mock(message=Mock(parsed=nutrition))])
+            first = service.get_nutrition_info("Eggs ", 2, "units")
+            second = service.get_nutrition_info("eggs", 2.0, "units")
+
+        assert mock_parse.call_count == 1
+        assert first == second
+
+    def test_invalid_food_is_answered_from_negative_cache(self, tmp_path, app_context):
+        """Test that a rejected food name, in any quantity or spelling, makes a single upstream call"""
+        from . import TEST_DATA
+        from app.models.nutrition_models import NutritionScores
+
+        invalid = NutritionScores(**{
+            **TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"],
+            "is_valid_food": False, "insight": "A stapler is not food."
+        })
+        service = OpenAIService(api_key="test", negative_cache=ResultCache(str(tmp_path / 'cache.sqlite3'), table='negative_cache'))
+        with patch.object(service.client.beta.chat.completions, 'parse') as mock_parse:
+            mock_parse.return_value = Mock(choices=[Mock(message=Mock(parsed=invalid))])
+            service.get_nutrition_info("Stapler", 1, "units")
+            repeat = service.get_nutrition_info("  stapler!", 3, "plate")
+            batch = service.get_nutrition_batch([("stapler", 2, "units")])
+
+        assert mock_parse.call_count == 1
+        assert repeat.insight == "A stapler is not food."
+        assert not batch[0].is_valid_food
+
+    def test_invalid_food_expires_with_the_negative_cache(self, tmp_path, app_context):
+        """Test that a rejection is kept out of the main cache and expires after NEGATIVE_CACHE_TTL_SECONDS"""
+        from . import TEST_DATA
+        from app.config import Config
+        from app.models.nutrition_models import NutritionScores
+
+        invalid = NutritionScores(**{
+            **TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"], "is_valid_food": False
+        })
+        with patch.object(Config, 'CACHE_DB_PATH', str(tmp_path / 'cache.sqlite3')):
+            service = OpenAIService(api_key="test", cache=ResultCache.from_config(), negative_cache=ResultCache.negative_from_config())
+        with patch.object(service.client.beta.chat.completions, 'parse') as mock_parse:
+            mock_parse.return_value = Mock(choices=[Mock(message=Mock(parsed=invalid))])
+            service.get_nutrition_info("stapler", 1, "units")
+            service.get_nutrition_batch([("stapler", 1, "units"), ("brick", 1, "units")])
+            assert mock_parse.call_count == 2
+            for food in ("stapler", "brick"):
+                assert service.cache.get(service.cache_key('nutrition', *service.nutrition_key_parts(food, 1, "units"))) is None
+
+            later = time.time() + Config.NEGATIVE_CACHE_TTL_SECONDS + 1
+            with patch('app.services.cache_service.time', Mock(time=Mock(return_value=later))):
+                service.get_nutrition_info("stapler", 1, "units")
+            assert mock_parse.call_count == 3
+
+    def test_rejected_image_is_answered_from_negative_cache(self, tmp_path, app_context):
+        """Test that an image the vision model refused is refused again without an upstream call"""
+        import io
+        import pytest
+        from app.exceptions.api_exceptions import APIException
+
+        service = OpenAIService(api_key="test", negative_cache=ResultCache(str(tmp_path / 'cache.sqlite3'), table='negative_cache'))
+        image = io.BytesIO(b"selfie bytes")
+        with patch.object(service.client.chat.completions, 'create') as mock_create:
+            mock_create.return_value = Mock(choices=[Mock(message=Mock(
+                content='{"error": "This appears to be an image containing people. Please upload a food image only."}'
+            ))])
+            for _ in range(2):
+                image.seek(0)
+                with pytest.raises(APIException) as error:
+                    service.get_food_items_from_image(image)
+                assert "people" in error.value.message
+
+        assert mock_create.call_count == 1
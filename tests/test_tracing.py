@@ -0,0 +1,90 @@
+import json
+from unittest.mock import patch, Mock
+from . import TEST_DATA
+from app.utils.tracing import FileExporter, OTLPExporter, Tracer, tracer
+
+class RecordingExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+class TestTracing:
+    """Test cases for request-scoped tracing"""
+
+    def test_spans_nest_and_export_to_file(self, tmp_path):
+        """Test that spans record their parent and the trace is written as one JSON line"""
+        path = tmp_path / 'traces.jsonl'
+        local = Tracer(FileExporter(str(path)), sample_rate=1.0)
+
+        local.start_trace('calculate_nutrition', request_id='req-1')
+        with local.span('openai.nutrition') as outer:
+            with local.span('model_call', model='small'):
+                pass
+        trace = local.finish_trace(status_code=200)
+
+        line = json.loads(path.read_text())
+        assert line['request_id'] == 'req-1'
+        spans = {span['name']: span for span in line['spans']}
+        assert spans['model_call']['parent_id'] == outer.span_id
+        assert spans['openai.nutrition']['parent_id'] == trace.root.span_id
+        assert spans['calculate_nutrition']['attributes']['status_code'] == 200
+
+    def test_sampling_keeps_slow_traces(self):
+        """Test that unsampled traces are only exported when slow enough"""
+        exporter = RecordingExporter()
+        local = Tracer(exporter, sample_rate=0.0, slow_seconds=0.0)
+        with local.trace('image_job'):
+            with local.span('openai.vision'):
+                pass
+        assert len(exporter.traces) == 1
+
+        local = Tracer(exporter, sample_rate=0.0)
+        with local.trace('image_job') as trace:
+            with local.span('openai.vision') as span:
+                assert span is None
+        assert not trace.recording
+        assert len(exporter.traces) == 1
+
+    def test_otlp_payload(self):
+        """Test that the OTLP exporter encodes ids, times and attributes as OTLP/JSON"""
+        local = Tracer(RecordingExporter())
+        local.start_trace('analyze_image', request_id='req-2')
+        with local.span('youtube.search', is_recipe=True):
+            pass
+        trace = local.finish_trace()
+
+        payload = OTLPExporter('http://127.0.0.1:9/v1/traces', 'test').payload(trace)
+        spans = payload['resourceSpans'][0]['scopeSpans'][0]['spans']
+        assert [span['name'] for span in spans] == ['analyze_image', 'youtube.search']
+        assert all(span['traceId'] == trace.trace_id and len(span['traceId']) == 32 for span in spans)
+        assert spans[1]['parentSpanId'] == spans[0]['spanId']
+        assert {'key': 'is_recipe', 'value': {'boolValue': True}} in spans[1]['attributes']
+
+    @patch('app.services.openai_service.OpenAIService.get_nutrition_info')
+    @patch('app.services.youtube_service.YouTubeService.get_recipe_videos')
+    def test_request_id_header_and_route_spans(self, mock_videos, mock_nutrition, client):
+        """Test that responses carry the request id and the trace covers the scoring step"""
+        mock_nutrition.return_value = Mock(
+            model_dump=lambda: TEST_DATA["expected_responses"]["nutrition_calculation"]["nutrition_info"],
+            insight="Eggs are a good source of protein",
+            is_recipe=False,
+            is_valid_food=True
+        )
+        mock_videos.return_value = None
+        exporter = RecordingExporter()
+        payload = {"food_item": "eggs", "quantity": 2, "unit": "units"}
+
+        with patch.object(tracer, 'exporter', exporter), patch.object(tracer, 'sample_rate', 1.0):
+            response = client.post('/calculate_nutrition', json=payload)
+            assert len(response.headers['X-Request-ID']) == 32
+
+            response = client.post('/calculate_nutrition', json=payload, headers={'X-Request-ID': 'abc-123'})
+            assert response.headers['X-Request-ID'] == 'abc-123'
+
+            response = client.post('/calculate_nutrition', json=payload, headers={'X-Request-ID': 'bad id!'})
+            assert response.headers['X-Request-ID'] != 'bad id!'
+
+        assert [trace.request_id for trace in exporter.traces][1] == 'abc-123'
+        assert [span.name for span in exporter.traces[0].spans] == ['nutrition.calculate_nutrition', 'analyzer.health_score']
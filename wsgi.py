@@ -1,4 +1,10 @@
+import os
 from app import app
 
 if __name__ == '__main__':
-    app.run(host="0.0.0.0", debug=True) 
+    # Development server only; production runs `gunicorn -c gunicorn.conf.py wsgi:app`
+    app.run(
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", 5000)),
+        debug=os.getenv("FLASK_DEBUG", "false").lower() == "true"
+    )